@@ -1,13 +1,31 @@
 import asyncio
+import json
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket, websockets
 from fastapi.responses import HTMLResponse
 
-from model.body import HumanBody
+from model.equilibrium import warm_start
+from model.playback import Playback
+from model.replay import SessionRecorder
+from model.stream import MetricStream
 
 app = FastAPI()
 
+# Metric protocols a client can ask for with /ws?protocol=...: "metrics" sends
+# the full get_metrics() dict every tick, "values" the schema once and then
+# flat value lists, "binary" the same with packed binary frames (see
+# model/stream.py). With the values and binary protocols, ?delta=<relative
+# tolerance> sends only the metrics that changed by more than that, with a
+# full keyframe every ?keyframe=<frames> (100 by default). Their clients can
+# also subscribe to the metrics they show, see MetricStream.apply_action().
+# Metrics go out ?rate=<Hz> times a second (10 by default) with the body
+# running ?speed=<multiplier> times real time (1 by default, or "max"); clients
+# can change both while connected, see model/playback.py.
+PROTOCOLS = ("metrics", "values", "binary")
+# Open /ws sessions, which share the stepping budget (see Playback.advance)
+sessions: set[WebSocket] = set()
+
 @app.get("/")
 async def get():
     html_content = Path("app.html").read_text()
@@ -15,16 +33,69 @@ async def get():
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    params = websocket.query_params
+    protocol = params.get("protocol", "metrics")
+    try:
+        tolerance = float(params["delta"]) if "delta" in params else None
+        keyframe_every = int(params.get("keyframe", 100))
+        valid = (
+            protocol in PROTOCOLS
+            and (tolerance is None or tolerance >= 0)
+            and keyframe_every >= 1
+        )
+        playback = Playback(params.get("rate", 10), params.get("speed", 1))
+    except ValueError:
+        valid = False
+    if not valid:
+        await websocket.close(code=1008)
+        return
     await websocket.accept()
-    model = HumanBody()
+    # A cold cache means a Newton solve, which must not hold up other sessions
+    model = await asyncio.get_running_loop().run_in_executor(None, warm_start)
+    stream = MetricStream(
+        model,
+        binary=protocol == "binary",
+        tolerance=tolerance,
+        keyframe_every=keyframe_every,
+    )
+    # Actions and publishes are logged with the number of steps before them
+    # (playback.steps), so that model/replay.py can re-run the session exactly
+    recorder = SessionRecorder(model)
+    # The step batch running in a worker thread, if any. Threads cannot be
+    # cancelled, so closing the session waits for it.
+    advancing: asyncio.Future | None = None
+    # Held while the body steps in a worker thread, so that actions land
+    # between step batches and are recorded with the right step count
+    stepping = asyncio.Lock()
+    sessions.add(websocket)
 
     async def send_updates():
+        nonlocal advancing
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                dt = model.step()
-                metrics = model.get_metrics()
-                await websocket.send_json(metrics)
-                await asyncio.sleep(dt)
+                started = loop.time()
+                # As many steps as the speed calls for, then one publish. The
+                # steps run off the event loop so other sessions keep going.
+                async with stepping:
+                    advancing = loop.run_in_executor(
+                        None, playback.advance, model, 1 / len(sessions)
+                    )
+                    await asyncio.shield(advancing)
+                    # Built and logged before an action can change the body
+                    if protocol == "metrics":
+                        messages = [model.get_metrics()]
+                    else:
+                        messages = stream.messages()
+                    recorder.publish(playback.steps)
+                for message in messages:
+                    if isinstance(message, dict):
+                        await websocket.send_json(message)
+                    elif isinstance(message, bytes):
+                        await websocket.send_bytes(message)
+                    else:
+                        await websocket.send_text(message)
+                await asyncio.sleep(max(0.0, started + playback.interval - loop.time()))
             except asyncio.CancelledError:
                 break
             except websockets.WebSocketDisconnect:
@@ -33,20 +104,31 @@ async def websocket_endpoint(websocket: WebSocket):
     update_task = asyncio.create_task(send_updates())
     try:
         while True:
-            data = await websocket.receive_json()
-            if data['action'] == 'start_exercise':
-                model.start_exercise()
-            elif data['action'] == 'stop_exercise':
-                model.stop_exercise()
-            elif data['action'] == 'drink':
-                model.drink(data['amount'])
-            elif data['action'] == 'eat':
-                model.eat(data['amount'])
-            elif data['action'] == 'pee':
-                model.pee()
+            text = await websocket.receive_text()
+            # A bad message is answered with {"error": ...} and the session
+            # goes on; only actions that were applied are recorded
+            try:
+                data = json.loads(text)
+                # Subscriptions and pacing do not change the simulation, so
+                # they are not recorded
+                if data["action"] in MetricStream.actions:
+                    stream.apply_action(data)
+                elif data["action"] in Playback.actions:
+                    playback.apply_action(data)
+                else:
+                    async with stepping:
+                        model.apply_action(data)
+                        recorder.record(playback.steps, data)
+            except (ValueError, KeyError, TypeError) as error:
+                message = f"Invalid message {text[:200]!r}: {error!r}"
+                await websocket.send_json({"error": message})
     finally:
+        sessions.discard(websocket)
         update_task.cancel()
         await asyncio.wait_for(update_task, timeout=1.0)
+        if advancing is not None:
+            await advancing
+        recorder.close(playback.steps)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+import argparse
+import math
+import timeit
+
+import numpy as np
+
+from model import lut
+
+# Microbenchmarks of the hot-path nonlinearities, exact against tabulated, for
+# one scalar call and per element of a NumPy array (the cohort path)
+CASES = {
+    "dissociation": (
+        lut.exact_dissociation,
+        lut.exact_dissociation_vector,
+        lut.DISSOCIATION,
+        lut.DISSOCIATION.vector,
+        (0, 100),
+    ),
+    "log10": (math.log10, np.log10, lut.table_log10, lut.table_log10_vector, (1, 100)),
+    "gaussian": (
+        lut.exact_gaussian,
+        lut.exact_gaussian_vector,
+        lut.GAUSSIAN,
+        lut.GAUSSIAN.vector,
+        (-1.5, 1.5),
+    ),
+}
+
+
+def _per_call(function, argument, number: int) -> float:
+    return (
+        min(timeit.repeat(lambda: function(argument), number=number, repeat=5)) / number
+    )
+
+
+def benchmark(size: int = 10000, number: int = 100000) -> list[dict]:
+    # ns per scalar call and per array element, exact and tabulated
+    rng = np.random.default_rng(0)
+    rows = []
+    for name, (exact, exact_vector, table, table_vector, (low, high)) in CASES.items():
+        x = rng.uniform(low, high, size)
+        scalar = float(x[0])
+        rows.append(
+            {
+                "function": name,
+                "scalar_exact": _per_call(exact, scalar, number) * 1e9,
+                "scalar_table": _per_call(table, scalar, number) * 1e9,
+                "vector_exact": _per_call(exact_vector, x, number // size or 1)
+                / size
+                * 1e9,
+                "vector_table": _per_call(table_vector, x, number // size or 1)
+                / size
+                * 1e9,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the exact and tabulated hot-path functions (model/lut.py)"
+    )
+    parser.add_argument(
+        "--size", type=int, default=10000, help="array length for the vector timings"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'ns':14} {'scalar exact':>12} {'scalar table':>12}"
+        f" {'vector exact':>12} {'vector table':>12}"
+    )
+    for row in benchmark(args.size, max(100000, 10 * args.size)):
+        print(
+            f"{row['function']:14} {row['scalar_exact']:12.1f}"
+            f" {row['scalar_table']:12.1f}"
+            f" {row['vector_exact']:12.2f} {row['vector_table']:12.2f}"
+        )
+    errors = {
+        "dissociation": lut.DISSOCIATION,
+        "log10": lut.LOG10_MANTISSA,
+        "gaussian": lut.GAUSSIAN,
+    }
+    print(
+        "table max error: "
+        + ", ".join(f"{name} {table.max_error:.1e}" for name, table in errors.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
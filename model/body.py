@@ -1,6 +1,10 @@
-from model.blood import Blood
+from collections.abc import Callable, Sequence
+
+from model.blood import SPECIES, Blood
+from model.bones import Bones
 from model.brain import Brain
 from model.fat import Fat
+from model.flux import FluxAccumulator
 from model.heart import Heart
 from model.intestines import Intestines
 from model.kidneys import Bladder, Kidneys
@@ -8,122 +12,328 @@ from model.liver import GallBladder, Liver
 from model.lungs import Lungs
 from model.muscles import Muscles
 from model.pancreas import Pancreas
+from model.registry import ORGANS, attribute, build_organs, resolve_spec
+from model.scheduler import Scheduler
 from model.skin import Skin
 from model.spleen import Spleen
 from model.stomach import Stomach
+from model.thyroid import Thyroid
 
 
 class HumanBody:
-    def __init__(self):
-        self.blood = Blood(volume=5000)  # Total blood volume in mL
-
-        # Initialize organs
-        self.lungs = Lungs(self.blood)
-        self.brain = Brain(self.blood)
-        self.heart = Heart(self.blood)
-        self.kidneys = Kidneys(self.blood)
-        self.liver = Liver(self.blood)
-        self.muscles = Muscles(self.blood)
-        self.pancreas = Pancreas(self.blood)
-        self.fat = Fat(self.blood)
-        self.stomach = Stomach(self.blood)
-        self.intestines = Intestines(self.blood)
-        self.skin = Skin(self.blood)
-        self.spleen = Spleen(self.blood)
-        self.bladder = Bladder(self.blood)
-        self.gall_bladder = GallBladder(self.blood)
-
-        # Connect brain to lungs, heart, and muscles
-        self.brain.set_lungs(self.lungs)
-        self.brain.set_heart(self.heart)
-        self.brain.set_kidneys(self.kidneys)
-        self.brain.set_muscles(self.muscles)
-
-        # Connect kidneys to bladder
-        self.kidneys.set_bladder(self.bladder)
-
-        # Connect liver to gall bladder
-        self.liver.set_gall_bladder(self.gall_bladder)
-
-        # Connect gall bladder to intestines
-        self.gall_bladder.set_intestines(self.intestines)
+    # Actions accepted by apply_action() and the fields each one needs
+    actions: dict[str, tuple[str, ...]] = {
+        "start_exercise": (),
+        "stop_exercise": (),
+        "sleep": (),
+        "wake": (),
+        "drink": ("amount",),
+        "eat": ("amount",),
+        "pee": (),
+    }
 
-        self.is_exercising = False
+    # Organs of the full body; reduced specs leave some of them None
+    heart: Heart | None
+    lungs: Lungs | None
+    brain: Brain | None
+    kidneys: Kidneys | None
+    liver: Liver | None
+    muscles: Muscles | None
+    pancreas: Pancreas | None
+    fat: Fat | None
+    stomach: Stomach | None
+    intestines: Intestines | None
+    skin: Skin | None
+    spleen: Spleen | None
+    bladder: Bladder | None
+    gall_bladder: GallBladder | None
+    bones: Bones | None
+    thyroid: Thyroid | None
+
+    def __init__(
+        self,
+        multirate: bool = False,
+        fidelity: str = "waveform",
+        flux: bool = False,
+        spec: dict | str | None = None,
+    ):
+        # `spec` picks the organs, their parameters and links, by default the
+        # full body (see model/registry.py)
+        self.spec = resolve_spec(spec)
+        self.blood = Blood(volume=self.spec["blood_volume"])  # Total blood volume in mL
 
-        # Connect stomach to intestines
-        self.stomach.set_intestines(self.intestines)
+        # Initialize and connect the organs
+        self.organs = build_organs(self.blood, self.spec)
+        for name in ORGANS:
+            setattr(self, attribute(name), self.organs.get(name))
+
+        self.is_exercising = False
+        self.is_sleeping = False
 
+        self.dt = 0.1  # Fixed time step of 0.1 seconds
+        # Runs the organ processes each tick; multirate calls the slow ones less
+        # often (see Organ.update_periods)
+        self.scheduler = Scheduler(self.organs, multirate)
         self.time = 0  # in seconds
         self.total_caloric_expenditure = 0  # in kcal
+        self.flux: FluxAccumulator | None = None  # See set_flux()
+        self.set_fidelity(fidelity)
+        self.set_flux(flux)
 
     def start_exercise(self):
+        # Without a brain, exercise and sleep go to the muscles directly
         self.is_exercising = True
-        self.brain.start_exercise()
+        if self.brain:
+            self.brain.start_exercise()
+        elif self.muscles:
+            self.muscles.increase_energy_demand(3)
 
     def stop_exercise(self):
         self.is_exercising = False
-        self.brain.stop_exercise()
+        if self.brain:
+            self.brain.stop_exercise()
+        elif self.muscles:
+            self.muscles.reset_energy_demand()
+        if self.is_sleeping:
+            # Back to the relaxed demand of sleep, not the waking one
+            self.sleep()
 
-    def step(self) -> float:
-        dt = 0.1  # Fixed time step of 0.1 seconds
+    def sleep(self):
+        self.is_sleeping = True
+        if self.brain:
+            self.brain.start_sleep()
+        elif self.muscles:
+            self.muscles.relax()
+
+    def wake(self):
+        self.is_sleeping = False
+        if self.brain:
+            self.brain.stop_sleep()
+        elif self.muscles:
+            self.muscles.reset_energy_demand()
+        if self.is_exercising:
+            # Waking mid exercise keeps the exercise demand
+            self.start_exercise()
+
+    def step(self, dt: float | None = None) -> float:
+        # One tick of self.dt by default; long runs pass a coarser dt
+        dt = self.dt if dt is None else dt
 
         self.time += dt
+        self._advance(dt)
+
+        return dt
+
+    def set_fidelity(self, fidelity: str) -> None:
+        # "waveform" resolves each beat and breath, "averaged" uses beat- and
+        # breath-averaged heart and lungs for long runs with large steps
+        self.fidelity = fidelity
+        if self.heart:
+            self.heart.set_fidelity(fidelity)
+        if self.lungs:
+            self.lungs.set_fidelity(fidelity)
+
+    def set_flux(self, enabled: bool) -> None:
+        # With flux accumulation, organs change private copies of the blood and
+        # their summed changes are applied once per step (see model/flux.py)
+        if self.flux is not None:
+            self.flux.detach()
+        self.flux = FluxAccumulator(self.blood, self.organs) if enabled else None
+
+    def flux_breakdown(self) -> dict[str, dict[str, float]]:
+        # Per organ, the blood changes per second over the last step
+        if self.flux is None:
+            raise ValueError("Flux accumulation is off, see set_flux()")
+        return self.flux.breakdown()
+
+    def set_multirate(self, enabled: bool) -> None:
+        self.scheduler.flush()
+        self.scheduler = Scheduler(self.organs, enabled)
+
+    def add_process(
+        self, organ: str, process: Callable[[float], None], period: float = 0.0
+    ) -> None:
+        # Registers `process(dt)` to run after the processes of organs[organ] and
+        # rebuilds the update plan. Registrations are not part of the state, so
+        # snapshots and forks do not carry them.
+        self.organs[organ].add_process(process, period)
+        self.set_multirate(self.scheduler.multirate)
+
+    def _advance(self, dt: float, scheduler: Scheduler | None = None) -> None:
+        if self.flux is not None:
+            self.flux.load()
+        (scheduler or self.scheduler).advance(dt)
+        if self.flux is not None:
+            self.flux.apply(dt)
 
-        organs = [
-            self.heart, self.lungs, self.brain, self.kidneys, self.liver,
-            self.muscles, self.pancreas, self.fat, self.stomach,
-            self.intestines, self.skin, self.spleen, self.bladder, self.gall_bladder
-        ]
-        
         total_energy_expenditure = 0
-        for organ in organs:
-            organ.update(dt)
+        for organ in self.organs.values():
             total_energy_expenditure += organ.energy_demand * (dt / 3600)  # Convert to kcal/step
         
         self.total_caloric_expenditure += total_energy_expenditure
         
         self.blood.update(dt)
-        
-        return dt
+
+    def state_fields(self) -> list[str]:
+        fields = [f"Blood.{name}" for name in Blood.state_fields]
+        fields.extend(f"Blood.{species.name}_amount" for species in SPECIES)
+        for organ_name, organ in self.organs.items():
+            fields.extend(f"{organ_name}.{name}" for name in organ.state_fields)
+        fields.extend(
+            ["Body.total_caloric_expenditure", "Body.is_exercising", "Body.is_sleeping"]
+        )
+        return fields
+
+    def get_state(self) -> list[float]:
+        # Values in state_fields() order
+        blood = self.blood
+        state = [getattr(blood, name) for name in Blood.state_fields]
+        state.extend(blood.amounts)
+        for organ in self.organs.values():
+            state.extend([getattr(organ, name) for name in organ.state_fields])
+        state.extend(
+            [
+                self.total_caloric_expenditure,
+                float(self.is_exercising),
+                float(self.is_sleeping),
+            ]
+        )
+        return state
+
+    def set_state(self, state: Sequence[float]) -> None:
+        blood = self.blood
+        values = iter(state)
+        for name in Blood.state_fields:
+            setattr(blood, name, next(values))
+        for i in range(len(blood.amounts)):
+            blood.amounts[i] = next(values)
+        for organ in self.organs.values():
+            for name in organ.state_fields:
+                setattr(organ, name, next(values))
+        self.total_caloric_expenditure = next(values)
+        self.is_exercising = bool(next(values))
+        self.is_sleeping = bool(next(values))
+
+    def set_parameter(self, path: str, value: float) -> None:
+        # Paths as in state_fields(), e.g. "Fat.lipolysis_rate" or "Blood.volume"
+        section, name = path.split(".", 1)
+        if section == "Blood":
+            target = self.blood
+        elif section == "Body":
+            target = self
+        else:
+            target = self.organs[section]
+        if not hasattr(target, name):
+            raise ValueError(f"Unknown parameter: {path}")
+        setattr(target, name, value)
+
+    def run(
+        self, duration: float, record: list[str] | None = None, every: float = 1.0
+    ) -> list[dict]:
+        # Advance `duration` seconds without pacing, sampling every `every` seconds.
+        # `record` lists metric paths such as "Blood/glucose_concentration";
+        # without it each sample is a full get_metrics() dict.
+        steps = round(duration / self.dt)
+        sample_every = max(1, round(every / self.dt))
+
+        trajectory = []
+        for i in range(1, steps + 1):
+            self.step()
+            if i % sample_every == 0:
+                trajectory.append(self.sample(record))
+        return trajectory
+
+    def sample(self, record: list[str] | None = None) -> dict:
+        if record is None:
+            return self.get_metrics()
+        sample = {"Time": self.time}
+        sample.update(self.get_metric_values(record))
+        return sample
+
+    def get_metric_values(self, paths: list[str]) -> dict[str, float]:
+        # Only the sections named in `paths` are built, e.g. recording
+        # "Organs/Heart/pumping_rate" skips every other organ's metrics.
+        sections: dict[str, dict] = {}
+        values = {}
+        for path in paths:
+            keys = path.split("/")
+            section = "/".join(keys[:2]) if keys[0] == "Organs" else keys[0]
+            if section not in sections:
+                sections[section] = self.section_metrics(section)
+            metric = sections[section]
+            for key in keys[2:] if keys[0] == "Organs" else keys[1:]:
+                metric = metric[key]
+            values[path] = metric["value"]
+        return values
+
+    def metric_sections(self) -> list[str]:
+        # Parts of get_metrics() that are built separately, in its order
+        return ["Time", "Energy", "Blood", *(f"Organs/{name}" for name in self.organs)]
+
+    def section_metrics(self, section: str) -> dict:
+        # The get_metrics() part of one of metric_sections()
+        if section == "Time":
+            return {"value": self.time, "unit": "s"}
+        if section == "Energy":
+            return self._energy_metrics()
+        if section == "Blood":
+            return self.blood.get_metrics()
+        return self.organs[section.split("/")[1]].get_metrics()
+
+    def _energy_metrics(self) -> dict:
+        # No projection before the first step
+        daily = 0.0
+        if self.time:
+            daily = self.total_caloric_expenditure * 60 * 60 * 24 / self.time
+        return {
+            "Total Caloric Expenditure": {"value": self.total_caloric_expenditure, "unit": "kcal"},
+            "Daily Projected Caloric Expenditure": {"value": daily, "unit": "kcal"},
+        }
 
     def get_metrics(self):
         metrics = {
             "Time": {"value": self.time, "unit": "s"},
-            "Energy": {
-                "Total Caloric Expenditure": {"value": self.total_caloric_expenditure, "unit": "kcal"},
-                "Daily Projected Caloric Expenditure": {"value": self.total_caloric_expenditure * 60 * 60 * 24 / self.time, "unit": "kcal"},
-            },
+            "Energy": self._energy_metrics(),
             "Blood": self.blood.get_metrics(),
             "Organs": {}
         }
-        
-        organs = {
-            "Heart": self.heart,
-            "Lungs": self.lungs,
-            "Brain": self.brain,
-            "Kidneys": self.kidneys,
-            "Liver": self.liver,
-            "Muscles": self.muscles,
-            "Pancreas": self.pancreas,
-            "Fat": self.fat,
-            "Stomach": self.stomach,
-            "Intestines": self.intestines,
-            "Skin": self.skin,
-            "Spleen": self.spleen,
-            "Bladder": self.bladder,
-            "GallBladder": self.gall_bladder,
-        }
-        
-        for organ_name, organ in organs.items():
+
+        for organ_name, organ in self.organs.items():
             metrics["Organs"][organ_name] = organ.get_metrics()
         
         return metrics
 
+    def _require(self, name: str):
+        organ = self.organs.get(name)
+        if organ is None:
+            raise ValueError(f"This body has no {name}")
+        return organ
+
     def drink(self, water_amount: float):
-        self.stomach.receive_water(water_amount)
+        self._require("Stomach").receive_water(water_amount)
 
     def eat(self, food_amount: float):
-        self.stomach.receive_food(carbs=food_amount)
+        self._require("Stomach").receive_food(carbs=food_amount)
 
     def pee(self):
-        self.bladder.urinate()
+        self._require("Bladder").urinate()
+
+    def apply_action(self, data: dict) -> None:
+        # Actions as sent by the dashboard, e.g. {"action": "eat", "amount": 50}
+        action = data["action"]
+        if action == "start_exercise":
+            self.start_exercise()
+        elif action == "stop_exercise":
+            self.stop_exercise()
+        elif action == "sleep":
+            self.sleep()
+        elif action == "wake":
+            self.wake()
+        elif action == "drink":
+            self.drink(float(data["amount"]))
+        elif action == "eat":
+            self.eat(float(data["amount"]))
+        elif action == "pee":
+            self.pee()
+        else:
+            raise ValueError(f"Unknown action: {action}")
@@ -1,8 +1,17 @@
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Bones(Organ):
+    state_fields = Organ.state_fields + (
+        "calcium_content",
+    )
+
+    processes = Organ.processes + (
+        "_store_minerals",
+        "_produce_blood_cells",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -11,14 +20,12 @@ class Bones(Organ):
         )
         self.calcium_content = 1000  # g
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._store_minerals(dt)
-        self._produce_blood_cells(dt)
-
+    @placeholder
     def _store_minerals(self, dt: float):
         # Placeholder for storing minerals (calcium, phosphate)
         pass
 
+    @placeholder
     def _produce_blood_cells(self, dt: float):
         # Placeholder for producing blood cells (hematopoiesis)
         pass
@@ -3,10 +3,28 @@ from model.heart import Heart
 from model.kidneys import Kidneys
 from model.lungs import Lungs
 from model.muscles import Muscles
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Brain(Organ):
+    state_fields = Organ.state_fields + (
+        "urine_production_signal",
+        "respiratory_rate_signal",
+    )
+
+    processes = Organ.processes + (
+        "_regulate_blood_pressure",
+        "_regulate_respiratory_rate",
+        "_regulate_glucose",
+        "_regulate_body_temperature",
+        "_process_sensory_input",
+        "_control_motor_functions",
+        "_regulate_sleep_wake_cycle",
+        "_regulate_cerebrospinal_fluid",
+        "_regulate_appetite",
+        "_regulate_endocrine_system",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -20,42 +38,37 @@ class Brain(Organ):
         self.urine_production_signal = 0  # New attribute to signal kidneys
         self.respiratory_rate_signal = 0  # New attribute to signal lungs
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._regulate_blood_pressure(dt)
-        self._regulate_respiratory_rate(dt)
-        self._regulate_glucose(dt)
-        self._regulate_body_temperature(dt)
-        self._process_sensory_input(dt)
-        self._control_motor_functions(dt)
-        self._regulate_sleep_wake_cycle(dt)
-        self._regulate_cerebrospinal_fluid(dt)
-        self._regulate_appetite(dt)
-        self._regulate_endocrine_system(dt)
-
+    @placeholder
     def _regulate_body_temperature(self, dt: float):
         # Placeholder for regulating body temperature
         pass
 
+    @placeholder
     def _process_sensory_input(self, dt: float):
         # Placeholder for processing sensory input
         pass
 
+    @placeholder
     def _control_motor_functions(self, dt: float):
         # Placeholder for controlling motor functions
         pass
 
+    @placeholder
     def _regulate_sleep_wake_cycle(self, dt: float):
         # Placeholder for regulating sleep-wake cycle
         pass
 
+    @placeholder
     def _regulate_cerebrospinal_fluid(self, dt: float):
         # Placeholder for regulating cerebrospinal fluid production and circulation
         pass
 
+    @placeholder
     def _regulate_appetite(self, dt: float):
         # Placeholder for regulating appetite
         pass
 
+    @placeholder
     def _regulate_endocrine_system(self, dt: float):
         # Placeholder for regulating endocrine system
         pass
@@ -84,7 +97,8 @@ class Brain(Organ):
         elif map_error < -5:
             self.urine_production_signal = max(-1, self.urine_production_signal - 0.1 * dt)
         else:
-            self.urine_production_signal *= 0.9  # Gradually return to neutral
+            # Gradually return to neutral, by 10% per 0.1 s
+            self.urine_production_signal *= 0.9 ** (dt / 0.1)
 
         # Send signal to kidneys
         if self.kidneys:
@@ -101,7 +115,8 @@ class Brain(Organ):
             elif pco2_error < -0.02:
                 self.respiratory_rate_signal = max(-1, self.respiratory_rate_signal - 0.02 * dt)
             else:
-                self.respiratory_rate_signal *= 0.9  # Gradually return to neutral
+                # Gradually return to neutral, by 10% per 0.1 s
+                self.respiratory_rate_signal *= 0.9 ** (dt / 0.1)
 
             # Send signal to lungs
             self.lungs.receive_brain_signal(self.respiratory_rate_signal)
@@ -140,6 +155,14 @@ class Brain(Organ):
         if self.muscles:
             self.muscles.reset_energy_demand()
 
+    def start_sleep(self):
+        if self.muscles:
+            self.muscles.relax()
+
+    def stop_sleep(self):
+        if self.muscles:
+            self.muscles.reset_energy_demand()
+
     def _organ_specific_metrics(self) -> dict:
         return {
             "urine_production_signal": {"value": self.urine_production_signal, "unit": "", "normal_range": (-1, 1)},
@@ -0,0 +1,702 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from model.blood import SPECIES, SPECIES_SCALES
+from model.body import HumanBody
+from model.liver import DEGRADED_HORMONES
+from model.lut import dissociation_vector, gaussian_vector, log10_vector
+from model.registry import SPECS
+
+
+class Cohort:
+    # Batched counterpart of HumanBody: the state of `size` bodies is held in one
+    # (fields, size) array and every organ update runs as array operations over
+    # all bodies at once. The scalar HumanBody stays the reference model, and
+    # tests/test_cohort.py checks that the two agree.
+    def __init__(self, size: int, body: HumanBody | None = None):
+        template = body if body is not None else HumanBody()
+        if template.spec["organs"].keys() != SPECS["full"]["organs"].keys():
+            raise ValueError("Cohorts mirror the full body only")
+        if template.fidelity != "waveform" or template.scheduler.multirate:
+            raise ValueError(
+                "Cohorts run waveform fidelity with every process each tick"
+            )
+        if template.flux is not None:
+            raise ValueError("Cohorts have no flux accumulation")
+        if any(organ.extra_processes for organ in template.organs.values()):
+            raise ValueError("Cohorts cannot run processes added with add_process")
+        self.size = size
+        self.dt = template.dt
+        self.time = template.time
+
+        # One row per HumanBody state field; the blood species amounts are contiguous
+        self.fields = template.state_fields()
+        self.index = {field: i for i, field in enumerate(self.fields)}
+        self.state = np.repeat(np.array(template.get_state())[:, None], size, axis=1)
+
+        # Row views, named like the HumanBody attributes they mirror. Updates must
+        # write in place (`x[:] = ...` or `x += ...`) to land in self.state.
+        self.blood = self._views("Blood")
+        self.heart = self._views("Heart")
+        self.lungs = self._views("Lungs")
+        self.brain = self._views("Brain")
+        self.kidneys = self._views("Kidneys")
+        self.liver = self._views("Liver")
+        self.muscles = self._views("Muscles")
+        self.pancreas = self._views("Pancreas")
+        self.fat = self._views("Fat")
+        self.stomach = self._views("Stomach")
+        self.intestines = self._views("Intestines")
+        self.skin = self._views("Skin")
+        self.spleen = self._views("Spleen")
+        self.bladder = self._views("Bladder")
+        self.gall_bladder = self._views("GallBladder")
+        self.body = self._views("Body")
+
+        # Rows of the hormones the liver degrades
+        self._degraded_hormones = [
+            self.index[f"Blood.{SPECIES[i].name}_amount"] for i in DEGRADED_HORMONES
+        ]
+
+        # Same order as HumanBody.step()
+        self.organs = [
+            self.heart,
+            self.lungs,
+            self.brain,
+            self.kidneys,
+            self.liver,
+            self.muscles,
+            self.pancreas,
+            self.fat,
+            self.stomach,
+            self.intestines,
+            self.skin,
+            self.spleen,
+            self.bladder,
+            self.gall_bladder,
+        ]
+
+    def _views(self, section: str) -> SimpleNamespace:
+        prefix = section + "."
+        return SimpleNamespace(
+            **{
+                field[len(prefix) :]: self.state[i]
+                for i, field in enumerate(self.fields)
+                if field.startswith(prefix)
+            }
+        )
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.state[self.index[field]]
+
+    def __setitem__(self, field: str, values) -> None:
+        self.state[self.index[field]] = values
+
+    def _concentration(self, amount: np.ndarray, scale: float) -> np.ndarray:
+        return amount / (self.blood.volume / scale)
+
+    def concentrations(self) -> np.ndarray:
+        # (species, size) concentrations in SPECIES order, in one division
+        start = self.index[f"Blood.{SPECIES[0].name}_amount"]
+        amounts = self.state[start : start + len(SPECIES)]
+        return amounts / (self.blood.volume / np.array(SPECIES_SCALES)[:, None])
+
+    def start_exercise(self):
+        self.body.is_exercising[:] = 1
+        self.muscles.energy_demand[:] = self.muscles.base_energy_demand * 3
+        self.muscles.glucose_uptake_rate[:] = 2 + 18 * (3 - 1)
+
+    def stop_exercise(self):
+        # Sleeping members go back to the relaxed demand, as in HumanBody
+        sleeping = self.body.is_sleeping == 1
+        self.body.is_exercising[:] = 0
+        self.muscles.energy_demand[:] = self.muscles.base_energy_demand * np.where(
+            sleeping, 0.8, 1
+        )
+        self.muscles.glucose_uptake_rate[:] = np.where(sleeping, 1.5, 2)
+
+    def sleep(self):
+        self.body.is_sleeping[:] = 1
+        self.muscles.energy_demand[:] = self.muscles.base_energy_demand * 0.8
+        self.muscles.glucose_uptake_rate[:] = 1.5
+
+    def wake(self):
+        # Exercising members keep the exercise demand, as in HumanBody
+        exercising = self.body.is_exercising == 1
+        self.body.is_sleeping[:] = 0
+        self.muscles.energy_demand[:] = self.muscles.base_energy_demand * np.where(
+            exercising, 3, 1
+        )
+        self.muscles.glucose_uptake_rate[:] = np.where(exercising, 2 + 18 * (3 - 1), 2)
+
+    def drink(self, water_amount):
+        self.stomach.water_content[:] += water_amount
+
+    def eat(self, food_amount):
+        self.stomach.carbohydrate_content[:] += food_amount
+
+    def pee(self):
+        self.bladder.urine_volume[:] = 0
+
+    def step(self) -> float:
+        dt = self.dt
+
+        self.time += dt
+
+        for organ in self.organs:
+            self._consume_nutrients(organ, dt)
+            self._process_insulin(organ, dt)
+            if organ is self.heart:
+                self._heart(dt)
+            elif organ is self.lungs:
+                self._lungs(dt)
+            elif organ is self.brain:
+                self._brain(dt)
+            elif organ is self.kidneys:
+                self._kidneys(dt)
+            elif organ is self.liver:
+                self._liver(dt)
+            elif organ is self.pancreas:
+                self._pancreas(dt)
+            elif organ is self.fat:
+                self._fat(dt)
+            elif organ is self.stomach:
+                self._stomach(dt)
+            elif organ is self.intestines:
+                self._intestines(dt)
+            elif organ is self.gall_bladder:
+                self._gall_bladder(dt)
+
+        total_energy_expenditure = sum(organ.energy_demand for organ in self.organs) * (
+            dt / 3600
+        )
+        self.body.total_caloric_expenditure[:] += total_energy_expenditure
+
+        self._update_blood(dt)
+
+        return dt
+
+    def run(self, duration: float) -> None:
+        for _ in range(round(duration / self.dt)):
+            self.step()
+
+    def _consume_nutrients(self, organ: SimpleNamespace, dt: float) -> None:
+        blood = self.blood
+        energy_demanded = organ.energy_demand * dt / 3600  # kcal
+
+        consumed = []
+        # Glucose first, then fats, amino acids as a last resort (see
+        # Organ.consume_nutrients)
+        sources = [
+            (blood.glucose_amount, 4),
+            (blood.fatty_acid_amount, 9),
+            (blood.triglyceride_amount, 9),
+            (blood.cholesterol_amount, 9),
+            (blood.phospholipid_amount, 9),
+            (blood.amino_acid_amount, 4),
+        ]
+        for available, kcal_per_g in sources:
+            energy = np.where(
+                energy_demanded > 0,
+                np.minimum(energy_demanded, available * kcal_per_g / 1000),
+                0,
+            )
+            consumed.append(energy * 1000 / kcal_per_g)  # mg
+            energy_demanded = energy_demanded - energy
+        glucose, fatty_acid, triglyceride, cholesterol, phospholipid, amino_acid = (
+            consumed
+        )
+
+        total_energy = (
+            glucose * 4
+            + (fatty_acid + triglyceride + cholesterol + phospholipid) * 9
+            + amino_acid * 4
+        ) / 1000  # kcal
+        total_consumed = (
+            glucose
+            + fatty_acid
+            + triglyceride
+            + cholesterol
+            + phospholipid
+            + amino_acid
+        )
+        rq_numerator = (
+            glucose * 1.0
+            + (fatty_acid + triglyceride + cholesterol + phospholipid) * 0.7
+            + amino_acid * 0.8
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rq = np.where(total_energy > 0, rq_numerator / total_consumed, 0.85)
+
+        oxygen_consumed = total_energy * 0.2 / rq
+        limited = oxygen_consumed > blood.o2_amount
+        if limited.any():
+            oxygen_consumed = np.where(limited, blood.o2_amount, oxygen_consumed)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scale = np.where(limited, oxygen_consumed * rq / 0.2 / total_energy, 1)
+            consumed = [amount * scale for amount in consumed]
+            glucose, fatty_acid, triglyceride, cholesterol, phospholipid, amino_acid = (
+                consumed
+            )
+
+        blood.co2_amount += oxygen_consumed * rq
+        blood.glucose_amount -= glucose
+        blood.fatty_acid_amount -= fatty_acid
+        blood.triglyceride_amount -= triglyceride
+        blood.cholesterol_amount -= cholesterol
+        blood.phospholipid_amount -= phospholipid
+        blood.amino_acid_amount -= amino_acid
+        blood.o2_amount -= oxygen_consumed
+
+    def _process_insulin(self, organ: SimpleNamespace, dt: float) -> None:
+        blood = self.blood
+        insulin_effect = (
+            self._concentration(blood.insulin_amount, 1000) * organ.insulin_sensitivity
+        )
+        glucose_uptake = np.minimum(
+            organ.energy_demand * dt / 3600 * 1000 / 4 * insulin_effect / 10,
+            blood.glucose_amount * 0.1,
+        )
+        blood.glucose_amount -= glucose_uptake
+        blood.insulin_amount[:] = np.maximum(
+            0, blood.insulin_amount - glucose_uptake * 0.001
+        )
+
+    def _heart(self, dt: float) -> None:
+        blood, heart = self.blood, self.heart
+
+        # Cardiac cycle
+        beat_period = 60 / heart.pumping_rate
+        heart.time_since_last_beat[:] = np.mod(
+            heart.time_since_last_beat + dt, beat_period
+        )
+        beat_phase = heart.time_since_last_beat / beat_period
+        relaxation_rate = np.where(beat_phase < 0.5, 5, 1)
+        heart.compression[:] = np.where(
+            beat_phase < 0.3,
+            gaussian_vector((beat_phase - 0.15) / 0.1),
+            heart.compression * np.exp(-relaxation_rate * dt),
+        )
+
+        # Vascular system
+        heart.cardiac_output[:] = (heart.stroke_volume * heart.pumping_rate) / 1000
+        epinephrine_effect = 1 + 0.01 * (
+            self._concentration(blood.epinephrine_amount, 1000) - 1
+        )
+        volume_effect = 1 - 0.01 * (blood.volume / 5000 - 1)
+        heart.peripheral_resistance[:] = (
+            heart.base_peripheral_resistance * epinephrine_effect * volume_effect
+        )
+        mean_arterial_pressure = (
+            heart.cardiac_output * heart.peripheral_resistance
+        ) / 80
+        pulse_pressure = heart.stroke_volume / 1.5
+        blood.systolic_pressure[:] = mean_arterial_pressure + (pulse_pressure / 2)
+        blood.diastolic_pressure[:] = mean_arterial_pressure - (pulse_pressure / 2)
+
+    def _lungs(self, dt: float) -> None:
+        blood, lungs = self.blood, self.lungs
+
+        # Breathing motion and alveolar air renewal
+        breath_period = 60 / lungs.respiratory_rate
+        lungs.time_since_last_breath[:] = np.mod(
+            lungs.time_since_last_breath + dt, breath_period
+        )
+        lungs.previous_expansion[:] = lungs.expansion
+        breath_phase = lungs.time_since_last_breath / breath_period
+        lungs.expansion[:] = 0.5 * (1 + np.sin(2 * np.pi * breath_phase - np.pi / 2))
+        volume_delta = lungs.tidal_volume * (lungs.expansion - lungs.previous_expansion)
+        alveolar_volume = (
+            lungs.functional_residual_capacity + lungs.tidal_volume * lungs.expansion
+        )
+        fresh_fraction = np.where(volume_delta > 0, volume_delta / alveolar_volume, 0)
+        lungs.alveolar_po2[:] = (
+            1 - fresh_fraction
+        ) * lungs.alveolar_po2 + fresh_fraction * 104
+        lungs.alveolar_pco2[:] = (
+            1 - fresh_fraction
+        ) * lungs.alveolar_pco2 + fresh_fraction * 36
+
+        # O2 and CO2 diffusion, solved exactly over dt as in
+        # Lungs._simulate_gas_exchange
+        mmhg_per_mmol = 760 / (22.4 * alveolar_volume / 1000)
+        total_oxygen_capacity = blood.hemoglobin * 1.34 * (blood.volume / 100)
+        saturation = blood.o2_amount / total_oxygen_capacity * 100
+        blood_po2 = dissociation_vector(saturation)
+        blood_mmhg_per_mmol = (
+            np.maximum(
+                100
+                * 2.8
+                * saturation**1.8
+                * 26**2.8
+                / (saturation**2.8 + 26**2.8) ** 2,
+                0,
+            )
+            * 100
+            / total_oxygen_capacity
+        )
+        o2_conductance = 0.0446 * lungs.diffusion_capacity_o2 / 60
+        rate = o2_conductance * (mmhg_per_mmol + blood_mmhg_per_mmol)
+        diffusing = rate > 0
+        diffusable_o2 = np.where(
+            diffusing,
+            o2_conductance
+            * (lungs.alveolar_po2 - blood_po2)
+            * -np.expm1(-rate * dt)
+            / np.where(diffusing, rate, 1),
+            0,
+        )
+        diffused_o2 = np.minimum(
+            np.maximum(diffusable_o2, 0), total_oxygen_capacity - blood.o2_amount
+        )
+        blood.o2_amount += diffused_o2
+        lungs.alveolar_po2 -= diffused_o2 * mmhg_per_mmol
+
+        # Without ventilation the CO2 total is conserved and the gradient
+        # decays. CO2 only diffuses out of the blood.
+        co2_conductance = 0.0446 * lungs.diffusion_capacity_co2 / 60
+        a = co2_conductance / (0.03 * blood.volume / 1000)
+        b = co2_conductance * mmhg_per_mmol
+        blood_pco2 = np.maximum(
+            self._concentration(blood.co2_amount, 1000) / 0.03, 1e-6
+        )
+        diffusing = (blood_pco2 >= lungs.alveolar_pco2) & (a + b > 0)
+        closing = -np.expm1(-(a + b) * dt) / np.where(diffusing, a + b, 1)
+        closed = np.where(diffusing, (blood_pco2 - lungs.alveolar_pco2) * closing, 0)
+        blood.co2_amount[:] = np.where(
+            diffusing,
+            (blood_pco2 - a * closed) * 0.03 * blood.volume / 1000,
+            blood.co2_amount,
+        )
+        lungs.alveolar_pco2 += b * closed
+
+    def _brain(self, dt: float) -> None:
+        blood, brain = self.blood, self.brain
+
+        # Blood pressure (baroreceptor reflex on heart rate, epinephrine and urine
+        # production)
+        map_error = (blood.systolic_pressure + 2 * blood.diastolic_pressure) / 3 - 90
+        self.heart.pumping_rate *= 1 - map_error * 0.01 * 0.1
+        blood.epinephrine_amount *= np.where(
+            map_error < -5, 1 + 0.01 * dt, np.where(map_error > 5, 1 - 0.01 * dt, 1)
+        )
+        brain.urine_production_signal[:] = np.where(
+            map_error > 5,
+            np.minimum(1, brain.urine_production_signal + 0.1 * dt),
+            np.where(
+                map_error < -5,
+                np.maximum(-1, brain.urine_production_signal - 0.1 * dt),
+                brain.urine_production_signal * 0.9,
+            ),
+        )
+        self.kidneys.glomerular_filtration_rate[:] = np.clip(
+            115 * (1 + brain.urine_production_signal * 0.02), 60, 180
+        )
+        self.kidneys.tubular_reabsorption_rate[:] = np.clip(
+            114 * (1 - brain.urine_production_signal * 0.02), 59, 179
+        )
+
+        # Respiratory rate
+        pco2_error = (
+            np.maximum(self._concentration(blood.co2_amount, 1000) / 0.03, 1e-6) - 40
+        )
+        brain.respiratory_rate_signal[:] = np.where(
+            pco2_error > 0.02,
+            np.minimum(1, brain.respiratory_rate_signal + 0.02 * dt),
+            np.where(
+                pco2_error < -0.02,
+                np.maximum(-1, brain.respiratory_rate_signal - 0.02 * dt),
+                brain.respiratory_rate_signal * 0.9,
+            ),
+        )
+        extra_tidal_volume = 500 * brain.respiratory_rate_signal * 0.1
+        self.lungs.respiratory_rate[:] = np.clip(
+            12 * (1 + brain.respiratory_rate_signal * 0.6), 8, 30
+        )
+        self.lungs.tidal_volume[:] = np.clip(500 - extra_tidal_volume, 300, 800)
+        self.lungs.functional_residual_capacity[:] = 2500 + extra_tidal_volume
+
+        # Glucose
+        glucose_concentration = self._concentration(blood.glucose_amount, 100)
+        low = glucose_concentration < 72
+        high = glucose_concentration > 130
+        blood.glucagon_amount += np.where(low, 0.01 * dt * (blood.volume / 1000), 0)
+        blood.epinephrine_amount *= np.where(low, 1 + 0.001 * dt, 1)
+        blood.insulin_amount += np.where(high, 0.1 * dt * (blood.volume / 1000), 0)
+        blood.glucose_amount -= np.minimum(
+            brain.energy_demand * dt / 3600 * 1000 / 4, blood.glucose_amount * 0.1
+        )
+
+    def _kidneys(self, dt: float) -> None:
+        blood, kidneys = self.blood, self.kidneys
+
+        # Filtration
+        filtered_volume = kidneys.glomerular_filtration_rate * dt / 60
+        reabsorbed_volume = kidneys.tubular_reabsorption_rate * dt / 60
+        urine_volume = np.maximum(filtered_volume - reabsorbed_volume, 0)
+        blood.volume -= urine_volume
+        blood.urea_amount -= (
+            urine_volume / 10 * self._concentration(blood.urea_amount, 100)
+        )
+        blood.creatinine_amount -= (
+            urine_volume / 10 * self._concentration(blood.creatinine_amount, 100)
+        )
+        kidneys.urine_production_rate[:] = urine_volume / (dt / 60)
+        self.bladder.urine_volume[:] = np.minimum(
+            self.bladder.urine_volume + urine_volume, self.bladder.max_capacity
+        )
+        blood.sodium_amount -= (
+            urine_volume
+            / 1000
+            * self._concentration(blood.sodium_amount, 1000)
+            * (1 - kidneys.sodium_reabsorption_rate)
+        )
+        blood.potassium_amount += kidneys.potassium_secretion_rate * dt / 60
+        blood.calcium_amount -= (
+            urine_volume
+            / 1000
+            * self._concentration(blood.calcium_amount, 1000)
+            * (1 - kidneys.calcium_reabsorption_rate)
+        )
+        blood.phosphate_amount -= (
+            urine_volume
+            / 10
+            * self._concentration(blood.phosphate_amount, 100)
+            * (1 - kidneys.phosphate_reabsorption_rate)
+        )
+
+        # Acid-base balance
+        blood.bicarbonate_amount += np.where(
+            blood.ph < 7.35, 0.1 * dt / 60, np.where(blood.ph > 7.45, -0.1 * dt / 60, 0)
+        )
+
+        # Hormones
+        oxygen_saturation = blood.o2_amount / (
+            blood.hemoglobin * 1.34 * (blood.volume / 100)
+        )
+        blood.erythropoietin_amount += np.where(
+            oxygen_saturation < 0.9, kidneys.erythropoietin_production_rate * dt / 60, 0
+        )
+        mean_arterial_pressure = (
+            blood.systolic_pressure + 2 * blood.diastolic_pressure
+        ) / 3
+        blood.renin_amount += np.where(
+            mean_arterial_pressure < 80, kidneys.renin_production_rate * dt / 60, 0
+        )
+
+        # Vitamin D activation, excretion and degradation
+        calcium_factor = np.clip(
+            self._concentration(blood.calcium_amount, 1000) / 10, 0.1, 1.0
+        )
+        phosphate_factor = np.clip(blood.phosphate_amount / 4, 0.1, 1.0)
+        max_activation = (
+            kidneys.vitamin_d_activation_rate
+            * dt
+            / 60
+            * calcium_factor
+            * phosphate_factor
+        )
+        activated_amount = np.minimum(blood.inactive_vitamin_d_amount, max_activation)
+        blood.inactive_vitamin_d_amount -= activated_amount
+        blood.active_vitamin_d_amount += activated_amount
+        blood.inactive_vitamin_d_amount *= np.exp(-0.001 * dt / 60)
+        blood.active_vitamin_d_amount *= np.exp(-0.002 * dt / 60)
+
+    def _liver(self, dt: float) -> None:
+        blood, liver = self.blood, self.liver
+        insulin_effect = (
+            self._concentration(blood.insulin_amount, 1000) * liver.insulin_sensitivity
+        )
+        glucagon_effect = (
+            self._concentration(blood.glucagon_amount, 1000)
+            * liver.glucagon_sensitivity
+        )
+
+        # Glycogenesis, or glycogenolysis when glucose is low
+        glucose_concentration = self._concentration(blood.glucose_amount, 100)
+        stored = np.where(
+            glucose_concentration > 100,
+            np.minimum(blood.glucose_amount * 0.1, 10 * insulin_effect * dt),
+            0,
+        )
+        released = np.where(
+            (glucose_concentration <= 100)
+            & (glucose_concentration < 72)
+            & (liver.glucose_storage > 0),
+            np.minimum(
+                np.minimum(72 - glucose_concentration, liver.glucose_storage * 1000),
+                10 * glucagon_effect * dt,
+            ),
+            0,
+        )
+        blood.glucose_amount += released - stored
+        liver.glucose_storage += (stored - released) / 1000
+
+        # Gluconeogenesis
+        glucose_concentration = self._concentration(blood.glucose_amount, 100)
+        blood.glucose_amount += np.where(
+            glucose_concentration < 60, 5 * dt / 60 * glucagon_effect, 0
+        )
+
+        # Glucose export to blood
+        glucose_concentration = self._concentration(blood.glucose_amount, 100)
+        exported = np.where(
+            glucose_concentration < 90,
+            np.minimum(
+                liver.glucose_storage * 1000 * 0.01, (90 - glucose_concentration) * 10
+            )
+            * dt
+            / 60,
+            0,
+        )
+        blood.glucose_amount += exported
+        liver.glucose_storage -= exported / 1000
+
+        # Urea cycle
+        blood.ammonia_amount[:] = np.maximum(0, blood.ammonia_amount - 0.01 * dt)
+        blood.urea_amount += 0.01 * dt * 0.8
+
+        # Bile production
+        secreting = self._concentration(blood.secretin_amount, 1000) > 1.0
+        self.gall_bladder.bile_storage += np.where(secreting, 0.1 * dt, 0)
+
+        # Hormone degradation
+        self.state[self._degraded_hormones] *= np.exp(-0.01 / 60 * dt)
+
+    def _pancreas(self, dt: float) -> None:
+        blood = self.blood
+        glucose_concentration = self._concentration(blood.glucose_amount, 100)
+        blood.insulin_amount += (
+            (0.5 + np.maximum(0, (glucose_concentration - 100) * 0.05)) * dt / 60
+        )
+        blood.glucagon_amount += (
+            (0.1 + np.maximum(0, (80 - glucose_concentration) * 0.01)) * dt / 60
+        )
+
+    def _fat(self, dt: float) -> None:
+        blood, fat = self.blood, self.fat
+
+        # Fat storage
+        storing = (self._concentration(blood.glucose_amount, 100) > 120) & (
+            self._concentration(blood.insulin_amount, 1000) > 1.0
+        )
+        glucose_stored = np.where(
+            storing,
+            np.minimum(blood.glucose_amount * 0.1, 10 * dt * fat.insulin_sensitivity),
+            0,
+        )
+        fat_stored = glucose_stored * 0.11 / 1000
+        blood.glucose_amount -= glucose_stored
+        fat.fat_reserve += fat_stored
+        blood.triglyceride_amount += fat_stored * 1000
+
+        # Lipolysis
+        glucose_concentration = self._concentration(blood.glucose_amount, 100)
+        releasing = (glucose_concentration < 80) | (
+            self._concentration(blood.glucagon_amount, 1000) > 1.0
+        )
+        lipolysis_factor = np.maximum(1, (80 - glucose_concentration) / 10)
+        fat_released = np.where(
+            releasing,
+            np.minimum(
+                fat.lipolysis_rate * lipolysis_factor * dt / 60, fat.fat_reserve
+            ),
+            0,
+        )
+        fat.fat_reserve -= fat_released
+        triglycerides_released = fat_released * 1000
+        fatty_acids_released = triglycerides_released * 0.1
+        blood.fatty_acid_amount += fatty_acids_released
+        blood.triglyceride_amount += triglycerides_released - fatty_acids_released
+
+    def _stomach(self, dt: float) -> None:
+        blood, stomach, intestines = self.blood, self.stomach, self.intestines
+        contents = [
+            stomach.carbohydrate_content,
+            stomach.protein_content,
+            stomach.fat_content,
+            stomach.fiber_content,
+        ]
+        received = [
+            intestines.carbohydrate_content,
+            intestines.protein_content,
+            intestines.fat_content,
+            intestines.fiber_content,
+        ]
+
+        # Motility
+        food_content = sum(contents)
+        stomach.energy_demand[:] = 3 + food_content / 1000
+
+        # Digestion
+        digestion_fraction = np.where(food_content > 0, -np.expm1(-0.03 * dt / 60), 0)
+        for content, destination in zip(contents, received, strict=True):
+            digested = content * digestion_fraction
+            content -= digested
+            destination += digested
+
+        # Water passed to the intestines
+        water_passed = np.minimum(stomach.water_content, 8 * dt)
+        water_passed = np.where(stomach.water_content > 0, water_passed, 0)
+        stomach.water_content -= water_passed
+        intestines.water_content += water_passed
+
+        # Gastrin and ghrelin
+        food_content = sum(contents)
+        blood.gastrin_amount += np.where(food_content > 0, 0.1 * dt, 0)
+        blood.ghrelin_amount[:] = np.where(
+            food_content == 0,
+            blood.ghrelin_amount + 0.1 * dt,
+            np.maximum(0, blood.ghrelin_amount - 0.1 * dt),
+        )
+
+        # Direct water absorption
+        absorbed_water = np.minimum(stomach.water_content, 2 * dt / 60)
+        stomach.water_content -= absorbed_water
+        blood.volume += absorbed_water
+
+    def _intestines(self, dt: float) -> None:
+        blood, intestines = self.blood, self.intestines
+        nutrients = [
+            (intestines.carbohydrate_content, blood.glucose_amount),
+            (intestines.protein_content, blood.amino_acid_amount),
+            (intestines.fat_content, blood.fatty_acid_amount),
+        ]
+        for content, destination in nutrients:
+            absorbed = np.where(
+                content > 0, content * -np.expm1(-intestines.absorption_rate * dt), 0
+            )
+            content -= absorbed
+            destination += absorbed * 1000
+
+        absorbed_water = np.where(
+            intestines.water_content > 0,
+            np.minimum(intestines.water_content, intestines.water_absorption_rate * dt),
+            0,
+        )
+        intestines.water_content -= absorbed_water
+        blood.volume += absorbed_water
+
+        blood.cholecystokinin_amount += np.where(
+            intestines.fat_content > 0, 0.1 * dt, 0
+        )
+        blood.secretin_amount += np.where(intestines.protein_content > 0, 0.1 * dt, 0)
+
+    def _gall_bladder(self, dt: float) -> None:
+        bile_released = np.minimum(self.gall_bladder.bile_storage, 0.1 * dt)
+        self.gall_bladder.bile_storage -= bile_released
+        self.intestines.bile_content += bile_released
+
+    def _update_blood(self, dt: float) -> None:
+        blood = self.blood
+        bicarbonate_concentration = self._concentration(blood.bicarbonate_amount, 1000)
+        pco2 = np.maximum(self._concentration(blood.co2_amount, 1000) / 0.03, 1e-6)
+        new_ph = 6.1 + log10_vector(
+            np.maximum(bicarbonate_concentration, 1e-6) / (0.03 * pco2)
+        )
+        blood.ph += (new_ph - blood.ph) * 0.1 * dt / 60
+        bicarbonate_change = (blood.ph - 7.4) * 0.5 * dt / 60 * (blood.volume / 1000)
+        blood.bicarbonate_amount[:] = np.maximum(
+            blood.bicarbonate_amount + bicarbonate_change, 0
+        )
@@ -0,0 +1,172 @@
+import contextlib
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from model.body import HumanBody
+from model.scheduler import Scheduler
+from model.snapshot import load, save, snapshot
+
+# State that settles within minutes around the slower stores (nutrients,
+# hormones, glycogen, fat, urea), which are held fixed while solving
+FAST_FIELDS = (
+    "Blood.systolic_pressure",
+    "Blood.diastolic_pressure",
+    "Blood.ph",
+    "Blood.bicarbonate_amount",
+    "Blood.o2_amount",
+    "Blood.co2_amount",
+    "Heart.pumping_rate",
+    "Heart.cardiac_output",
+    "Heart.peripheral_resistance",
+    "Lungs.tidal_volume",
+    "Lungs.respiratory_rate",
+    "Lungs.alveolar_po2",
+    "Lungs.alveolar_pco2",
+    "Lungs.functional_residual_capacity",
+    "Brain.urine_production_signal",
+    "Brain.respiratory_rate_signal",
+    "Kidneys.glomerular_filtration_rate",
+    "Kidneys.tubular_reabsorption_rate",
+    "Kidneys.urine_production_rate",
+)
+
+CACHE_DIR = Path(os.environ.get("HUPHYS_CACHE_DIR", Path.home() / ".cache" / "huphys"))
+# Largest relative rate of change of the fast state at a solved equilibrium, 1/s
+TOLERANCE = 1e-9
+# Solved bodies kept in the cache; the least recently used go first
+CACHE_SIZE = int(os.environ.get("HUPHYS_CACHE_SIZE", 256))
+# Hash of the model sources, part of every cache key, so that equilibria solved
+# with older organ code are never loaded
+MODEL_VERSION = hashlib.sha256(
+    b"".join(path.read_bytes() for path in sorted(Path(__file__).parent.glob("*.py")))
+).digest()
+
+
+class FastSubsystem:
+    # The FAST_FIELDS part of the body as y -> rate of change over one tick, with
+    # the rest of the state held. Heart and lungs run averaged, so the waveform
+    # phase does not enter.
+    def __init__(self, body: HumanBody):
+        self.body = body
+        fields = body.state_fields()
+        # Reduced bodies solve the fast fields of the organs they have
+        self.indices = np.array(
+            [fields.index(field) for field in FAST_FIELDS if field in fields]
+        )
+        self.base = np.array(body.get_state())
+        self.scheduler = Scheduler(body.organs)
+
+    def state(self) -> np.ndarray:
+        return self.base[self.indices]
+
+    def load(self, y: np.ndarray) -> None:
+        full = self.base.copy()
+        full[self.indices] = y
+        self.body.set_state(full.tolist())
+
+    def rate(self, y: np.ndarray) -> np.ndarray:
+        body = self.body
+        self.load(y)
+        body._advance(body.dt, self.scheduler)
+        return (np.array(body.get_state())[self.indices] - y) / body.dt
+
+
+def solve(body: HumanBody, tol: float = TOLERANCE, max_iterations: int = 100) -> float:
+    # Moves the fast state of `body` to its fixed point by damped Newton
+    # iteration with a finite-difference Jacobian. Where the iteration stalls
+    # (the controllers have dead bands and clamps), it relaxes the fast state
+    # with ordinary ticks for a while and tries again. Returns the remaining
+    # relative rate of change, at most `tol` if it converged.
+    fidelity = body.fidelity
+    body.set_fidelity("averaged")
+    system = FastSubsystem(body)
+    y = system.state()
+    scale = np.maximum(np.abs(y), 1.0)
+
+    def norm(rate: np.ndarray) -> float:
+        return float(np.max(np.abs(rate) / scale))
+
+    rate = system.rate(y)
+    iterations = 0
+    while norm(rate) > tol and iterations < max_iterations:
+        iterations += 1
+        jacobian = np.empty((len(y), len(y)))
+        for i in range(len(y)):
+            delta = 1e-7 * scale[i]
+            perturbed = y.copy()
+            perturbed[i] += delta
+            jacobian[:, i] = (system.rate(perturbed) - rate) / delta
+        # Least squares, since clamped controllers make the Jacobian singular
+        newton = np.linalg.lstsq(jacobian, -rate, rcond=None)[0]
+
+        step = 1.0
+        while step > 1e-3:
+            candidate = y + step * newton
+            candidate_rate = system.rate(candidate)
+            if norm(candidate_rate) < norm(rate):
+                y, rate = candidate, candidate_rate
+                break
+            step /= 2
+        else:
+            for _ in range(600):  # 60 s of ticks
+                y = y + body.dt * rate
+                rate = system.rate(y)
+
+    system.load(y)
+    body.set_fidelity(fidelity)
+    return norm(rate)
+
+
+def warm_start(
+    parameters: dict[str, float] | None = None,
+    multirate: bool = False,
+    fidelity: str = "waveform",
+    cache_dir: Path | None = None,
+    spec: dict | str | None = None,
+) -> HumanBody:
+    # A new body with `parameters` applied (see HumanBody.set_parameter) and its
+    # fast state at equilibrium. Solved bodies are cached on disk as snapshots,
+    # keyed by the complete initial state and MODEL_VERSION, so each parameter
+    # set is solved once per version of the model. Only converged solves are
+    # cached, and the cache keeps the CACHE_SIZE most recently used bodies.
+    body = HumanBody(multirate=multirate, fidelity=fidelity, spec=spec)
+    for path, value in (parameters or {}).items():
+        body.set_parameter(path, value)
+
+    cache_dir = cache_dir or CACHE_DIR
+    cached = (
+        cache_dir
+        / f"{hashlib.sha256(MODEL_VERSION + snapshot(body)).hexdigest()[:32]}.snap"
+    )
+    try:
+        solved = load(str(cached), body.spec)
+        os.utime(cached)
+        return solved
+    except FileNotFoundError:  # Not cached yet, or just evicted
+        pass
+
+    if solve(body) > TOLERANCE:
+        return body  # Not converged, so not worth keeping
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Written aside and renamed, so concurrent sweeps never read a partial file
+    partial = cached.with_suffix(f".{os.getpid()}.tmp")
+    save(body, str(partial))
+    partial.replace(cached)
+    _evict(cache_dir)
+    return body
+
+
+def _evict(cache_dir: Path) -> None:
+    # Deletes the least recently used snapshots beyond CACHE_SIZE
+    entries = []
+    for path in cache_dir.glob("*.snap"):
+        with contextlib.suppress(
+            FileNotFoundError
+        ):  # Evicted by another process meanwhile
+            entries.append((path.stat().st_mtime, path))
+    entries.sort(reverse=True)
+    for _, path in entries[CACHE_SIZE:]:
+        path.unlink(missing_ok=True)
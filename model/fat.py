@@ -1,8 +1,23 @@
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Fat(Organ):
+    state_fields = Organ.state_fields + (
+        "fat_reserve",
+        "lipolysis_rate",
+    )
+
+    processes = Organ.processes + (
+        "_store_fat",
+        "_store_vitamins",
+        "_release_fat",
+        "_produce_hormones",
+    )
+    update_periods = Organ.update_periods | {
+        "_release_fat": 10,
+    }
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -13,17 +28,13 @@ class Fat(Organ):
         self.fat_reserve = 10000  # g of fat (initial reserve)
         self.lipolysis_rate = 0.1  # g of fat/min
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._store_fat(dt)
-        self._store_vitamins()
-        self._release_fat(dt)
-        self._produce_hormones(dt)
-
+    @placeholder
     def _produce_hormones(self, dt: float):
         # Placeholder for hormone production (e.g., leptin)
         pass
 
-    def _store_vitamins(self):
+    @placeholder
+    def _store_vitamins(self, dt: float):
         # Placeholder for fat-soluble vitamin storage
         pass
 
@@ -0,0 +1,91 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from model.blood import SPECIES, Blood
+from model.organ import Organ
+
+# Blood values organs change: the numeric attributes, then the species amounts
+FIELDS = (*Blood.state_fields, *(f"{species.name}_amount" for species in SPECIES))
+_SCALARS = len(Blood.state_fields)
+
+
+def _values(blood: Blood) -> np.ndarray:
+    values = np.empty(len(FIELDS))
+    for i, name in enumerate(Blood.state_fields):
+        values[i] = getattr(blood, name)
+    values[_SCALARS:] = np.frombuffer(blood.amounts)
+    return values
+
+
+def _load(blood: Blood, values: np.ndarray) -> None:
+    for i, name in enumerate(Blood.state_fields):
+        setattr(blood, name, float(values[i]))
+    np.frombuffer(blood.amounts)[:] = values[_SCALARS:]
+
+
+class FluxAccumulator:
+    # Gives every organ its own copy of the blood as it was at the start of the
+    # step. Organs read and write their copy as usual (so each still sees its own
+    # earlier changes), and apply() adds up what each organ changed and writes
+    # the sum to the shared blood once. The blood every organ sees is then the
+    # same whatever the order of HumanBody.organs. Signals organs send each other
+    # directly (brain to heart, stomach to intestines, ...) still act at once.
+    def __init__(self, blood: Blood, organs: Mapping[str, Organ]):
+        self.blood = blood
+        # By name, so the changes are also summed in the same order every time
+        self.organs = dict(sorted(organs.items()))
+        self.views = {name: Blood(blood.volume) for name in self.organs}
+        for name, organ in self.organs.items():
+            organ.blood = self.views[name]
+        self.start = _values(blood)
+        # Per organ (rows in name order), the change in each FIELDS value
+        # over the last step, and that step's length
+        self.deltas = np.zeros((len(self.organs), len(FIELDS)))
+        self.dt = 0.0
+
+    def detach(self) -> None:
+        for organ in self.organs.values():
+            organ.blood = self.blood
+
+    def load(self) -> None:
+        self.start = _values(self.blood)
+        for view in self.views.values():
+            _load(view, self.start)
+
+    def apply(self, dt: float) -> None:
+        deltas = self.deltas
+        for i, view in enumerate(self.views.values()):
+            deltas[i] = _values(view) - self.start
+        # Each organ clamped its uptake to what its own copy held, so together
+        # they can take more of a species than the blood has. Scale the
+        # withdrawals of such a species down to the starting amount plus what
+        # was added over the step, in proportion to what each organ took.
+        amounts = deltas[:, _SCALARS:]
+        withdrawn = -np.minimum(amounts, 0).sum(axis=0)
+        available = self.start[_SCALARS:] + np.maximum(amounts, 0).sum(axis=0)
+        short = withdrawn > available
+        if short.any():
+            scale = np.maximum(available[short], 0) / withdrawn[short]
+            taken = amounts[:, short]
+            amounts[:, short] = np.where(taken < 0, taken * scale, taken)
+        values = self.start + deltas.sum(axis=0)
+        # Rounding can leave a scaled species just below zero
+        values[_SCALARS:][short] = np.maximum(values[_SCALARS:][short], 0)
+        _load(self.blood, values)
+        self.dt = dt
+
+    def breakdown(self) -> dict[str, dict[str, float]]:
+        # Rate of change per second each organ caused over the last step, e.g.
+        # {"Liver": {"glucose_amount": 12.5, ...}}, leaving out zero rates
+        if not self.dt:
+            return {}
+        rates = self.deltas / self.dt
+        return {
+            name: {
+                field: float(rate)
+                for field, rate in zip(FIELDS, row, strict=True)
+                if rate
+            }
+            for name, row in zip(self.organs, rates, strict=True)
+        }
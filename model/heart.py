@@ -1,10 +1,28 @@
 import math
 
 from model.blood import Blood
-from model.organ import Organ
+from model.lut import gaussian
+from model.organ import Organ, placeholder
 
 
 class Heart(Organ):
+    state_fields = Organ.state_fields + (
+        "pumping_rate",
+        "stroke_volume",
+        "ejection_fraction",
+        "cardiac_output",
+        "time_since_last_beat",
+        "compression",
+        "base_peripheral_resistance",
+        "peripheral_resistance",
+    )
+
+    processes = Organ.processes + (
+        "_simulate_cardiac_cycle",
+        "_regulate_vascular_system",
+        "_regulate_coronary_blood_flow",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -19,23 +37,44 @@ class Heart(Organ):
         self.compression = 0  # dimensionless, ranges from 0 (relaxed) to 1 (fully contracted)
         self.base_peripheral_resistance = 1200  # dyn·s/cm^5
         self.peripheral_resistance = self.base_peripheral_resistance
+        # "waveform" resolves every beat, "averaged" only tracks the beat phase and
+        # the beat-averaged compression, so that long runs can take large steps
+        self.fidelity = "waveform"
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._simulate_cardiac_cycle(dt)
-        self._regulate_vascular_system(dt)
-        self._regulate_coronary_blood_flow(dt)
+    def set_fidelity(self, fidelity: str) -> None:
+        if fidelity not in ("waveform", "averaged"):
+            raise ValueError(f"Unknown fidelity: {fidelity}")
+        self.fidelity = fidelity
 
     def _simulate_cardiac_cycle(self, dt: float):
         self.time_since_last_beat = (self.time_since_last_beat + dt) % (60 / self.pumping_rate)
+        if self.fidelity == "averaged":
+            self.compression = self._mean_compression()
+            return
+
         beat_phase = self.time_since_last_beat / (60 / self.pumping_rate)
 
         systole_duration = 0.3  # 30% of the cardiac cycle
         if beat_phase < systole_duration:
-            self.compression = math.exp(-((beat_phase - 0.15) / 0.1) ** 2)
+            self.compression = gaussian((beat_phase - 0.15) / 0.1)
         else:
             relaxation_rate = 5 if beat_phase < 0.5 else 1
             self.compression *= math.exp(-relaxation_rate * dt)
 
+    def _mean_compression(self) -> float:
+        # Time average over one beat of the compression waveform above
+        beat_duration = 60 / self.pumping_rate  # seconds
+        # Gaussian pulse over 30% of the cycle
+        systole = 0.1 * math.sqrt(math.pi) * math.erf(1.5)
+        end_systole = math.exp(-(1.5**2))
+        early_relaxation = end_systole * (1 - math.exp(-5 * 0.2 * beat_duration)) / 5
+        late_relaxation = (
+            end_systole
+            * math.exp(-beat_duration)
+            * (1 - math.exp(-0.5 * beat_duration))
+        )
+        return systole + (early_relaxation + late_relaxation) / beat_duration
+
     def _regulate_vascular_system(self, dt: float):
         self.cardiac_output = (self.stroke_volume * self.pumping_rate) / 1000  # L/min
 
@@ -49,6 +88,7 @@ class Heart(Organ):
         self.blood.systolic_pressure = mean_arterial_pressure + (pulse_pressure / 2)
         self.blood.diastolic_pressure = mean_arterial_pressure - (pulse_pressure / 2)
 
+    @placeholder
     def _regulate_coronary_blood_flow(self, dt: float):
         # Placeholder for regulating blood flow to the heart muscle
         pass
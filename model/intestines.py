@@ -1,8 +1,31 @@
+import math
+
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Intestines(Organ):
+    state_fields = Organ.state_fields + (
+        "absorption_rate",
+        "carbohydrate_content",
+        "protein_content",
+        "fat_content",
+        "fiber_content",
+        "water_content",
+        "water_absorption_rate",
+        "bile_content",
+    )
+
+    processes = Organ.processes + (
+        "_absorb_nutrients",
+        "_produce_cholecystokinin",
+        "_produce_secretin",
+        "_secrete_digestive_enzymes",
+        "_regulate_ph",
+        "_absorb_vitamins_and_minerals",
+        "_produce_hormones",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -18,53 +41,43 @@ class Intestines(Organ):
         self.water_absorption_rate = 5  # mL/min
         self.bile_content = 0  # mL
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._absorb_nutrients(dt)
-        self._produce_cholecystokinin(dt)
-        self._produce_secretin(dt)
-        self._secrete_digestive_enzymes(dt)
-        self._regulate_ph(dt)
-        self._absorb_vitamins_and_minerals(dt)
-        self._produce_hormones(dt)
-
+    @placeholder
     def _secrete_digestive_enzymes(self, dt: float) -> None:
         # Placeholder for secreting digestive enzymes
         pass
 
+    @placeholder
     def _regulate_ph(self, dt: float) -> None:
         # Placeholder for regulating pH in the intestines
         pass
 
+    @placeholder
     def _absorb_vitamins_and_minerals(self, dt: float) -> None:
         # Placeholder for absorbing vitamins and minerals
         pass
 
+    @placeholder
     def _produce_hormones(self, dt: float) -> None:
         # Placeholder for producing various hormones
         pass
 
     def _absorb_nutrients(self, dt: float) -> None:
+        # Exact first-order absorption over dt, which never overshoots the
+        # content however long the step
+        absorbed_fraction = -math.expm1(-self.absorption_rate * dt)
+
         if self.carbohydrate_content > 0:
-            absorbed_carbohydrates = min(
-                self.carbohydrate_content,
-                self.absorption_rate * self.carbohydrate_content * dt
-            )
+            absorbed_carbohydrates = self.carbohydrate_content * absorbed_fraction
             self.carbohydrate_content -= absorbed_carbohydrates
             self.blood.glucose_amount += absorbed_carbohydrates * 1000
 
         if self.protein_content > 0:
-            absorbed_proteins = min(
-                self.protein_content,
-                self.absorption_rate * self.protein_content * dt
-            )
+            absorbed_proteins = self.protein_content * absorbed_fraction
             self.protein_content -= absorbed_proteins
             self.blood.amino_acid_amount += absorbed_proteins * 1000
 
         if self.fat_content > 0:
-            absorbed_fats = min(
-                self.fat_content,
-                self.absorption_rate * self.fat_content * dt
-            )
+            absorbed_fats = self.fat_content * absorbed_fraction
             self.fat_content -= absorbed_fats
             self.blood.fatty_acid_amount += absorbed_fats * 1000
 
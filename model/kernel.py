@@ -0,0 +1,768 @@
+import argparse
+import math
+import time
+
+import numpy as np
+
+from model import liver
+from model.blood import SPECIES
+from model.body import HumanBody
+
+try:
+    from numba import njit
+
+    NUMBA = True
+except (
+    ImportError
+):  # Same kernel as plain Python: correct, but slower than the object model
+    NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+# Compiled backend for headless runs: the HumanBody state vector (see
+# HumanBody.state_fields()) as one float64 array, advanced by a Numba kernel
+# that runs every organ's processes in HumanBody order, with the time loop
+# compiled too. It covers the reference configuration (waveform fidelity, all
+# processes every tick); the organ objects stay the reference implementation,
+# and tests/test_kernel.py (or parity() from the command line) checks the two
+# against each other. Actions are applied to the body between runs, as they
+# only change state.
+_FIELDS = HumanBody().state_fields()
+
+
+def _at(field: str) -> int:
+    return _FIELDS.index(field)
+
+
+VOLUME = _at("Blood.volume")
+SYSTOLIC_PRESSURE = _at("Blood.systolic_pressure")
+DIASTOLIC_PRESSURE = _at("Blood.diastolic_pressure")
+PH = _at("Blood.ph")
+HEMOGLOBIN = _at("Blood.hemoglobin")
+GLUCOSE = _at("Blood.glucose_amount")
+FATTY_ACID = _at("Blood.fatty_acid_amount")
+AMINO_ACID = _at("Blood.amino_acid_amount")
+EPINEPHRINE = _at("Blood.epinephrine_amount")
+INSULIN = _at("Blood.insulin_amount")
+GLUCAGON = _at("Blood.glucagon_amount")
+BICARBONATE = _at("Blood.bicarbonate_amount")
+TRIGLYCERIDE = _at("Blood.triglyceride_amount")
+CHOLESTEROL = _at("Blood.cholesterol_amount")
+PHOSPHOLIPID = _at("Blood.phospholipid_amount")
+O2 = _at("Blood.o2_amount")
+CO2 = _at("Blood.co2_amount")
+GASTRIN = _at("Blood.gastrin_amount")
+GHRELIN = _at("Blood.ghrelin_amount")
+CHOLECYSTOKININ = _at("Blood.cholecystokinin_amount")
+SECRETIN = _at("Blood.secretin_amount")
+UREA = _at("Blood.urea_amount")
+CREATININE = _at("Blood.creatinine_amount")
+SODIUM = _at("Blood.sodium_amount")
+POTASSIUM = _at("Blood.potassium_amount")
+CALCIUM = _at("Blood.calcium_amount")
+PHOSPHATE = _at("Blood.phosphate_amount")
+RENIN = _at("Blood.renin_amount")
+ERYTHROPOIETIN = _at("Blood.erythropoietin_amount")
+INACTIVE_VITAMIN_D = _at("Blood.inactive_vitamin_d_amount")
+ACTIVE_VITAMIN_D = _at("Blood.active_vitamin_d_amount")
+AMMONIA = _at("Blood.ammonia_amount")
+
+HEART_PUMPING_RATE = _at("Heart.pumping_rate")
+HEART_STROKE_VOLUME = _at("Heart.stroke_volume")
+HEART_CARDIAC_OUTPUT = _at("Heart.cardiac_output")
+HEART_TIME_SINCE_LAST_BEAT = _at("Heart.time_since_last_beat")
+HEART_COMPRESSION = _at("Heart.compression")
+HEART_BASE_PERIPHERAL_RESISTANCE = _at("Heart.base_peripheral_resistance")
+HEART_PERIPHERAL_RESISTANCE = _at("Heart.peripheral_resistance")
+
+LUNGS_TIDAL_VOLUME = _at("Lungs.tidal_volume")
+LUNGS_RESPIRATORY_RATE = _at("Lungs.respiratory_rate")
+LUNGS_ALVEOLAR_PO2 = _at("Lungs.alveolar_po2")
+LUNGS_ALVEOLAR_PCO2 = _at("Lungs.alveolar_pco2")
+LUNGS_DIFFUSION_CAPACITY_O2 = _at("Lungs.diffusion_capacity_o2")
+LUNGS_DIFFUSION_CAPACITY_CO2 = _at("Lungs.diffusion_capacity_co2")
+LUNGS_EXPANSION = _at("Lungs.expansion")
+LUNGS_PREVIOUS_EXPANSION = _at("Lungs.previous_expansion")
+LUNGS_TIME_SINCE_LAST_BREATH = _at("Lungs.time_since_last_breath")
+LUNGS_FUNCTIONAL_RESIDUAL_CAPACITY = _at("Lungs.functional_residual_capacity")
+
+BRAIN_ENERGY_DEMAND = _at("Brain.energy_demand")
+BRAIN_URINE_PRODUCTION_SIGNAL = _at("Brain.urine_production_signal")
+BRAIN_RESPIRATORY_RATE_SIGNAL = _at("Brain.respiratory_rate_signal")
+
+KIDNEYS_GLOMERULAR_FILTRATION_RATE = _at("Kidneys.glomerular_filtration_rate")
+KIDNEYS_TUBULAR_REABSORPTION_RATE = _at("Kidneys.tubular_reabsorption_rate")
+KIDNEYS_URINE_PRODUCTION_RATE = _at("Kidneys.urine_production_rate")
+KIDNEYS_SODIUM_REABSORPTION_RATE = _at("Kidneys.sodium_reabsorption_rate")
+KIDNEYS_POTASSIUM_SECRETION_RATE = _at("Kidneys.potassium_secretion_rate")
+KIDNEYS_PHOSPHATE_REABSORPTION_RATE = _at("Kidneys.phosphate_reabsorption_rate")
+KIDNEYS_CALCIUM_REABSORPTION_RATE = _at("Kidneys.calcium_reabsorption_rate")
+KIDNEYS_VITAMIN_D_ACTIVATION_RATE = _at("Kidneys.vitamin_d_activation_rate")
+KIDNEYS_ERYTHROPOIETIN_PRODUCTION_RATE = _at("Kidneys.erythropoietin_production_rate")
+KIDNEYS_RENIN_PRODUCTION_RATE = _at("Kidneys.renin_production_rate")
+
+LIVER_INSULIN_SENSITIVITY = _at("Liver.insulin_sensitivity")
+LIVER_GLUCAGON_SENSITIVITY = _at("Liver.glucagon_sensitivity")
+LIVER_GLUCOSE_STORAGE = _at("Liver.glucose_storage")
+
+FAT_INSULIN_SENSITIVITY = _at("Fat.insulin_sensitivity")
+FAT_FAT_RESERVE = _at("Fat.fat_reserve")
+FAT_LIPOLYSIS_RATE = _at("Fat.lipolysis_rate")
+
+STOMACH_ENERGY_DEMAND = _at("Stomach.energy_demand")
+STOMACH_WATER_CONTENT = _at("Stomach.water_content")
+
+INTESTINES_ABSORPTION_RATE = _at("Intestines.absorption_rate")
+INTESTINES_CARBOHYDRATE_CONTENT = _at("Intestines.carbohydrate_content")
+INTESTINES_PROTEIN_CONTENT = _at("Intestines.protein_content")
+INTESTINES_FAT_CONTENT = _at("Intestines.fat_content")
+INTESTINES_WATER_CONTENT = _at("Intestines.water_content")
+INTESTINES_WATER_ABSORPTION_RATE = _at("Intestines.water_absorption_rate")
+INTESTINES_BILE_CONTENT = _at("Intestines.bile_content")
+
+BLADDER_URINE_VOLUME = _at("Bladder.urine_volume")
+BLADDER_MAX_CAPACITY = _at("Bladder.max_capacity")
+
+GALL_BLADDER_BILE_STORAGE = _at("GallBladder.bile_storage")
+
+TOTAL_CALORIC_EXPENDITURE = _at("Body.total_caloric_expenditure")
+
+# Per organ, in HumanBody.organs order: the state of the shared Organ processes
+ORGANS = (
+    "Heart",
+    "Lungs",
+    "Brain",
+    "Kidneys",
+    "Liver",
+    "Muscles",
+    "Pancreas",
+    "Fat",
+    "Stomach",
+    "Intestines",
+    "Skin",
+    "Spleen",
+    "Bladder",
+    "GallBladder",
+)
+ENERGY_DEMAND = np.array([_at(f"{organ}.energy_demand") for organ in ORGANS])
+INSULIN_SENSITIVITY = np.array(
+    [_at(f"{organ}.insulin_sensitivity") for organ in ORGANS]
+)
+# (stomach, intestines) rows of the four nutrients, passed on by digestion
+STOMACH_CONTENTS = np.array(
+    [
+        _at(f"Stomach.{name}_content")
+        for name in ("carbohydrate", "protein", "fat", "fiber")
+    ]
+)
+INTESTINES_CONTENTS = np.array(
+    [
+        _at(f"Intestines.{name}_content")
+        for name in ("carbohydrate", "protein", "fat", "fiber")
+    ]
+)
+DEGRADED_HORMONES = np.array(
+    [_at(f"Blood.{SPECIES[i].name}_amount") for i in liver.DEGRADED_HORMONES]
+)
+
+
+@njit(cache=True)
+def _concentration(s, index, scale):
+    return s[index] / (s[VOLUME] / scale)
+
+
+@njit(cache=True)
+def _consume_nutrients(s, organ, dt):
+    energy_demanded = s[ENERGY_DEMAND[organ]] * dt / 3600  # kcal
+    glucose = fatty_acid = triglyceride = cholesterol = phospholipid = amino_acid = 0.0
+    # Glucose first, then fats, amino acids as a last resort
+    if energy_demanded > 0:
+        energy = min(energy_demanded, s[GLUCOSE] * 4 / 1000)
+        glucose = energy * 1000 / 4
+        energy_demanded -= energy
+    if energy_demanded > 0:
+        energy = min(energy_demanded, s[FATTY_ACID] * 9 / 1000)
+        fatty_acid = energy * 1000 / 9
+        energy_demanded -= energy
+    if energy_demanded > 0:
+        energy = min(energy_demanded, s[TRIGLYCERIDE] * 9 / 1000)
+        triglyceride = energy * 1000 / 9
+        energy_demanded -= energy
+    if energy_demanded > 0:
+        energy = min(energy_demanded, s[CHOLESTEROL] * 9 / 1000)
+        cholesterol = energy * 1000 / 9
+        energy_demanded -= energy
+    if energy_demanded > 0:
+        energy = min(energy_demanded, s[PHOSPHOLIPID] * 9 / 1000)
+        phospholipid = energy * 1000 / 9
+        energy_demanded -= energy
+    if energy_demanded > 0:
+        energy = min(energy_demanded, s[AMINO_ACID] * 4 / 1000)
+        amino_acid = energy * 1000 / 4
+
+    total_energy = (
+        glucose * 4
+        + fatty_acid * 9
+        + triglyceride * 9
+        + cholesterol * 9
+        + phospholipid * 9
+        + amino_acid * 4
+    ) / 1000
+    if total_energy > 0:
+        rq = (
+            glucose * 1.0
+            + fatty_acid * 0.7
+            + triglyceride * 0.7
+            + cholesterol * 0.7
+            + phospholipid * 0.7
+            + amino_acid * 0.8
+        ) / (
+            glucose
+            + fatty_acid
+            + triglyceride
+            + cholesterol
+            + phospholipid
+            + amino_acid
+        )
+    else:
+        rq = 0.85
+
+    oxygen_consumed = total_energy * 0.2 / rq
+    if oxygen_consumed > s[O2]:
+        oxygen_consumed = s[O2]
+        scale = oxygen_consumed * rq / 0.2 / total_energy
+        glucose *= scale
+        fatty_acid *= scale
+        triglyceride *= scale
+        cholesterol *= scale
+        phospholipid *= scale
+        amino_acid *= scale
+
+    s[CO2] += oxygen_consumed * rq
+    s[GLUCOSE] -= glucose
+    s[FATTY_ACID] -= fatty_acid
+    s[TRIGLYCERIDE] -= triglyceride
+    s[CHOLESTEROL] -= cholesterol
+    s[PHOSPHOLIPID] -= phospholipid
+    s[AMINO_ACID] -= amino_acid
+    s[O2] -= oxygen_consumed
+
+
+@njit(cache=True)
+def _process_insulin(s, organ, dt):
+    insulin_effect = _concentration(s, INSULIN, 1000) * s[INSULIN_SENSITIVITY[organ]]
+    glucose_uptake = min(
+        s[ENERGY_DEMAND[organ]] * dt / 3600 * 1000 / 4 * insulin_effect / 10,
+        s[GLUCOSE] * 0.1,
+    )
+    s[GLUCOSE] -= glucose_uptake
+    s[INSULIN] = max(0, s[INSULIN] - glucose_uptake * 0.001)
+
+
+@njit(cache=True)
+def _heart(s, dt):
+    # Cardiac cycle
+    beat_period = 60 / s[HEART_PUMPING_RATE]
+    s[HEART_TIME_SINCE_LAST_BEAT] = (s[HEART_TIME_SINCE_LAST_BEAT] + dt) % beat_period
+    beat_phase = s[HEART_TIME_SINCE_LAST_BEAT] / beat_period
+    if beat_phase < 0.3:
+        s[HEART_COMPRESSION] = math.exp(-(((beat_phase - 0.15) / 0.1) ** 2))
+    else:
+        relaxation_rate = 5 if beat_phase < 0.5 else 1
+        s[HEART_COMPRESSION] *= math.exp(-relaxation_rate * dt)
+
+    # Vascular system
+    s[HEART_CARDIAC_OUTPUT] = (s[HEART_STROKE_VOLUME] * s[HEART_PUMPING_RATE]) / 1000
+    epinephrine_effect = 1 + 0.01 * (_concentration(s, EPINEPHRINE, 1000) - 1)
+    volume_effect = 1 - 0.01 * (s[VOLUME] / 5000 - 1)
+    s[HEART_PERIPHERAL_RESISTANCE] = (
+        s[HEART_BASE_PERIPHERAL_RESISTANCE] * epinephrine_effect * volume_effect
+    )
+    mean_arterial_pressure = (
+        s[HEART_CARDIAC_OUTPUT] * s[HEART_PERIPHERAL_RESISTANCE]
+    ) / 80
+    pulse_pressure = s[HEART_STROKE_VOLUME] / 1.5
+    s[SYSTOLIC_PRESSURE] = mean_arterial_pressure + pulse_pressure / 2
+    s[DIASTOLIC_PRESSURE] = mean_arterial_pressure - pulse_pressure / 2
+
+
+@njit(cache=True)
+def _lungs(s, dt):
+    # Breathing motion and alveolar air renewal
+    breath_period = 60 / s[LUNGS_RESPIRATORY_RATE]
+    s[LUNGS_TIME_SINCE_LAST_BREATH] = (
+        s[LUNGS_TIME_SINCE_LAST_BREATH] + dt
+    ) % breath_period
+    s[LUNGS_PREVIOUS_EXPANSION] = s[LUNGS_EXPANSION]
+    breath_phase = s[LUNGS_TIME_SINCE_LAST_BREATH] / breath_period
+    s[LUNGS_EXPANSION] = 0.5 * (1 + math.sin(2 * math.pi * breath_phase - math.pi / 2))
+    volume_delta = s[LUNGS_TIDAL_VOLUME] * (
+        s[LUNGS_EXPANSION] - s[LUNGS_PREVIOUS_EXPANSION]
+    )
+    alveolar_volume = (
+        s[LUNGS_FUNCTIONAL_RESIDUAL_CAPACITY]
+        + s[LUNGS_TIDAL_VOLUME] * s[LUNGS_EXPANSION]
+    )
+    if volume_delta > 0:
+        fresh_fraction = volume_delta / alveolar_volume
+        s[LUNGS_ALVEOLAR_PO2] = (1 - fresh_fraction) * s[
+            LUNGS_ALVEOLAR_PO2
+        ] + fresh_fraction * 104
+        s[LUNGS_ALVEOLAR_PCO2] = (1 - fresh_fraction) * s[
+            LUNGS_ALVEOLAR_PCO2
+        ] + fresh_fraction * 36
+
+    # O2 and CO2 diffusion, solved exactly over dt as in Lungs._simulate_gas_exchange
+    mmhg_per_mmol = 760 / (22.4 * alveolar_volume / 1000)
+    capacity = s[HEMOGLOBIN] * 1.34 * (s[VOLUME] / 100)
+    saturation = s[O2] / capacity * 100
+    q = saturation**2.8
+    blood_po2 = 100 * q / (q + 26**2.8)
+    blood_mmhg_per_mmol = (
+        max(100 * 2.8 * saturation**1.8 * 26**2.8 / (q + 26**2.8) ** 2, 0)
+        * 100
+        / capacity
+    )
+    o2_conductance = 0.0446 * s[LUNGS_DIFFUSION_CAPACITY_O2] / 60
+    rate = o2_conductance * (mmhg_per_mmol + blood_mmhg_per_mmol)
+    diffusable_o2 = 0.0
+    if rate > 0:
+        diffusable_o2 = (
+            o2_conductance
+            * (s[LUNGS_ALVEOLAR_PO2] - blood_po2)
+            * -math.expm1(-rate * dt)
+            / rate
+        )
+    diffused_o2 = min(max(diffusable_o2, 0), capacity - s[O2])
+    s[O2] += diffused_o2
+    s[LUNGS_ALVEOLAR_PO2] -= diffused_o2 * mmhg_per_mmol
+
+    co2_conductance = 0.0446 * s[LUNGS_DIFFUSION_CAPACITY_CO2] / 60
+    a = co2_conductance / (0.03 * s[VOLUME] / 1000)
+    b = co2_conductance * mmhg_per_mmol
+    blood_pco2 = max(_concentration(s, CO2, 1000) / 0.03, 1e-6)
+    # Only out of the blood
+    if blood_pco2 >= s[LUNGS_ALVEOLAR_PCO2] and a + b > 0:
+        closed = (
+            (blood_pco2 - s[LUNGS_ALVEOLAR_PCO2]) * -math.expm1(-(a + b) * dt) / (a + b)
+        )
+        s[CO2] = (blood_pco2 - a * closed) * 0.03 * s[VOLUME] / 1000
+        s[LUNGS_ALVEOLAR_PCO2] += b * closed
+
+
+@njit(cache=True)
+def _brain(s, dt):
+    # Blood pressure: baroreceptor reflex on heart rate, epinephrine and urine
+    # production
+    map_error = (s[SYSTOLIC_PRESSURE] + 2 * s[DIASTOLIC_PRESSURE]) / 3 - 90
+    s[HEART_PUMPING_RATE] *= 1 - map_error * 0.01 * 0.1
+    signal = s[BRAIN_URINE_PRODUCTION_SIGNAL]
+    if map_error < -5:
+        s[EPINEPHRINE] *= 1 + 0.01 * dt
+        signal = max(-1, signal - 0.1 * dt)
+    elif map_error > 5:
+        s[EPINEPHRINE] *= 1 - 0.01 * dt
+        signal = min(1, signal + 0.1 * dt)
+    else:
+        signal *= 0.9 ** (dt / 0.1)
+    s[BRAIN_URINE_PRODUCTION_SIGNAL] = signal
+    s[KIDNEYS_GLOMERULAR_FILTRATION_RATE] = max(60, min(180, 115 * (1 + signal * 0.02)))
+    s[KIDNEYS_TUBULAR_REABSORPTION_RATE] = max(59, min(179, 114 * (1 - signal * 0.02)))
+
+    # Respiratory rate
+    pco2_error = max(_concentration(s, CO2, 1000) / 0.03, 1e-6) - 40
+    signal = s[BRAIN_RESPIRATORY_RATE_SIGNAL]
+    if pco2_error > 0.02:
+        signal = min(1, signal + 0.02 * dt)
+    elif pco2_error < -0.02:
+        signal = max(-1, signal - 0.02 * dt)
+    else:
+        signal *= 0.9 ** (dt / 0.1)
+    s[BRAIN_RESPIRATORY_RATE_SIGNAL] = signal
+    extra_tidal_volume = 500 * signal * 0.1
+    s[LUNGS_RESPIRATORY_RATE] = max(8, min(30, 12 * (1 + signal * 0.6)))
+    s[LUNGS_TIDAL_VOLUME] = max(300, min(800, 500 - extra_tidal_volume))
+    s[LUNGS_FUNCTIONAL_RESIDUAL_CAPACITY] = 2500 + extra_tidal_volume
+
+    # Glucose
+    glucose_concentration = _concentration(s, GLUCOSE, 100)
+    if glucose_concentration < 72:
+        s[GLUCAGON] += 0.01 * dt * (s[VOLUME] / 1000)
+        s[EPINEPHRINE] *= 1 + 0.001 * dt
+    elif glucose_concentration > 130:
+        s[INSULIN] += 0.1 * dt * (s[VOLUME] / 1000)
+    s[GLUCOSE] -= min(s[BRAIN_ENERGY_DEMAND] * dt / 3600 * 1000 / 4, s[GLUCOSE] * 0.1)
+
+
+@njit(cache=True)
+def _kidneys(s, dt):
+    # Filtration
+    filtered_volume = s[KIDNEYS_GLOMERULAR_FILTRATION_RATE] * dt / 60
+    reabsorbed_volume = s[KIDNEYS_TUBULAR_REABSORPTION_RATE] * dt / 60
+    urine_volume = max(filtered_volume - reabsorbed_volume, 0)
+    s[VOLUME] -= urine_volume
+    s[UREA] -= urine_volume / 10 * _concentration(s, UREA, 100)
+    s[CREATININE] -= urine_volume / 10 * _concentration(s, CREATININE, 100)
+    s[KIDNEYS_URINE_PRODUCTION_RATE] = urine_volume / (dt / 60)
+    s[BLADDER_URINE_VOLUME] = min(
+        s[BLADDER_URINE_VOLUME] + urine_volume, s[BLADDER_MAX_CAPACITY]
+    )
+    s[SODIUM] -= (
+        urine_volume
+        / 1000
+        * _concentration(s, SODIUM, 1000)
+        * (1 - s[KIDNEYS_SODIUM_REABSORPTION_RATE])
+    )
+    s[POTASSIUM] += s[KIDNEYS_POTASSIUM_SECRETION_RATE] * dt / 60
+    s[CALCIUM] -= (
+        urine_volume
+        / 1000
+        * _concentration(s, CALCIUM, 1000)
+        * (1 - s[KIDNEYS_CALCIUM_REABSORPTION_RATE])
+    )
+    s[PHOSPHATE] -= (
+        urine_volume
+        / 10
+        * _concentration(s, PHOSPHATE, 100)
+        * (1 - s[KIDNEYS_PHOSPHATE_REABSORPTION_RATE])
+    )
+
+    # Acid-base balance
+    if s[PH] < 7.35:
+        s[BICARBONATE] += 0.1 * dt / 60
+    elif s[PH] > 7.45:
+        s[BICARBONATE] -= 0.1 * dt / 60
+
+    # Hormones
+    if s[O2] / (s[HEMOGLOBIN] * 1.34 * (s[VOLUME] / 100)) < 0.9:
+        s[ERYTHROPOIETIN] += s[KIDNEYS_ERYTHROPOIETIN_PRODUCTION_RATE] * dt / 60
+    if (s[SYSTOLIC_PRESSURE] + 2 * s[DIASTOLIC_PRESSURE]) / 3 < 80:
+        s[RENIN] += s[KIDNEYS_RENIN_PRODUCTION_RATE] * dt / 60
+
+    # Vitamin D activation, excretion and degradation
+    calcium_factor = min(1.0, max(0.1, _concentration(s, CALCIUM, 1000) / 10))
+    phosphate_factor = min(1.0, max(0.1, s[PHOSPHATE] / 4))
+    max_activation = (
+        s[KIDNEYS_VITAMIN_D_ACTIVATION_RATE]
+        * dt
+        / 60
+        * calcium_factor
+        * phosphate_factor
+    )
+    activated_amount = min(s[INACTIVE_VITAMIN_D], max_activation)
+    s[INACTIVE_VITAMIN_D] -= activated_amount
+    s[ACTIVE_VITAMIN_D] += activated_amount
+    s[INACTIVE_VITAMIN_D] *= math.exp(-0.001 * dt / 60)
+    s[ACTIVE_VITAMIN_D] *= math.exp(-0.002 * dt / 60)
+
+
+@njit(cache=True)
+def _liver(s, dt):
+    insulin_effect = _concentration(s, INSULIN, 1000) * s[LIVER_INSULIN_SENSITIVITY]
+    glucagon_effect = _concentration(s, GLUCAGON, 1000) * s[LIVER_GLUCAGON_SENSITIVITY]
+
+    # Glycogenesis, or glycogenolysis when glucose is low
+    glucose_concentration = _concentration(s, GLUCOSE, 100)
+    if glucose_concentration > 100:
+        stored = min(s[GLUCOSE] * 0.1, 10 * insulin_effect * dt)
+        s[GLUCOSE] -= stored
+        s[LIVER_GLUCOSE_STORAGE] += stored / 1000
+    elif glucose_concentration < 72 and s[LIVER_GLUCOSE_STORAGE] > 0:
+        released = min(
+            (72 - glucose_concentration) * dt / 0.1,
+            (72 - glucose_concentration) * s[VOLUME] / 100,
+            s[LIVER_GLUCOSE_STORAGE] * 1000,
+            10 * glucagon_effect * dt,
+        )
+        s[GLUCOSE] += released
+        s[LIVER_GLUCOSE_STORAGE] -= released / 1000
+
+    # Gluconeogenesis
+    if _concentration(s, GLUCOSE, 100) < 60:
+        s[GLUCOSE] += 5 * dt / 60 * glucagon_effect
+
+    # Glucose export to blood
+    glucose_concentration = _concentration(s, GLUCOSE, 100)
+    if glucose_concentration < 90:
+        exported = (
+            min(
+                s[LIVER_GLUCOSE_STORAGE] * 1000 * 0.01,
+                (90 - glucose_concentration) * 10,
+            )
+            * dt
+            / 60
+        )
+        s[GLUCOSE] += exported
+        s[LIVER_GLUCOSE_STORAGE] -= exported / 1000
+
+    # Urea cycle
+    s[AMMONIA] = max(0, s[AMMONIA] - 0.01 * dt)
+    s[UREA] += 0.01 * dt * 0.8
+
+    # Bile production
+    if _concentration(s, SECRETIN, 1000) > 1.0:
+        s[GALL_BLADDER_BILE_STORAGE] += 0.1 * dt
+
+    # Hormone degradation
+    degradation = math.exp(-0.01 / 60 * dt)
+    for index in DEGRADED_HORMONES:
+        s[index] *= degradation
+
+
+@njit(cache=True)
+def _pancreas(s, dt):
+    glucose_concentration = _concentration(s, GLUCOSE, 100)
+    s[INSULIN] += (0.5 + max(0, (glucose_concentration - 100) * 0.05)) * dt / 60
+    s[GLUCAGON] += (0.1 + max(0, (80 - glucose_concentration) * 0.01)) * dt / 60
+
+
+@njit(cache=True)
+def _fat(s, dt):
+    # Fat storage
+    if _concentration(s, GLUCOSE, 100) > 120 and _concentration(s, INSULIN, 1000) > 1.0:
+        glucose_stored = min(s[GLUCOSE] * 0.1, 10 * dt * s[FAT_INSULIN_SENSITIVITY])
+        fat_stored = glucose_stored * 0.11 / 1000
+        s[GLUCOSE] -= glucose_stored
+        s[FAT_FAT_RESERVE] += fat_stored
+        s[TRIGLYCERIDE] += fat_stored * 1000
+
+    # Lipolysis
+    glucose_concentration = _concentration(s, GLUCOSE, 100)
+    if glucose_concentration < 80 or _concentration(s, GLUCAGON, 1000) > 1.0:
+        lipolysis_factor = max(1, (80 - glucose_concentration) / 10)
+        fat_released = min(
+            s[FAT_LIPOLYSIS_RATE] * lipolysis_factor * dt / 60, s[FAT_FAT_RESERVE]
+        )
+        s[FAT_FAT_RESERVE] -= fat_released
+        triglycerides_released = fat_released * 1000
+        fatty_acids_released = triglycerides_released * 0.1
+        s[FATTY_ACID] += fatty_acids_released
+        s[TRIGLYCERIDE] += triglycerides_released - fatty_acids_released
+
+
+@njit(cache=True)
+def _food_content(s):
+    total = 0.0
+    for index in STOMACH_CONTENTS:
+        total += s[index]
+    return total
+
+
+@njit(cache=True)
+def _stomach(s, dt):
+    # Motility
+    s[STOMACH_ENERGY_DEMAND] = 3 + _food_content(s) / 1000
+
+    # Digestion
+    if _food_content(s) > 0:
+        digestion_fraction = -math.expm1(-0.03 * dt / 60)
+        for i in range(len(STOMACH_CONTENTS)):
+            digested = s[STOMACH_CONTENTS[i]] * digestion_fraction
+            s[STOMACH_CONTENTS[i]] -= digested
+            s[INTESTINES_CONTENTS[i]] += digested
+
+    # Water passed to the intestines
+    if s[STOMACH_WATER_CONTENT] > 0:
+        water_passed = min(s[STOMACH_WATER_CONTENT], 8 * dt)
+        s[STOMACH_WATER_CONTENT] -= water_passed
+        s[INTESTINES_WATER_CONTENT] += water_passed
+
+    # Gastrin and ghrelin
+    food_content = _food_content(s)
+    if food_content > 0:
+        s[GASTRIN] += 0.1 * dt
+    if food_content == 0:
+        s[GHRELIN] += 0.1 * dt
+    else:
+        s[GHRELIN] = max(0, s[GHRELIN] - 0.1 * dt)
+
+    # Direct water absorption
+    absorbed_water = min(s[STOMACH_WATER_CONTENT], 2 * dt / 60)
+    s[STOMACH_WATER_CONTENT] -= absorbed_water
+    s[VOLUME] += absorbed_water
+
+
+@njit(cache=True)
+def _intestines(s, dt):
+    absorbed_fraction = -math.expm1(-s[INTESTINES_ABSORPTION_RATE] * dt)
+    if s[INTESTINES_CARBOHYDRATE_CONTENT] > 0:
+        absorbed = s[INTESTINES_CARBOHYDRATE_CONTENT] * absorbed_fraction
+        s[INTESTINES_CARBOHYDRATE_CONTENT] -= absorbed
+        s[GLUCOSE] += absorbed * 1000
+    if s[INTESTINES_PROTEIN_CONTENT] > 0:
+        absorbed = s[INTESTINES_PROTEIN_CONTENT] * absorbed_fraction
+        s[INTESTINES_PROTEIN_CONTENT] -= absorbed
+        s[AMINO_ACID] += absorbed * 1000
+    if s[INTESTINES_FAT_CONTENT] > 0:
+        absorbed = s[INTESTINES_FAT_CONTENT] * absorbed_fraction
+        s[INTESTINES_FAT_CONTENT] -= absorbed
+        s[FATTY_ACID] += absorbed * 1000
+    if s[INTESTINES_WATER_CONTENT] > 0:
+        absorbed_water = min(
+            s[INTESTINES_WATER_CONTENT], s[INTESTINES_WATER_ABSORPTION_RATE] * dt
+        )
+        s[INTESTINES_WATER_CONTENT] -= absorbed_water
+        s[VOLUME] += absorbed_water
+
+    if s[INTESTINES_FAT_CONTENT] > 0:
+        s[CHOLECYSTOKININ] += 0.1 * dt
+    if s[INTESTINES_PROTEIN_CONTENT] > 0:
+        s[SECRETIN] += 0.1 * dt
+
+
+@njit(cache=True)
+def _gall_bladder(s, dt):
+    bile_released = min(s[GALL_BLADDER_BILE_STORAGE], 0.1 * dt)
+    s[GALL_BLADDER_BILE_STORAGE] -= bile_released
+    s[INTESTINES_BILE_CONTENT] += bile_released
+
+
+@njit(cache=True)
+def _update_blood(s, dt):
+    bicarbonate_concentration = _concentration(s, BICARBONATE, 1000)
+    pco2 = max(_concentration(s, CO2, 1000) / 0.03, 1e-6)
+    new_ph = 6.1 + math.log10(max(bicarbonate_concentration, 1e-6) / (0.03 * pco2))
+    s[PH] += (new_ph - s[PH]) * 0.1 * dt / 60
+    bicarbonate_change = (s[PH] - 7.4) * 0.5 * dt / 60 * (s[VOLUME] / 1000)
+    s[BICARBONATE] = max(s[BICARBONATE] + bicarbonate_change, 0)
+
+
+@njit(cache=True)
+def tick(s, dt):
+    # One HumanBody tick on the state vector `s`, in place
+    for organ in range(len(ORGANS)):
+        _consume_nutrients(s, organ, dt)
+        _process_insulin(s, organ, dt)
+        if organ == 0:
+            _heart(s, dt)
+        elif organ == 1:
+            _lungs(s, dt)
+        elif organ == 2:
+            _brain(s, dt)
+        elif organ == 3:
+            _kidneys(s, dt)
+        elif organ == 4:
+            _liver(s, dt)
+        elif organ == 6:
+            _pancreas(s, dt)
+        elif organ == 7:
+            _fat(s, dt)
+        elif organ == 8:
+            _stomach(s, dt)
+        elif organ == 9:
+            _intestines(s, dt)
+        elif organ == 13:
+            _gall_bladder(s, dt)
+
+    total_energy_expenditure = 0.0
+    for organ in range(len(ORGANS)):
+        total_energy_expenditure += s[ENERGY_DEMAND[organ]] * (dt / 3600)
+    s[TOTAL_CALORIC_EXPENDITURE] += total_energy_expenditure
+
+    _update_blood(s, dt)
+
+
+@njit(cache=True)
+def _run(s, dt, steps, every):
+    # `steps` ticks; the state after every `every` ticks goes into the returned rows
+    samples = np.empty((steps // every if every else 0, len(s)))
+    for i in range(1, steps + 1):
+        tick(s, dt)
+        if every and i % every == 0:
+            samples[i // every - 1] = s
+    return samples
+
+
+def _check(body: HumanBody) -> None:
+    if body.fidelity != "waveform" or body.scheduler.multirate:
+        raise ValueError(
+            "The compiled kernel runs waveform fidelity with every process each tick"
+        )
+    if body.state_fields() != _FIELDS:
+        raise ValueError("The compiled kernel runs the full body only")
+    if body.flux is not None:
+        raise ValueError("The compiled kernel has no flux accumulation")
+    extra = [name for name, organ in body.organs.items() if organ.extra_processes]
+    if extra:
+        raise ValueError(
+            "The compiled kernel cannot run processes added with add_process"
+            f" ({', '.join(extra)})"
+        )
+
+
+def run(body: HumanBody, duration: float, every: float = 0) -> np.ndarray:
+    # Advances `body` by `duration` seconds of its ticks in the compiled kernel.
+    # Returns the state vector every `every` seconds (no rows if 0), one row per
+    # sample in HumanBody.state_fields() order.
+    _check(body)
+    s = np.array(body.get_state())
+    steps = round(duration / body.dt)
+    samples = _run(s, body.dt, steps, round(every / body.dt) if every else 0)
+    body.set_state(s.tolist())
+    body.time += steps * body.dt
+    return samples
+
+
+def parity(duration: float = 600, every: float = 10) -> tuple[float, str]:
+    # Runs the same meal, drink and exercise through the organ objects and the
+    # kernel and returns the largest relative difference over the sampled
+    # trajectory, with the field where it occurred
+    actions = [
+        (10, "eat", 50),
+        (20, "drink", 300),
+        (duration / 3, "start_exercise", None),
+        (2 * duration / 3, "stop_exercise", None),
+    ]
+    reference, compiled = HumanBody(), HumanBody()
+    expected, actual = [], []
+    start = 0.0
+    for at, action, amount in [*actions, (duration, None, None)]:
+        for _ in range(round((at - start) / every)):
+            for _ in range(round(every / reference.dt)):
+                reference.step()
+            expected.append(reference.get_state())
+        actual.extend(run(compiled, at - start, every))
+        if action is not None:
+            for body in (reference, compiled):
+                getattr(body, action)(*([amount] if amount is not None else []))
+        start = at
+
+    expected, actual = np.array(expected), np.array(actual)
+    difference = np.abs(actual - expected) / np.maximum(np.abs(expected), 1e-9)
+    worst = np.unravel_index(np.argmax(difference), difference.shape)
+    return float(difference[worst]), _FIELDS[worst[1]]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the compiled kernel against HumanBody and time both"
+    )
+    parser.add_argument("--duration", type=float, default=600, help="simulated seconds")
+    args = parser.parse_args()
+
+    if not NUMBA:
+        print("numba is not installed, the kernel runs as plain Python")
+    run(HumanBody(), 1)  # compile
+    difference, field = parity(args.duration)
+    print(f"parity over {args.duration:g} s: max rel diff {difference:.2e} ({field})")
+
+    body = HumanBody()
+    started = time.perf_counter()
+    for _ in range(round(args.duration / body.dt)):
+        body.step()
+    reference = time.perf_counter() - started
+    started = time.perf_counter()
+    run(HumanBody(), args.duration)
+    compiled = time.perf_counter() - started
+    print(
+        f"{args.duration:g} s simulated: objects {reference:.2f} s,"
+        f" kernel {compiled:.4f} s ({reference / compiled:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
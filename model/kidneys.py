@@ -1,8 +1,34 @@
+import math
+
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Kidneys(Organ):
+    state_fields = Organ.state_fields + (
+        "glomerular_filtration_rate",
+        "tubular_reabsorption_rate",
+        "urine_production_rate",
+        "sodium_reabsorption_rate",
+        "potassium_secretion_rate",
+        "phosphate_reabsorption_rate",
+        "calcium_reabsorption_rate",
+        "vitamin_d_activation_rate",
+        "erythropoietin_production_rate",
+        "renin_production_rate",
+    )
+
+    processes = Organ.processes + (
+        "_filter_blood",
+        "_regulate_acid_base_balance",
+        "_produce_hormones",
+        "_activate_vitamin_d",
+        "_produce_prostaglandins",
+    )
+    update_periods = Organ.update_periods | {
+        "_activate_vitamin_d": 60,
+    }
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -35,13 +61,6 @@ class Kidneys(Organ):
         self.glomerular_filtration_rate = max(60, min(180, self.glomerular_filtration_rate))
         self.tubular_reabsorption_rate = max(59, min(179, self.tubular_reabsorption_rate))
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._filter_blood(dt)
-        self._regulate_acid_base_balance(dt)
-        self._produce_hormones(dt)
-        self._activate_vitamin_d(dt)
-        self._produce_prostaglandins(dt)
-
     def _filter_blood(self, dt: float):
         filtered_volume = self.glomerular_filtration_rate * dt / 60  # mL
         reabsorbed_volume = self.tubular_reabsorption_rate * dt / 60  # mL
@@ -83,6 +102,7 @@ class Kidneys(Organ):
         if self.blood.mean_arterial_pressure < 80:
             self.blood.renin_amount += self.renin_production_rate * dt / 60
 
+    @placeholder
     def _produce_prostaglandins(self, dt: float) -> None:
         # Placeholder for producing prostaglandins
         pass
@@ -106,12 +126,9 @@ class Kidneys(Organ):
         self.blood.inactive_vitamin_d_amount -= activated_amount
         self.blood.active_vitamin_d_amount += activated_amount
 
-        # Simulate excretion and degradation of vitamin D
-        inactive_excretion = self.blood.inactive_vitamin_d_amount * 0.001 * dt / 60
-        active_degradation = self.blood.active_vitamin_d_amount * 0.002 * dt / 60
-
-        self.blood.inactive_vitamin_d_amount -= inactive_excretion
-        self.blood.active_vitamin_d_amount -= active_degradation
+        # Simulate excretion and degradation of vitamin D (exact first-order decay)
+        self.blood.inactive_vitamin_d_amount *= math.exp(-0.001 * dt / 60)
+        self.blood.active_vitamin_d_amount *= math.exp(-0.002 * dt / 60)
 
     def _organ_specific_metrics(self) -> dict:
         return {
@@ -124,6 +141,11 @@ class Kidneys(Organ):
 
 
 class Bladder(Organ):
+    state_fields = Organ.state_fields + (
+        "urine_volume",
+        "max_capacity",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -133,9 +155,6 @@ class Bladder(Organ):
         self.urine_volume = 0  # mL
         self.max_capacity = 500  # mL
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        pass
-
     def receive_urine(self, volume: float):
         self.urine_volume = min(self.urine_volume + volume, self.max_capacity)
 
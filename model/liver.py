@@ -1,9 +1,45 @@
-from model.blood import Blood
+import math
+
+from model.blood import SPECIES_INDEX, Blood
 from model.intestines import Intestines
-from model.organ import Organ
+from model.organ import Organ, placeholder
+
+DEGRADED_HORMONES = tuple(SPECIES_INDEX[name] for name in (
+    "insulin",
+    "glucagon",
+    "epinephrine",
+    "gastrin",
+    "ghrelin",
+    "cholecystokinin",
+    "secretin",
+    "renin",
+    "erythropoietin",
+))
 
 
 class Liver(Organ):
+    state_fields = Organ.state_fields + (
+        "glucose_storage",
+    )
+
+    processes = Organ.processes + (
+        "_regulate_glucose",
+        "_regulate_urea_ammonia",
+        "_regulate_bile_production",
+        "_synthesize_proteins",
+        "_detoxify_substances",
+        "_store_vitamins_and_minerals",
+        "_produce_cholesterol",
+        "_metabolize_drugs",
+        "_regulate_blood_clotting",
+        "_produce_immune_factors",
+        "_regulate_hormone_levels",
+        "_degrade_hormones",
+    )
+    update_periods = Organ.update_periods | {
+        "_degrade_hormones": 10,
+    }
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -16,48 +52,42 @@ class Liver(Organ):
     def set_gall_bladder(self, gall_bladder):
         self.gall_bladder = gall_bladder
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._regulate_glucose(dt)
-        self._regulate_urea_ammonia(dt)
-        self._regulate_bile_production(dt)
-        self._synthesize_proteins(dt)
-        self._detoxify_substances(dt)
-        self._store_vitamins_and_minerals(dt)
-        self._produce_cholesterol(dt)
-        self._metabolize_drugs(dt)
-        self._regulate_blood_clotting(dt)
-        self._produce_immune_factors(dt)
-        self._regulate_hormone_levels(dt)
-        self._degrade_hormones(dt)
-
+    @placeholder
     def _synthesize_proteins(self, dt: float):
         # Placeholder for protein synthesis function
         pass
 
+    @placeholder
     def _detoxify_substances(self, dt: float):
         # Placeholder for detoxification function
         pass
 
+    @placeholder
     def _store_vitamins_and_minerals(self, dt: float):
         # Placeholder for vitamin and mineral storage function
         pass
 
+    @placeholder
     def _produce_cholesterol(self, dt: float):
         # Placeholder for cholesterol production function
         pass
 
+    @placeholder
     def _metabolize_drugs(self, dt: float):
         # Placeholder for drug metabolism function
         pass
 
+    @placeholder
     def _regulate_blood_clotting(self, dt: float):
         # Placeholder for blood clotting regulation function
         pass
 
+    @placeholder
     def _produce_immune_factors(self, dt: float):
         # Placeholder for immune factor production function
         pass
 
+    @placeholder
     def _regulate_hormone_levels(self, dt: float):
         # Placeholder for hormone level regulation function
         pass
@@ -74,7 +104,13 @@ class Liver(Organ):
 
         # Glycogen breakdown (glycogenolysis)
         elif self.blood.glucose_concentration < 72 and self.glucose_storage > 0:
-            glucose_released = min(72 - self.blood.glucose_concentration, self.glucose_storage * 1000, 10 * glucagon_effect * dt)
+            glucose_released = min(
+                (72 - self.blood.glucose_concentration) * dt / 0.1,  # mg per 0.1 s
+                # No further than 72 mg/dL
+                (72 - self.blood.glucose_concentration) * self.blood.volume / 100,
+                self.glucose_storage * 1000,
+                10 * glucagon_effect * dt,
+            )
             self.blood.glucose_amount += glucose_released
             self.glucose_storage -= glucose_released / 1000  # Convert mg to g
 
@@ -108,15 +144,8 @@ class Liver(Organ):
 
     def _degrade_hormones(self, dt: float):
         degradation_rate = 0.01 / 60  # 1% degradation per minute
-        self.blood.insulin_amount *= (1 - degradation_rate * dt)
-        self.blood.glucagon_amount *= (1 - degradation_rate * dt)
-        self.blood.epinephrine_amount *= (1 - degradation_rate * dt)
-        self.blood.gastrin_amount *= (1 - degradation_rate * dt)
-        self.blood.ghrelin_amount *= (1 - degradation_rate * dt)
-        self.blood.cholecystokinin_amount *= (1 - degradation_rate * dt)
-        self.blood.secretin_amount *= (1 - degradation_rate * dt)
-        self.blood.renin_amount *= (1 - degradation_rate * dt)
-        self.blood.erythropoietin_amount *= (1 - degradation_rate * dt)
+        # Exact first-order decay, so any dt works
+        self.blood.scale_amounts(DEGRADED_HORMONES, math.exp(-degradation_rate * dt))
 
     def _organ_specific_metrics(self) -> dict:
         return {
@@ -124,6 +153,14 @@ class Liver(Organ):
         }
 
 class GallBladder(Organ):
+    state_fields = Organ.state_fields + (
+        "bile_storage",
+    )
+
+    processes = Organ.processes + (
+        "_release_bile",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -133,9 +170,6 @@ class GallBladder(Organ):
         self.bile_storage = 0  # mL of bile
         self.intestines = None
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._release_bile(dt)
-
     def store_bile(self, amount: float):
         self.bile_storage += amount
 
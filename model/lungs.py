@@ -1,10 +1,31 @@
 import math
 
 from model.blood import Blood
-from model.organ import Organ
+from model.lut import dissociation
+from model.organ import Organ, placeholder
 
 
 class Lungs(Organ):
+    state_fields = Organ.state_fields + (
+        "tidal_volume",
+        "respiratory_rate",
+        "alveolar_po2",
+        "alveolar_pco2",
+        "diffusion_capacity_o2",
+        "diffusion_capacity_co2",
+        "expansion",
+        "previous_expansion",
+        "time_since_last_breath",
+        "functional_residual_capacity",
+        "dead_space_volume",
+    )
+
+    processes = Organ.processes + (
+        "_update_expansion",
+        "_produce_surfactant",
+        "_simulate_gas_exchange",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -22,23 +43,37 @@ class Lungs(Organ):
         self.time_since_last_breath: float = 0  # seconds
         self.functional_residual_capacity: float = 2500  # mL
         self.dead_space_volume: float = 150  # mL
+        # "waveform" resolves every breath, "averaged" uses breath-averaged
+        # ventilation and gas exchange, so that long runs can take large steps
+        self.fidelity = "waveform"
+
+    def set_fidelity(self, fidelity: str) -> None:
+        if fidelity not in ("waveform", "averaged"):
+            raise ValueError(f"Unknown fidelity: {fidelity}")
+        self.fidelity = fidelity
+        if fidelity == "waveform":
+            # Resume the waveform where the breath phase is, without a spurious inhale
+            self.expansion = self.previous_expansion = self._breath_expansion()
 
     @property
     def alveolar_volume(self):
         return self.functional_residual_capacity + (self.tidal_volume * self.expansion)
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._update_expansion(dt)
-        self._produce_surfactant(dt)
-        self._simulate_gas_exchange(dt)
+    def _breath_expansion(self) -> float:
+        breath_phase = self.time_since_last_breath / (60 / self.respiratory_rate)
+
+        # Sinusoidal function for continuous breathing motion
+        return 0.5 * (1 + math.sin(2 * math.pi * breath_phase - math.pi / 2))
 
     def _update_expansion(self, dt: float):
         self.time_since_last_breath = (self.time_since_last_breath + dt) % (60 / self.respiratory_rate)  # seconds
+        if self.fidelity == "averaged":
+            # Mean lung volume; ventilation is part of _simulate_mean_gas_exchange
+            self.expansion = self.previous_expansion = 0.5
+            return
+
         self.previous_expansion = self.expansion
-        breath_phase = self.time_since_last_breath / (60 / self.respiratory_rate)
-        
-        # Sinusoidal function for continuous breathing motion
-        self.expansion = 0.5 * (1 + math.sin(2 * math.pi * breath_phase - math.pi / 2))
+        self.expansion = self._breath_expansion()
 
         volume_delta = self.tidal_volume * (self.expansion - self.previous_expansion)
 
@@ -55,26 +90,130 @@ class Lungs(Organ):
             # No change in gas concentrations during exhalation
             pass
 
+    @placeholder
     def _produce_surfactant(self, dt: float):
         pass
 
     def _simulate_gas_exchange(self, dt: float):
-        # O2 exchange
+        if self.fidelity == "averaged":
+            self._simulate_mean_gas_exchange(dt)
+            return
+
+        # Diffusion between alveolar gas and blood, solved exactly over dt (O2
+        # linearized around the current saturation), so no step overshoots the
+        # equilibrium; ventilation is mixed in by _update_expansion
+        mmhg_per_mmol = 760 / (22.4 * self.alveolar_volume / 1000)
+
+        # O2 exchange. The gradient closes at rate c (m + k) for the conductance
+        # c, the alveolar mmHg per mmol m and the blood pO2 slope k per mmol.
+        capacity = self.blood.total_oxygen_capacity
+        saturation = self.blood.oxygen_saturation * 100
+        blood_po2 = self.oxygen_hemoglobin_dissociation(saturation)
+        blood_mmhg_per_mmol = (
+            max(self._dissociation_slope(saturation), 0) * 100 / capacity
+        )
+        o2_conductance = 0.0446 * self.diffusion_capacity_o2 / 60  # mmol/s/mmHg
+        rate = o2_conductance * (mmhg_per_mmol + blood_mmhg_per_mmol)  # 1/s
+        diffusable_o2 = 0.0
+        if rate:
+            diffusable_o2 = (
+                o2_conductance
+                * (self.alveolar_po2 - blood_po2)
+                * -math.expm1(-rate * dt)
+                / rate
+            )
+        diffused_o2 = min(max(diffusable_o2, 0), capacity - self.blood.o2_amount)
+        self.blood.o2_amount += diffused_o2
+        self.alveolar_po2 -= diffused_o2 * mmhg_per_mmol
+
+        # CO2 exchange
+        self._exchange_co2(dt, 0.0, mmhg_per_mmol)
+
+    def _simulate_mean_gas_exchange(self, dt: float):
+        # Breath-averaged ventilation and diffusion, solved exactly over dt so the
+        # step is limited by neither the breath nor the exchange rate
+        fresh_o2 = 104  # mmHg
+
+        # Each inhaled dV mixes in fresh air with fraction dV / V, so over a breath
+        # the alveolar gas relaxes towards fresh air by a factor FRC / (FRC + TV)
+        ventilation = (
+            self.respiratory_rate
+            / 60
+            * math.log(1 + self.tidal_volume / self.functional_residual_capacity)
+        )  # 1/s
+        mmhg_per_mmol = 760 / (22.4 * self.alveolar_volume / 1000)
+
+        # O2 exchange, with the blood pO2 held over the step
         blood_po2 = self.oxygen_hemoglobin_dissociation(self.blood.oxygen_saturation * 100)
-        diffusable_o2 = 0.0446 * (self.alveolar_po2 - blood_po2) * self.diffusion_capacity_o2 * dt / 60
+        o2_conductance = 0.0446 * self.diffusion_capacity_o2 / 60  # mmol/s/mmHg
+        rate = o2_conductance * mmhg_per_mmol + ventilation  # 1/s
+        if rate:
+            target_po2 = (
+                o2_conductance * mmhg_per_mmol * blood_po2 + ventilation * fresh_o2
+            ) / rate
+            decay = math.exp(-rate * dt)
+            alveolar_po2 = target_po2 + (self.alveolar_po2 - target_po2) * decay
+            gradient = (target_po2 - blood_po2) * dt + (
+                self.alveolar_po2 - target_po2
+            ) * (1 - decay) / rate  # mmHg·s
+            diffusable_o2 = o2_conductance * gradient
+        else:  # Neither diffusion nor ventilation
+            alveolar_po2, diffusable_o2 = self.alveolar_po2, 0.0
         diffused_o2 = min(max(diffusable_o2, 0), self.blood.total_oxygen_capacity - self.blood.o2_amount)
         self.blood.o2_amount += diffused_o2
-        self.alveolar_po2 -= diffused_o2 * 760 / (22.4 * self.alveolar_volume / 1000)
+        if diffused_o2 != diffusable_o2:
+            # Saturated blood takes up less, so ventilation dominates
+            alveolar_po2 = (
+                fresh_o2
+                + (self.alveolar_po2 - fresh_o2) * math.exp(-ventilation * dt)
+                - diffused_o2 * mmhg_per_mmol
+            )
+        self.alveolar_po2 = alveolar_po2
 
         # CO2 exchange
-        blood_pco2 = max(self.blood.co2_concentration / 0.03, 1e-6)
-        diffusable_co2 = 0.0446 * (blood_pco2 - self.alveolar_pco2) * self.diffusion_capacity_co2 * dt / 60
-        diffused_co2 = min(max(diffusable_co2, 0), self.blood.co2_amount)
-        self.blood.co2_amount -= diffused_co2
-        self.alveolar_pco2 += diffused_co2 * 760 / (22.4 * self.alveolar_volume / 1000)
-
-    def oxygen_hemoglobin_dissociation(self, po2: float) -> float:
-        return 100 * (po2**2.8) / (po2**2.8 + 26**2.8)
+        self._exchange_co2(dt, ventilation, mmhg_per_mmol)
+
+    def _exchange_co2(self, dt: float, ventilation: float, mmhg_per_mmol: float):
+        # Blood and alveolar gas together. Relative to fresh air, x' = -a (x - y)
+        # for the blood pCO2 x and y' = b (x - y) - v y for the alveolar pCO2 y,
+        # a linear system solved by its matrix exponential. Without ventilation
+        # (v = 0) the slow rate is 0: the total is conserved and only the gradient
+        # decays.
+        fresh_co2 = 36  # mmHg
+        co2_conductance = 0.0446 * self.diffusion_capacity_co2 / 60  # mmol/s/mmHg
+        a = co2_conductance / (0.03 * self.blood.volume / 1000)
+        b = co2_conductance * mmhg_per_mmol
+        v = ventilation
+        x = max(self.blood.co2_concentration / 0.03, 1e-6) - fresh_co2
+        y = self.alveolar_pco2 - fresh_co2
+        if x < y or not a + b:
+            # CO2 only diffuses out of the blood, as with the explicit update
+            # this replaced, so against the gradient only ventilation acts
+            self.alveolar_pco2 = fresh_co2 + y * math.exp(-v * dt)
+            return
+
+        trace = -(a + b + v)
+        root = math.sqrt(trace**2 - 4 * a * v)
+        fast, slow = (trace - root) / 2, (trace + root) / 2
+        fast_decay, slow_decay = math.exp(fast * dt), math.exp(slow * dt)
+        # exp(M dt) = (e^(slow dt) (M - fast) - e^(fast dt) (M - slow)) / (slow - fast)
+        new_x = (
+            slow_decay * ((-a - fast) * x + a * y)
+            - fast_decay * ((-a - slow) * x + a * y)
+        ) / (slow - fast)
+        new_y = (
+            slow_decay * (b * x + (-b - v - fast) * y)
+            - fast_decay * (b * x + (-b - v - slow) * y)
+        ) / (slow - fast)
+        self.blood.co2_amount = (new_x + fresh_co2) * 0.03 * self.blood.volume / 1000
+        self.alveolar_pco2 = new_y + fresh_co2
+
+    # % saturation at a pO2, exact or tabulated (see model/lut.py)
+    oxygen_hemoglobin_dissociation = staticmethod(dissociation)
+
+    def _dissociation_slope(self, po2: float) -> float:
+        # d/dpo2 of oxygen_hemoglobin_dissociation
+        return 100 * 2.8 * po2**1.8 * 26**2.8 / (po2**2.8 + 26**2.8) ** 2
 
     def _organ_specific_metrics(self) -> dict:
         return {
@@ -0,0 +1,109 @@
+import math
+import os
+from collections.abc import Callable
+
+import numpy as np
+
+# The smooth nonlinearities of the hot path (oxygen dissociation curve, the
+# log10 of the pH and the systolic Gaussian), each as a scalar function and a
+# NumPy one, computed exactly or from interpolated tables.
+#
+# A table interpolates linearly on a uniform grid of step h, so inside its
+# range the error is at most h**2 / 8 * max|f''|; Table.max_error is that error
+# as measured on a fine grid when the table is built. Inputs outside the range
+# fall back to the exact function. With HUPHYS_LUT=1 the model uses the tables.
+# On CPython with a vectorized libm they are not faster than the exact
+# functions (see python -m model.bench), so they are off by default.
+ENABLED = os.environ.get("HUPHYS_LUT", "") not in ("", "0")
+
+_P50 = 26**2.8  # mmHg**2.8, half saturation at 26 mmHg
+
+
+def exact_dissociation(po2: float) -> float:
+    # Hill curve: % saturation at `po2` mmHg
+    q = po2**2.8
+    return 100 * q / (q + _P50)
+
+
+def exact_dissociation_vector(po2: np.ndarray) -> np.ndarray:
+    q = po2**2.8
+    return 100 * q / (q + _P50)
+
+
+def exact_gaussian(u: float) -> float:
+    return math.exp(-(u**2))
+
+
+def exact_gaussian_vector(u: np.ndarray) -> np.ndarray:
+    return np.exp(-(u**2))
+
+
+class Table:
+    def __init__(
+        self,
+        function: Callable[[float], float],
+        vector: Callable[[np.ndarray], np.ndarray],
+        low: float,
+        high: float,
+        size: int,
+    ):
+        self.function = function
+        self.exact_vector = vector
+        self.low = low
+        self.high = high
+        self.size = size  # intervals
+        self.scale = size / (high - low)
+        grid = np.linspace(low, high, size + 1)
+        values = vector(grid)
+        self.values_array = values
+        self.slopes_array = np.diff(values)
+        # Lists index faster than arrays from scalar Python code
+        self.values = values.tolist()
+        self.slopes = self.slopes_array.tolist()
+        fine = np.linspace(low, high, 16 * size + 1)
+        self.max_error = float(np.max(np.abs(self.vector(fine) - vector(fine))))
+
+    def __call__(self, x: float) -> float:
+        t = (x - self.low) * self.scale
+        if not 0 <= t < self.size:
+            return self.function(x)
+        i = int(t)
+        return self.values[i] + self.slopes[i] * (t - i)
+
+    def vector(self, x: np.ndarray) -> np.ndarray:
+        t = (x - self.low) * self.scale
+        i = np.clip(t, 0, self.size - 1).astype(np.intp)
+        interpolated = self.values_array[i] + self.slopes_array[i] * (t - i)
+        inside = (t >= 0) & (t <= self.size)
+        if inside.all():
+            return interpolated
+        return np.where(inside, interpolated, self.exact_vector(x))
+
+
+# Saturation in %, as fed to the curve by the lungs, with headroom
+DISSOCIATION = Table(exact_dissociation, exact_dissociation_vector, 0, 200, 2000)
+# (beat phase - 0.15) / 0.1 over systole is within ±1.5
+GAUSSIAN = Table(exact_gaussian, exact_gaussian_vector, -4, 4, 1600)
+# log10 of the mantissa m in [0.5, 1) of x = m * 2**e
+LOG10_MANTISSA = Table(math.log10, np.log10, 0.5, 1, 512)
+_LOG10_2 = math.log10(2)
+
+
+def table_log10(x: float) -> float:
+    mantissa, exponent = math.frexp(x)
+    return LOG10_MANTISSA(mantissa) + exponent * _LOG10_2
+
+
+def table_log10_vector(x: np.ndarray) -> np.ndarray:
+    mantissa, exponent = np.frexp(x)
+    return LOG10_MANTISSA.vector(mantissa) + exponent * _LOG10_2
+
+
+if ENABLED:
+    dissociation, dissociation_vector = DISSOCIATION, DISSOCIATION.vector
+    gaussian, gaussian_vector = GAUSSIAN, GAUSSIAN.vector
+    log10, log10_vector = table_log10, table_log10_vector
+else:
+    dissociation, dissociation_vector = exact_dissociation, exact_dissociation_vector
+    gaussian, gaussian_vector = exact_gaussian, exact_gaussian_vector
+    log10, log10_vector = math.log10, np.log10
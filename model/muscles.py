@@ -1,8 +1,25 @@
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Muscles(Organ):
+    state_fields = Organ.state_fields + (
+        "glucose_uptake_rate",
+        "glycogen_storage",
+        "base_energy_demand",
+    )
+
+    processes = Organ.processes + (
+        "generate_heat",
+        "metabolize_glucose",
+        "metabolize_fatty_acids",
+        "store_glycogen",
+        "break_down_glycogen",
+        "synthesize_proteins",
+        "break_down_proteins",
+        "regulate_blood_flow",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -13,44 +30,42 @@ class Muscles(Organ):
         self.glycogen_storage = 500  # g
         self.base_energy_demand = 16  # kcal/hour
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self.generate_heat(dt)
-        self.metabolize_glucose(dt)
-        self.metabolize_fatty_acids(dt)
-        self.store_glycogen(dt)
-        self.break_down_glycogen(dt)
-        self.synthesize_proteins(dt)
-        self.break_down_proteins(dt)
-        self.regulate_blood_flow(dt)
-
+    @placeholder
     def generate_heat(self, dt: float):
         # Placeholder for heat generation
         pass
 
+    @placeholder
     def metabolize_glucose(self, dt: float):
         # Placeholder for glucose metabolism
         pass
 
+    @placeholder
     def metabolize_fatty_acids(self, dt: float):
         # Placeholder for fatty acid metabolism
         pass
 
+    @placeholder
     def store_glycogen(self, dt: float):
         # Placeholder for glycogen storage
         pass
 
+    @placeholder
     def break_down_glycogen(self, dt: float):
         # Placeholder for glycogen breakdown
         pass
 
+    @placeholder
     def synthesize_proteins(self, dt: float):
         # Placeholder for protein synthesis
         pass
 
+    @placeholder
     def break_down_proteins(self, dt: float):
         # Placeholder for protein breakdown
         pass
 
+    @placeholder
     def regulate_blood_flow(self, dt: float):
         # Placeholder for blood flow regulation
         pass
@@ -59,6 +74,11 @@ class Muscles(Organ):
         self.energy_demand = self.base_energy_demand * factor
         self.glucose_uptake_rate = 2 + 18 * (factor - 1)  # Up to 20 mg/min during intense exercise
 
+    def relax(self):
+        # Muscle tone drops during sleep
+        self.energy_demand = self.base_energy_demand * 0.8
+        self.glucose_uptake_rate = 1.5  # mg/min
+
     def reset_energy_demand(self):
         self.energy_demand = self.base_energy_demand
         self.glucose_uptake_rate = 2  # mg/min at rest
@@ -1,7 +1,49 @@
-from model.blood import Blood
+from collections.abc import Callable
+
+from model.blood import SPECIES_INDEX, Blood
+
+# Indices into Blood.amounts for the species every organ touches each tick
+GLUCOSE = SPECIES_INDEX["glucose"]
+FATTY_ACID = SPECIES_INDEX["fatty_acid"]
+AMINO_ACID = SPECIES_INDEX["amino_acid"]
+TRIGLYCERIDE = SPECIES_INDEX["triglyceride"]
+CHOLESTEROL = SPECIES_INDEX["cholesterol"]
+PHOSPHOLIPID = SPECIES_INDEX["phospholipid"]
+INSULIN = SPECIES_INDEX["insulin"]
+O2 = SPECIES_INDEX["o2"]
+CO2 = SPECIES_INDEX["co2"]
+
+Process = Callable[[float], None]
+
+
+def placeholder[P: Callable](process: P) -> P:
+    # Marks a process that does nothing yet. Update plans leave it out; drop the
+    # marker when giving it a real body.
+    process.placeholder = True  # type: ignore[attr-defined]
+    return process
 
 
 class Organ:
+    # Numeric attributes that make up the organ state (see model/cohort.py)
+    state_fields: tuple[str, ...] = (
+        "energy_demand",
+        "insulin_sensitivity",
+        "glucagon_sensitivity",
+        "fat_oxidation_rate",
+    )
+    # Methods run by update(dt), in order
+    processes: tuple[str, ...] = (
+        "consume_nutrients",
+        "process_insulin",
+    )
+    # Period in seconds of the processes that need not run every tick; the
+    # multi-rate scheduler calls them once per period with the elapsed time
+    # (see model/scheduler.py)
+    update_periods: dict[str, float] = {
+        "consume_nutrients": 1,
+        "process_insulin": 1,
+    }
+
     def __init__(
         self,
         blood: Blood,
@@ -14,6 +56,29 @@ class Organ:
         self.insulin_sensitivity = insulin_sensitivity  # dimensionless
         self.glucagon_sensitivity = glucagon_sensitivity  # dimensionless
         self.fat_oxidation_rate = 0.1  # fraction of energy from fat
+        # (process, period in s) registered with add_process()
+        self.extra_processes: list[tuple[Process, float]] = []
+
+    def add_process(self, process: Process, period: float = 0.0) -> None:
+        # Runs `process(dt)` after the organ's own processes, every `period`
+        # seconds under the multi-rate scheduler. Bodies pick it up when they
+        # next build their update plan (see HumanBody.add_process()).
+        self.extra_processes.append((process, period))
+
+    def active_processes(self, multirate: bool = False) -> list[tuple[Process, float]]:
+        # (bound process, period in s) of the processes that do work, in run
+        # order; periods are 0 (every tick) unless multirate
+        active = []
+        for name in self.processes:
+            process = getattr(self, name)
+            if not getattr(process, "placeholder", False):
+                period = self.update_periods.get(name, 0.0) if multirate else 0.0
+                active.append((process, period))
+        active.extend(
+            (process, period if multirate else 0.0)
+            for process, period in self.extra_processes
+        )
+        return active
 
     def _organ_specific_metrics(self) -> dict:
         return {}
@@ -27,13 +92,14 @@ class Organ:
         return metrics
 
     def consume_nutrients(self, dt: float) -> None:
-        oxygen_available = self.blood.o2_amount  # mmol O2
-        glucose_available = self.blood.glucose_amount  # mg
-        fatty_acid_available = self.blood.fatty_acid_amount  # mg
-        amino_acid_available = self.blood.amino_acid_amount  # mg
-        triglyceride_available = self.blood.triglyceride_amount  # mg
-        cholesterol_available = self.blood.cholesterol_amount  # mg
-        phospholipid_available = self.blood.phospholipid_amount  # mg
+        amounts = self.blood.amounts
+        oxygen_available = amounts[O2]  # mmol O2
+        glucose_available = amounts[GLUCOSE]  # mg
+        fatty_acid_available = amounts[FATTY_ACID]  # mg
+        amino_acid_available = amounts[AMINO_ACID]  # mg
+        triglyceride_available = amounts[TRIGLYCERIDE]  # mg
+        cholesterol_available = amounts[CHOLESTEROL]  # mg
+        phospholipid_available = amounts[PHOSPHOLIPID]  # mg
         
         # Calculate energy consumption based on demand and availability
         energy_demanded = self.energy_demand * dt / 3600  # kcal, adjusted for dt in seconds
@@ -116,36 +182,32 @@ class Organ:
         co2_produced = oxygen_consumed * rq  # mmol CO2
         
         # Update blood CO2 concentration
-        self.blood.co2_amount += co2_produced
+        amounts[CO2] += co2_produced
         
         # Update blood nutrient levels
-        self.blood.glucose_amount -= glucose_consumed
-        self.blood.fatty_acid_amount -= fatty_acid_consumed
-        self.blood.triglyceride_amount -= triglyceride_consumed
-        self.blood.cholesterol_amount -= cholesterol_consumed
-        self.blood.phospholipid_amount -= phospholipid_consumed
-        self.blood.amino_acid_amount -= amino_acid_consumed
+        amounts[GLUCOSE] -= glucose_consumed
+        amounts[FATTY_ACID] -= fatty_acid_consumed
+        amounts[TRIGLYCERIDE] -= triglyceride_consumed
+        amounts[CHOLESTEROL] -= cholesterol_consumed
+        amounts[PHOSPHOLIPID] -= phospholipid_consumed
+        amounts[AMINO_ACID] -= amino_acid_consumed
         
         # Update blood oxygen levels
-        self.blood.o2_amount -= oxygen_consumed
+        amounts[O2] -= oxygen_consumed
 
     def process_insulin(self, dt: float) -> None:
+        amounts = self.blood.amounts
         insulin_effect = self.blood.insulin_concentration * self.insulin_sensitivity
         glucose_uptake = min(
             self.energy_demand * dt / 3600 * 1000 / 4 * insulin_effect / 10,  # Convert kcal to mg glucose, adjust for μU/mL
-            self.blood.glucose_amount * 0.1  # Limit uptake to 10% of available glucose
+            amounts[GLUCOSE] * 0.1  # Limit uptake to 10% of available glucose
         )
-        self.blood.glucose_amount -= glucose_uptake
+        amounts[GLUCOSE] -= glucose_uptake
         
         # Reduce insulin in the blood as it's used
         insulin_used = glucose_uptake * 0.001  # Assume 1 unit of insulin per 1000 mg of glucose
-        self.blood.insulin_amount = max(0, self.blood.insulin_amount - insulin_used)
-
-    def _organ_specific_processing(self, dt: float) -> None:
-        # To be overridden by subclasses
-        pass
+        amounts[INSULIN] = max(0, amounts[INSULIN] - insulin_used)
 
     def update(self, dt: float):
-        self.consume_nutrients(dt)
-        self.process_insulin(dt)
-        self._organ_specific_processing(dt)
+        for process, _ in self.active_processes():
+            process(dt)
@@ -1,8 +1,24 @@
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Pancreas(Organ):
+    state_fields = Organ.state_fields + (
+        "insulin_production_rate",
+        "glucagon_production_rate",
+    )
+
+    processes = Organ.processes + (
+        "_produce_insulin",
+        "_produce_glucagon",
+        "_produce_somatostatin",
+        "_produce_pancreatic_polypeptide",
+        "_produce_digestive_enzymes",
+        "_regulate_blood_sugar",
+        "_regulate_fat_metabolism",
+        "_regulate_protein_metabolism",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -12,36 +28,32 @@ class Pancreas(Organ):
         self.insulin_production_rate = 0.5  # μU/mL/min
         self.glucagon_production_rate = 0.1  # ng/mL/min
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._produce_insulin(dt)
-        self._produce_glucagon(dt)
-        self._produce_somatostatin(dt)
-        self._produce_pancreatic_polypeptide(dt)
-        self._produce_digestive_enzymes(dt)
-        self._regulate_blood_sugar(dt)
-        self._regulate_fat_metabolism(dt)
-        self._regulate_protein_metabolism(dt)
-
+    @placeholder
     def _produce_somatostatin(self, dt: float):
         # Placeholder for somatostatin production
         pass
 
+    @placeholder
     def _produce_pancreatic_polypeptide(self, dt: float):
         # Placeholder for pancreatic polypeptide production
         pass
 
+    @placeholder
     def _produce_digestive_enzymes(self, dt: float):
         # Placeholder for digestive enzyme production
         pass
 
+    @placeholder
     def _regulate_blood_sugar(self, dt: float):
         # Placeholder for blood sugar regulation
         pass
 
+    @placeholder
     def _regulate_fat_metabolism(self, dt: float):
         # Placeholder for fat metabolism regulation
         pass
 
+    @placeholder
     def _regulate_protein_metabolism(self, dt: float):
         # Placeholder for protein metabolism regulation
         pass
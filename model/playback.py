@@ -0,0 +1,79 @@
+import math
+import time
+
+from model.body import HumanBody
+
+# Share of each publish interval the dashboard may spend stepping bodies, all
+# sessions together; the rest is left for building and sending the metrics
+STEP_BUDGET = 0.8
+# Publish rates above this are capped, Hz
+MAX_PUBLISH_RATE = 60
+
+
+class Playback:
+    # Paces a live body for the dashboard: metrics go out `publish_rate` times a
+    # second of wall time, and between publishes the body advances `speed`
+    # times as much simulated time ("max" steps for as long as the interval
+    # allows). Clients change both with
+    #
+    #   {"action": "set_publish_rate", "rate": 30}
+    #   {"action": "set_speed", "speed": 60}  (or "max")
+    actions = ("set_publish_rate", "set_speed")
+
+    def __init__(self, publish_rate: float = 10, speed: float | str = 1):
+        self.publish_rate = 10.0  # Hz
+        self.speed = 1.0  # simulated s per wall s, inf for "max"
+        self.set_publish_rate(publish_rate)
+        self.set_speed(speed)
+        self.owed = 0.0  # simulated s still to step
+        # Steps taken so far. advance() counts them as it goes, so the count
+        # holds even if whoever awaited it was cancelled.
+        self.steps = 0
+
+    @property
+    def interval(self) -> float:
+        return 1 / self.publish_rate  # wall s between publishes
+
+    def set_publish_rate(self, rate: float) -> None:
+        rate = float(rate)
+        if not (rate > 0 and math.isfinite(rate)):
+            raise ValueError(f"Invalid publish rate: {rate}")
+        self.publish_rate = min(rate, MAX_PUBLISH_RATE)
+
+    def set_speed(self, speed: float | str) -> None:
+        if speed == "max":
+            speed = math.inf
+        else:
+            speed = float(speed)
+            if not (speed > 0 and math.isfinite(speed)):
+                raise ValueError(f"Invalid speed: {speed}")
+        self.speed = speed
+        self.owed = 0.0
+
+    def apply_action(self, data: dict) -> None:
+        action = data["action"]
+        if action == "set_publish_rate":
+            self.set_publish_rate(data["rate"])
+        elif action == "set_speed":
+            self.set_speed(data["speed"])
+        else:
+            raise ValueError(f"Unknown playback action: {action}")
+
+    def advance(self, body: HumanBody, share: float = 1.0) -> int:
+        # Steps `body` through one publish interval and returns the steps taken.
+        # `share` is this session's part of STEP_BUDGET, 1 / n with n live
+        # sessions. Time the steps cannot cover within that budget is dropped
+        # rather than owed, so a speed the machine cannot keep up with runs as
+        # fast as it can, like "max".
+        self.owed += self.speed * self.interval
+        deadline = time.perf_counter() + STEP_BUDGET * share * self.interval
+        steps = 0
+        while self.owed >= body.dt - 1e-9:
+            body.step()
+            self.owed -= body.dt
+            self.steps += 1
+            steps += 1
+            if time.perf_counter() > deadline:
+                self.owed = 0.0
+                break
+        return steps
@@ -0,0 +1,161 @@
+import re
+
+from model.blood import Blood
+from model.bones import Bones
+from model.brain import Brain
+from model.fat import Fat
+from model.heart import Heart
+from model.intestines import Intestines
+from model.kidneys import Bladder, Kidneys
+from model.liver import GallBladder, Liver
+from model.lungs import Lungs
+from model.muscles import Muscles
+from model.organ import Organ
+from model.pancreas import Pancreas
+from model.skin import Skin
+from model.spleen import Spleen
+from model.stomach import Stomach
+from model.thyroid import Thyroid
+
+# Organ classes by the name used in HumanBody.organs, state fields and metric
+# paths. Bodies keep each organ in the snake_case attribute of its name
+# (GallBladder -> body.gall_bladder), None when the spec leaves it out.
+ORGANS: dict[str, type[Organ]] = {
+    "Heart": Heart,
+    "Lungs": Lungs,
+    "Brain": Brain,
+    "Kidneys": Kidneys,
+    "Liver": Liver,
+    "Muscles": Muscles,
+    "Pancreas": Pancreas,
+    "Fat": Fat,
+    "Stomach": Stomach,
+    "Intestines": Intestines,
+    "Skin": Skin,
+    "Spleen": Spleen,
+    "Bladder": Bladder,
+    "GallBladder": GallBladder,
+    "Bones": Bones,
+    "Thyroid": Thyroid,
+}
+
+# Cross-organ links as (organ, setter, target): the builder calls
+# organs[organ].setter(organs[target]) when both organs are in the body.
+# Organs skip the signals of links that were left unset.
+LINKS: tuple[tuple[str, str, str], ...] = (
+    ("Brain", "set_lungs", "Lungs"),
+    ("Brain", "set_heart", "Heart"),
+    ("Brain", "set_kidneys", "Kidneys"),
+    ("Brain", "set_muscles", "Muscles"),
+    ("Kidneys", "set_bladder", "Bladder"),
+    ("Liver", "set_gall_bladder", "GallBladder"),
+    ("GallBladder", "set_intestines", "Intestines"),
+    ("Stomach", "set_intestines", "Intestines"),
+)
+
+# A spec is a dict like
+#
+#   {
+#     "organs": {"Liver": {"insulin_sensitivity": 0.6}, "Pancreas": {}},
+#     "blood_volume": 5000,
+#     "links": [["Liver", "set_gall_bladder", "GallBladder"]]
+#   }
+#
+# "organs" lists the organs to build, in update order, each with attributes to
+# set after construction. "blood_volume" (mL) defaults to 5000 and "links" to
+# the LINKS between the listed organs. Specs can also be named, see SPECS.
+SPECS: dict[str, dict] = {
+    # The whole body, as the dashboard runs it
+    "full": {
+        "organs": {
+            name: {}
+            for name in (
+                "Heart",
+                "Lungs",
+                "Brain",
+                "Kidneys",
+                "Liver",
+                "Muscles",
+                "Pancreas",
+                "Fat",
+                "Stomach",
+                "Intestines",
+                "Skin",
+                "Spleen",
+                "Bladder",
+                "GallBladder",
+            )
+        },
+    },
+    # Meal absorption, insulin and glucagon secretion and the tissues that take
+    # up and store glucose. Lungs keep the blood oxygenated (organs burn
+    # nutrients only with oxygen); no heart, kidneys or brain control.
+    "glucose_insulin": {
+        "organs": {
+            name: {}
+            for name in (
+                "Lungs",
+                "Liver",
+                "Muscles",
+                "Pancreas",
+                "Fat",
+                "Stomach",
+                "Intestines",
+            )
+        },
+    },
+}
+DEFAULT_SPEC = "full"
+
+
+def register(name: str, organ: type[Organ]) -> None:
+    # Makes a new organ class available to specs under `name`
+    ORGANS[name] = organ
+
+
+def attribute(name: str) -> str:
+    # "GallBladder" -> "gall_bladder"
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def resolve_spec(spec: dict | str | None = None) -> dict:
+    # The spec with its defaults filled in, checked against the registry
+    spec = (
+        SPECS[DEFAULT_SPEC if spec is None else spec]
+        if isinstance(spec, str | None)
+        else spec
+    )
+    unknown = set(spec) - {"organs", "blood_volume", "links"}
+    if unknown:
+        raise ValueError(f"Unknown spec keys: {sorted(unknown)}")
+    organs = {name: dict(parameters) for name, parameters in spec["organs"].items()}
+    for name in organs:
+        if name not in ORGANS:
+            raise ValueError(f"Unknown organ: {name!r}")
+    links = [
+        tuple(link)
+        for link in spec.get("links", LINKS)
+        if link[0] in organs and link[2] in organs
+    ]
+    for organ, setter, _ in links:
+        if not hasattr(ORGANS[organ], setter):
+            raise ValueError(f"{organ} has no link {setter!r}")
+    return {
+        "organs": organs,
+        "blood_volume": spec.get("blood_volume", 5000),
+        "links": links,
+    }
+
+
+def build_organs(blood: Blood, spec: dict) -> dict[str, Organ]:
+    # Organs of a resolved spec on `blood`, parameterized and linked
+    organs = {}
+    for name, parameters in spec["organs"].items():
+        organ = organs[name] = ORGANS[name](blood)
+        for parameter, value in parameters.items():
+            if not hasattr(organ, parameter):
+                raise ValueError(f"Unknown parameter: {name}.{parameter}")
+            setattr(organ, parameter, value)
+    for organ, setter, target in spec["links"]:
+        getattr(organs[organ], setter)(organs[target])
+    return organs
@@ -0,0 +1,115 @@
+import argparse
+import base64
+import json
+import os
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+from model.body import HumanBody
+from model.snapshot import restore, snapshot
+
+# A session log is JSON lines: a header with the initial body snapshot, one
+# {"step": n, "action": {...}} line per action applied after n steps, one
+# {"publish": n} line per metrics update sent to the client after n steps, and
+# an {"end": n} line with the number of steps once the session closes.
+SESSIONS_DIR = Path(os.environ.get("HUPHYS_SESSIONS_DIR", "sessions"))
+_VERSION = 2
+
+
+class SessionRecorder:
+    def __init__(self, body: HumanBody, directory: Path | None = None):
+        directory = directory or SESSIONS_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = (
+            directory / f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl"
+        )
+        self.file = open(self.path, "w")  # noqa: SIM115 - open for the whole session
+        self._write(
+            {"version": _VERSION, "initial": base64.b64encode(snapshot(body)).decode()}
+        )
+
+    def _write(self, entry: dict) -> None:
+        self.file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def record(self, step: int, action: dict) -> None:
+        self._write({"step": step, "action": action})
+
+    def publish(self, step: int) -> None:
+        self._write({"publish": step})
+
+    def close(self, steps: int) -> None:
+        self._write({"end": steps})
+        self.file.close()
+
+
+def read_session(path: str | Path) -> tuple[bytes, list[tuple[int, dict | None]], int]:
+    # (initial snapshot, [(step, action)], steps), with the actions and
+    # publishes (action None) in the order they happened. A session that was
+    # cut off without an end line ends at its last action or publish.
+    with open(path) as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    header, entries = lines[0], lines[1:]
+    if header.get("version") != _VERSION:
+        raise ValueError(f"Unsupported session log version: {header.get('version')}")
+    events = [
+        (entry["step"], entry["action"])
+        if "action" in entry
+        else (entry["publish"], None)
+        for entry in entries
+        if "action" in entry or "publish" in entry
+    ]
+    ends = [entry["end"] for entry in entries if "end" in entry]
+    steps = ends[-1] if ends else max((step for step, _ in events), default=0)
+    return base64.b64decode(header["initial"]), events, steps
+
+
+def replay(path: str | Path, record: list[str] | None = None) -> Iterator[dict]:
+    # Re-runs a session on a fresh body as fast as possible, yielding what the
+    # dashboard received at each publish: full metrics, or `record` paths only
+    initial, events, steps = read_session(path)
+    body = restore(initial)
+    step = 0
+    for at, action in events:
+        while step < at:
+            body.step()
+            step += 1
+        if action is None:
+            yield body.sample(record)
+        else:
+            body.apply_action(action)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded dashboard session at full speed"
+    )
+    parser.add_argument("session", help="session log (JSON lines)")
+    parser.add_argument(
+        "--record", nargs="*", help="metric paths to output instead of the full metrics"
+    )
+    parser.add_argument(
+        "--output", help="write the metric stream to this JSON lines file"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    frames = 0
+    with open(args.output or os.devnull, "w") as output:
+        for metrics in replay(args.session, args.record):
+            frames += 1
+            if args.output:
+                output.write(json.dumps(metrics) + "\n")
+    elapsed = time.perf_counter() - started
+    steps = read_session(args.session)[2]
+    print(
+        f"{frames} frames, {steps} steps in {elapsed:.1f} s"
+        f" ({steps / max(elapsed, 1e-9):.0f} steps/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
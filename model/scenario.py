@@ -0,0 +1,235 @@
+import argparse
+import json
+import math
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from model.body import HumanBody
+from model.equilibrium import warm_start
+from model.registry import resolve_spec
+
+# A scenario is JSON like
+#
+#   {
+#     "name": "meal_response",
+#     "duration": "3h",
+#     "parameters": {"Liver.insulin_sensitivity": 0.6},
+#     "actions": [
+#       {"time": "10m", "action": "eat", "amount": 75},
+#       {"time": "1h", "action": "start_exercise"},
+#       {"time": "1h", "action": "drink", "amount": 250, "every": "15m", "count": 3}
+#     ],
+#     "record": ["Blood/glucose_concentration"],
+#     "every": "1m"
+#   }
+#
+# Actions are the dashboard's (see HumanBody.actions), with positive amounts.
+# Times are seconds or strings such as "90s", "15m", "1h30m" or "1:30:00", and
+# actions run at the first step at or after their time. An action with "every"
+# and "count" repeats. Everything except "duration" has a default.
+DEFAULTS: dict = {
+    "name": "scenario",
+    "dt": 0.1,  # s
+    "fidelity": "waveform",
+    "multirate": False,
+    "spec": "full",  # organs to build, a spec name or dict, see model/registry.py
+    "warm_start": False,  # begin at the cached equilibrium, see model/equilibrium.py
+    "parameters": {},
+    "actions": [],
+    "record": [
+        "Blood/glucose_concentration",
+        "Blood/insulin_concentration",
+        "Blood/glucagon_concentration",
+        "Organs/Heart/pumping_rate",
+        "Organs/Liver/glucose_storage",
+    ],
+    "every": 60,  # s between samples
+}
+
+_DURATION = re.compile(
+    r"^(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m)?(?:(\d+(?:\.\d+)?)s)?$"
+)
+
+
+def parse_time(value: float | str) -> float:
+    # Seconds from a number, "1h30m"-style units or "h:mm[:ss]"
+    if _is_number(value):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid time: {value!r}")
+    text = value.strip()
+    if ":" in text:
+        parts = [float(part) for part in text.split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid time: {value!r}")
+        return sum(
+            part * unit for part, unit in zip(parts, (3600, 60, 1), strict=False)
+        )
+    match = _DURATION.match(text)
+    if not text or match is None:
+        raise ValueError(f"Invalid time: {value!r}")
+    hours, minutes, seconds = (float(group or 0) for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _is_number(value) -> bool:
+    # bool is an int, but true is no amount
+    return (
+        isinstance(value, int | float)
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def load_scenario(data: dict) -> dict:
+    # Fills in defaults, converts times to seconds, expands repeated actions and
+    # checks every action, so mistakes show up before anything runs
+    if "duration" not in data:
+        raise ValueError("Scenario needs a duration")
+    unknown = set(data) - set(DEFAULTS) - {"duration"}
+    if unknown:
+        raise ValueError(f"Unknown scenario keys: {sorted(unknown)}")
+
+    scenario = DEFAULTS | data
+    scenario["duration"] = parse_time(scenario["duration"])
+    scenario["every"] = parse_time(scenario["every"])
+    scenario["dt"] = parse_time(scenario["dt"])
+    resolve_spec(scenario["spec"])
+
+    actions = []
+    for entry in data.get("actions", []):
+        action = entry.get("action")
+        if action not in HumanBody.actions:
+            raise ValueError(f"Unknown action: {action!r}")
+        missing = [field for field in HumanBody.actions[action] if field not in entry]
+        if missing:
+            raise ValueError(f"Action {action!r} needs {missing}")
+        for field in HumanBody.actions[action]:
+            if not _is_number(entry[field]) or entry[field] <= 0:
+                raise ValueError(
+                    f"Action {action!r} needs a positive number as {field},"
+                    f" got {entry[field]!r}"
+                )
+        count = entry.get("count", 1)
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            raise ValueError(
+                f"Action {action!r} needs a positive whole count, got {count!r}"
+            )
+        start = parse_time(entry.get("time", 0))
+        every = parse_time(entry.get("every", 0))
+        fields = {
+            key: value
+            for key, value in entry.items()
+            if key not in ("time", "every", "count")
+        }
+        for i in range(count):
+            actions.append({"time": start + i * every, **fields})
+    scenario["actions"] = sorted(actions, key=lambda action: action["time"])
+    return scenario
+
+
+def read_scenario(path: str | Path) -> dict:
+    with open(path) as f:
+        data = json.load(f)
+    data.setdefault("name", Path(path).stem)
+    return load_scenario(data)
+
+
+def build_body(scenario: dict, parameters: dict[str, float] | None = None) -> HumanBody:
+    # `parameters` override the scenario's own
+    parameters = scenario["parameters"] | (parameters or {})
+    if scenario["warm_start"]:
+        return warm_start(
+            parameters,
+            multirate=scenario["multirate"],
+            fidelity=scenario["fidelity"],
+            spec=scenario["spec"],
+        )
+    body = HumanBody(
+        multirate=scenario["multirate"],
+        fidelity=scenario["fidelity"],
+        spec=scenario["spec"],
+    )
+    for path, value in parameters.items():
+        body.set_parameter(path, value)
+    return body
+
+
+def play(body: HumanBody, scenario: dict, sample: bool = True) -> list[dict]:
+    # Runs the scenario's actions on `body` headless, sampling its record paths
+    # every scenario["every"] seconds
+    dt = scenario["dt"]
+    sample_every = max(1, round(scenario["every"] / dt))
+    # Actions by the index of the step they precede, rather than by comparing
+    # times against body.time, which drifts as it sums many steps
+    pending = [
+        (math.ceil(action["time"] / dt - 1e-9), action)
+        for action in scenario["actions"]
+    ][::-1]
+
+    trajectory = []
+    for i in range(1, round(scenario["duration"] / dt) + 1):
+        while pending and pending[-1][0] < i:
+            body.apply_action(pending.pop()[1])
+        body.step(dt)
+        if sample and i % sample_every == 0:
+            trajectory.append(body.sample(scenario["record"]))
+    return trajectory
+
+
+def run_scenario(
+    scenario: dict, parameters: dict[str, float] | None = None
+) -> list[dict]:
+    return play(build_body(scenario, parameters), scenario)
+
+
+def _run_file(scenario: dict, output_dir: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    trajectory = run_scenario(scenario)
+    elapsed = time.perf_counter() - started
+    output = Path(output_dir) / f"{scenario['name']}.json"
+    with open(output, "w") as f:
+        json.dump({"scenario": scenario, "trajectory": trajectory}, f)
+    return str(output), elapsed
+
+
+def run_batch(paths: list[str], output_dir: str, workers: int | None = None):
+    # Runs scenario files in a process pool and writes each trajectory to
+    # <output_dir>/<name>.json, yielding (output, seconds) as they finish. Every
+    # file is loaded first, so a bad one or two sharing a name stop the batch
+    # before anything runs.
+    scenarios = [read_scenario(path) for path in paths]
+    names: dict[str, str] = {}
+    for path, scenario in zip(paths, scenarios, strict=True):
+        if scenario["name"] in names:
+            raise ValueError(
+                f"{path} and {names[scenario['name']]}"
+                f" both write {scenario['name']}.json"
+            )
+        names[scenario["name"]] = path
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_run_file, scenario, output_dir) for scenario in scenarios
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scenario files headless")
+    parser.add_argument("scenarios", nargs="+", help="scenario JSON files")
+    parser.add_argument("--output-dir", default="trajectories")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    for output, elapsed in run_batch(args.scenarios, args.output_dir, args.workers):
+        print(f"{output} ({elapsed:.1f} s)")
+    print(f"{len(args.scenarios)} scenarios in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING
+
+from model.organ import Organ
+
+if TYPE_CHECKING:
+    from model.body import HumanBody
+
+
+class Scheduler:
+    # Runs the organ processes of one tick in the organs' order. With multirate
+    # each process runs once its organ's update_periods entry has elapsed and gets
+    # the time elapsed since it last ran; without it every process runs every
+    # tick, which is the reference model. Placeholder processes are left out of
+    # the plan (see Organ.active_processes()).
+    def __init__(self, organs: Mapping[str, Organ], multirate: bool = False):
+        self.multirate = multirate
+        # (process, period in s), in run order; period 0 runs every tick
+        self.plan: list[tuple[Callable[[float], None], float]] = []
+        for organ in organs.values():
+            self.plan.extend(organ.active_processes(multirate))
+        self.skipped = [
+            f"{organ_name}.{name}"
+            for organ_name, organ in organs.items()
+            for name in organ.processes
+            if getattr(getattr(organ, name), "placeholder", False)
+        ]
+        self.periods = sorted({period for _, period in self.plan})
+        self.elapsed = dict.fromkeys(self.periods, 0.0)  # s since each period last ran
+        self.calls = 0  # process calls so far
+        self.ticks = 0
+        # Processes to run keyed by the periods due at a tick
+        self._due_plans: dict[
+            tuple[float, ...], list[tuple[Callable[[float], None], float]]
+        ] = {}
+
+    def advance(self, dt: float) -> None:
+        elapsed = self.elapsed
+        for period in self.periods:
+            elapsed[period] += dt
+        due = tuple(
+            period for period in self.periods if elapsed[period] >= period - 1e-9
+        )
+        plan = self._due_plans.get(due)
+        if plan is None:
+            plan = self._due_plans[due] = [
+                (process, period) for process, period in self.plan if period in due
+            ]
+        for process, period in plan:
+            process(elapsed[period])
+        for period in due:
+            elapsed[period] = 0.0
+        self.calls += len(plan)
+        self.ticks += 1
+
+    @property
+    def calls_per_tick(self) -> float:
+        return self.calls / self.ticks if self.ticks else 0.0
+
+    def flush(self) -> None:
+        # Catch up the slow processes on the time since they last ran
+        for process, period in self.plan:
+            if self.elapsed[period] > 0:
+                process(self.elapsed[period])
+                self.calls += 1
+        self.elapsed = dict.fromkeys(self.periods, 0.0)
+
+
+def validate(
+    body: "HumanBody", duration: float, every: float = 60.0
+) -> dict[str, float]:
+    # Runs `body` (typically multi-rate) alongside an all-fast copy of it and
+    # returns the largest relative drift of each state field over the samples,
+    # worst first
+    reference = type(body)(
+        spec=body.spec, fidelity=body.fidelity, flux=body.flux is not None
+    )
+    reference.set_state(body.get_state())
+    reference.time = body.time
+    reference.dt = body.dt
+    fields = body.state_fields()
+
+    drift = dict.fromkeys(fields, 0.0)
+    steps = round(duration / body.dt)
+    sample_every = max(1, round(every / body.dt))
+    for i in range(1, steps + 1):
+        body.step()
+        reference.step()
+        if i % sample_every == 0:
+            for field, value, expected in zip(
+                fields, body.get_state(), reference.get_state(), strict=True
+            ):
+                drift[field] = max(
+                    drift[field], abs(value - expected) / max(abs(expected), 1e-9)
+                )
+    return dict(sorted(drift.items(), key=lambda item: item[1], reverse=True))
@@ -1,8 +1,15 @@
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Skin(Organ):
+    processes = Organ.processes + (
+        "_regulate_temperature",
+        "_produce_vitamin_d",
+        "_sense_environment",
+        "_regulate_water_loss",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -10,24 +17,22 @@ class Skin(Organ):
             insulin_sensitivity=1.0  # dimensionless
         )
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._regulate_temperature(dt)
-        self._produce_vitamin_d(dt)
-        self._sense_environment(dt)
-        self._regulate_water_loss(dt)
-
+    @placeholder
     def _regulate_temperature(self, dt: float) -> None:
         # Placeholder for temperature regulation
         pass
 
+    @placeholder
     def _produce_vitamin_d(self, dt: float) -> None:
         # Placeholder for vitamin D production
         pass
 
+    @placeholder
     def _sense_environment(self, dt: float) -> None:
         # Placeholder for sensory function
         pass
 
+    @placeholder
     def _regulate_water_loss(self, dt: float) -> None:
         # Placeholder for water regulation
         pass
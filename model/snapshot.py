@@ -0,0 +1,91 @@
+import struct
+import zlib
+from array import array
+
+from model.body import HumanBody
+
+# Header: magic, format version, layout checksum (of the state field names),
+# field count, time, dt, fidelity, multirate, flux, scheduler period count. The
+# state vector (HumanBody.state_fields() order) and the time elapsed on each
+# scheduler period follow as float64.
+_HEADER = struct.Struct("<4sHIHddBBBH")
+_MAGIC = b"HUPH"
+_VERSION = 2
+_FIDELITIES = ("waveform", "averaged")
+
+_layouts: dict[tuple[type, tuple[str, ...]], tuple[int, int]] = {}
+
+
+def _layout(body: HumanBody) -> tuple[int, int]:
+    # (checksum, field count) of the state layout, per body class and organ set
+    key = (type(body), tuple(body.organs))
+    layout = _layouts.get(key)
+    if layout is None:
+        fields = body.state_fields()
+        layout = _layouts[key] = (zlib.crc32("\n".join(fields).encode()), len(fields))
+    return layout
+
+
+def snapshot(body: HumanBody) -> bytes:
+    checksum, count = _layout(body)
+    scheduler = body.scheduler
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        checksum,
+        count,
+        body.time,
+        body.dt,
+        _FIDELITIES.index(body.fidelity),
+        scheduler.multirate,
+        body.flux is not None,
+        len(scheduler.periods),
+    )
+    elapsed = [scheduler.elapsed[period] for period in scheduler.periods]
+    return (
+        header + array("d", body.get_state()).tobytes() + array("d", elapsed).tobytes()
+    )
+
+
+def restore(data: bytes, spec: dict | str | None = None) -> HumanBody:
+    # A new body built from `spec` (the full body by default, see
+    # model/registry.py), with the snapshot's state loaded into it
+    magic, version, checksum, count, time, dt, fidelity, multirate, flux, periods = (
+        _HEADER.unpack_from(data)
+    )
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not a HumanBody snapshot")
+    body = HumanBody(
+        multirate=bool(multirate),
+        fidelity=_FIDELITIES[fidelity],
+        flux=bool(flux),
+        spec=spec,
+    )
+    if (checksum, count) != _layout(body):
+        raise ValueError("Snapshot state layout does not match the HumanBody spec")
+
+    values = array("d")
+    values.frombytes(data[_HEADER.size :])
+    body.set_state(values[:count])
+    body.time = time
+    body.dt = dt
+    scheduler = body.scheduler
+    scheduler.elapsed = dict(
+        zip(scheduler.periods, values[count : count + periods], strict=True)
+    )
+    return body
+
+
+def fork(body: HumanBody) -> HumanBody:
+    # An independent copy of `body` that continues exactly as it would
+    return restore(snapshot(body), body.spec)
+
+
+def save(body: HumanBody, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(snapshot(body))
+
+
+def load(path: str, spec: dict | str | None = None) -> HumanBody:
+    with open(path, "rb") as f:
+        return restore(f.read(), spec)
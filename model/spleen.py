@@ -3,6 +3,10 @@ from model.organ import Organ
 
 
 class Spleen(Organ):
+    state_fields = Organ.state_fields + (
+        "blood_storage",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -11,9 +15,5 @@ class Spleen(Organ):
         )
         self.blood_storage = 200  # mL
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        # Spleen-specific blood processing logic
-        pass
-
     def _organ_specific_metrics(self) -> dict:
         return {"blood_storage": {"value": self.blood_storage, "unit": "mL", "normal_range": (100, 300)}}
@@ -0,0 +1,158 @@
+import argparse
+import math
+
+from model.blood import Blood
+from model.lungs import Lungs
+
+# Step sizes checked by default, from a tenth of the reference tick to a minute
+DTS = (0.01, 0.1, 0.5, 1, 5, 10, 30, 60)  # s
+REFERENCE_DT = 1e-3  # s, divides every dt checked
+
+
+def _perturbed_lungs(fidelity: str) -> Lungs:
+    # Lungs away from equilibrium in both gases: CO2 retained in the blood and
+    # stale alveolar air, so both exchanges run hard at first
+    lungs = Lungs(Blood())
+    lungs.set_fidelity(fidelity)
+    lungs.expansion = lungs.previous_expansion = 0.5
+    lungs.blood.co2_amount *= 1.3
+    lungs.blood.o2_amount *= 0.5
+    lungs.alveolar_po2 = 100  # mmHg
+    lungs.alveolar_pco2 = 45  # mmHg
+    return lungs
+
+
+def _gases(lungs: Lungs) -> dict[str, float]:
+    return {
+        "alveolar_po2": lungs.alveolar_po2,
+        "alveolar_pco2": lungs.alveolar_pco2,
+        "blood_o2": lungs.blood.o2_amount,
+        "blood_pco2": lungs.blood.co2_concentration / 0.03,
+    }
+
+
+def reference(
+    fidelity: str, duration: float, dt: float = REFERENCE_DT
+) -> list[dict[str, float]]:
+    # The exchange ODEs integrated by classical RK4 at a tiny step, independently
+    # of the solvers in Lungs, as the gases after each step. RK4's error at this
+    # step is far below that of the solvers checked, which are exact for CO2.
+    # Averaged lungs also relax towards fresh air at the breath-averaged
+    # ventilation rate. As in Lungs, O2 only enters unsaturated blood and CO2
+    # only leaves the blood.
+    lungs = _perturbed_lungs(fidelity)
+    blood = lungs.blood
+    ventilation = 0.0
+    if fidelity == "averaged":
+        ventilation = (
+            lungs.respiratory_rate
+            / 60
+            * math.log(1 + lungs.tidal_volume / lungs.functional_residual_capacity)
+        )
+    mmhg_per_mmol = 760 / (22.4 * lungs.alveolar_volume / 1000)
+    o2_conductance = 0.0446 * lungs.diffusion_capacity_o2 / 60  # mmol/s/mmHg
+    co2_conductance = 0.0446 * lungs.diffusion_capacity_co2 / 60  # mmol/s/mmHg
+    capacity = blood.total_oxygen_capacity
+    co2_mmhg_per_amount = 1 / (0.03 * blood.volume / 1000)
+
+    def rates(state):
+        alveolar_po2, alveolar_pco2, o2_amount, co2_amount = state
+        blood_po2 = lungs.oxygen_hemoglobin_dissociation(o2_amount / capacity * 100)
+        diffusing_o2 = 0.0
+        if o2_amount < capacity:
+            diffusing_o2 = o2_conductance * max(alveolar_po2 - blood_po2, 0)
+        blood_pco2 = co2_amount * co2_mmhg_per_amount
+        diffusing_co2 = co2_conductance * max(blood_pco2 - alveolar_pco2, 0)
+        return (
+            ventilation * (104 - alveolar_po2) - diffusing_o2 * mmhg_per_mmol,
+            ventilation * (36 - alveolar_pco2) + diffusing_co2 * mmhg_per_mmol,
+            diffusing_o2,
+            -diffusing_co2,
+        )
+
+    def shifted(state, slopes, h):
+        return [value + slope * h for value, slope in zip(state, slopes, strict=True)]
+
+    state = [lungs.alveolar_po2, lungs.alveolar_pco2, blood.o2_amount, blood.co2_amount]
+    trajectory = []
+    for _ in range(round(duration / dt)):
+        k1 = rates(state)
+        k2 = rates(shifted(state, k1, dt / 2))
+        k3 = rates(shifted(state, k2, dt / 2))
+        k4 = rates(shifted(state, k3, dt))
+        state = [
+            value + (s1 + 2 * s2 + 2 * s3 + s4) * dt / 6
+            for value, s1, s2, s3, s4 in zip(state, k1, k2, k3, k4, strict=True)
+        ]
+        lungs.alveolar_po2, lungs.alveolar_pco2 = state[:2]
+        blood.o2_amount, blood.co2_amount = state[2:]
+        trajectory.append(_gases(lungs))
+    return trajectory
+
+
+def gas_exchange_errors(
+    fidelity: str = "waveform", dts: tuple[float, ...] = DTS, duration: float = 60
+) -> list[dict]:
+    # Runs only Lungs._simulate_gas_exchange from the perturbed state for
+    # `duration` seconds (at least one step) at each dt. Per dt: the largest
+    # relative error against reference() after any step, so the fast transient
+    # right after the perturbation counts and not just the equilibrium both
+    # settle to, and whether any step overshot, i.e. the blood to alveolar pCO2
+    # gradient changed sign or a value left its physical range. The gases are
+    # those at the end.
+    steps = {dt: max(1, round(duration / dt)) for dt in dts}
+    expected = reference(fidelity, max(n * dt for dt, n in steps.items()))
+    rows = []
+    for dt in dts:
+        lungs = _perturbed_lungs(fidelity)
+        gradient = lungs.blood.co2_concentration / 0.03 - lungs.alveolar_pco2
+        overshoot = False
+        error = 0.0
+        for step in range(1, steps[dt] + 1):
+            lungs._simulate_gas_exchange(dt)
+            new_gradient = lungs.blood.co2_concentration / 0.03 - lungs.alveolar_pco2
+            overshoot |= new_gradient * gradient < 0 and abs(new_gradient) > 1e-9
+            overshoot |= (
+                min(_gases(lungs).values()) < 0 or lungs.blood.oxygen_saturation > 1
+            )
+            gradient = new_gradient
+            gases = _gases(lungs)
+            reference_gases = expected[round(step * dt / REFERENCE_DT) - 1]
+            error = max(
+                error,
+                *(
+                    abs(gases[key] - value) / abs(value)
+                    for key, value in reference_gases.items()
+                ),
+            )
+        rows.append({"dt": dt, "max_rel_error": error, "overshoot": overshoot, **gases})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check lung gas exchange for stability and accuracy"
+        " across step sizes"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=60, help="simulated seconds per run"
+    )
+    parser.add_argument("--dt", type=float, nargs="*", default=list(DTS))
+    args = parser.parse_args()
+
+    for fidelity in ("waveform", "averaged"):
+        print(
+            f"{fidelity}: {'dt':>6} {'error':>9} {'overshoot':>9}"
+            f" {'pO2':>7} {'pCO2':>7} {'blood pCO2':>10}"
+        )
+        for row in gas_exchange_errors(fidelity, tuple(args.dt), args.duration):
+            print(
+                f"{'':{len(fidelity) + 1}} {row['dt']:6g}"
+                f" {row['max_rel_error']:9.2e} {row['overshoot']!s:>9}"
+                f" {row['alveolar_po2']:7.2f} {row['alveolar_pco2']:7.2f}"
+                f" {row['blood_pco2']:10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,33 @@
+import math
+
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Stomach(Organ):
+    state_fields = Organ.state_fields + (
+        "water_content",
+        "carbohydrate_content",
+        "protein_content",
+        "fat_content",
+        "fiber_content",
+    )
+
+    processes = Organ.processes + (
+        "_regulate_motility",
+        "_process_food",
+        "_process_water",
+        "_produce_gastrin",
+        "_produce_ghrelin",
+        "_secrete_hydrochloric_acid",
+        "_secrete_pepsin",
+        "_secrete_intrinsic_factor",
+        "_absorb_substances",
+    )
+    update_periods = Organ.update_periods | {
+        "_process_food": 1,
+    }
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -20,25 +45,17 @@ class Stomach(Organ):
     def food_content(self):
         return self.carbohydrate_content + self.protein_content + self.fat_content + self.fiber_content
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._regulate_motility(dt)
-        self._process_food(dt)
-        self._process_water(dt)
-        self._produce_gastrin(dt)
-        self._produce_ghrelin(dt)
-        self._secrete_hydrochloric_acid(dt)
-        self._secrete_pepsin(dt)
-        self._secrete_intrinsic_factor(dt)
-        self._absorb_substances(dt)
-
+    @placeholder
     def _secrete_hydrochloric_acid(self, dt: float):
         # Placeholder for hydrochloric acid secretion
         pass
 
+    @placeholder
     def _secrete_pepsin(self, dt: float):
         # Placeholder for pepsin secretion
         pass
 
+    @placeholder
     def _secrete_intrinsic_factor(self, dt: float):
         # Placeholder for intrinsic factor secretion
         pass
@@ -58,7 +75,8 @@ class Stomach(Organ):
 
     def _process_food(self, dt: float) -> None:
         if self.food_content > 0:
-            digestion_fraction = 0.03 * dt / 60  # 5% per minute
+            # Exact first-order emptying over dt rather than rate * dt
+            digestion_fraction = -math.expm1(-0.03 * dt / 60)  # 3% per minute
             digested_carbs = self.carbohydrate_content * digestion_fraction
             digested_proteins = self.protein_content * digestion_fraction
             digested_fats = self.fat_content * digestion_fraction
@@ -0,0 +1,230 @@
+import json
+import struct
+
+import numpy as np
+
+from model.body import HumanBody
+
+# The dashboard's compact metric stream. Instead of the nested get_metrics()
+# dict every tick, a client gets the metric schema once,
+#
+#   {"schema": [{"path": "Blood/glucose_concentration", "unit": "mg/dL",
+#                "normal_range": [70, 100]}, ...]}
+#
+# and then each frame as a flat list of values in schema order. Paths are as in
+# HumanBody.get_metric_values(); metrics without a normal range have null. The
+# schema is sent again, before the frame, whenever the set of metric paths
+# changes.
+#
+# Binary streams send the schema as JSON text too, but each frame as one binary
+# message: the frame sequence number (uint32), the simulation time in s
+# (float64) and the frame kind (uint32, KEYFRAME or DELTA), then the values
+# (float32), little-endian and unpadded, so the values start at byte
+# FRAME_HEADER.size.
+#
+# With a delta tolerance, only frames every `keyframe_every` (and after a new
+# schema) carry all values. The others carry the metrics whose value moved by
+# more than `tolerance` relative to the value the client last got, and Time
+# always, as
+# {"delta": [indices], "values": [values]} in JSON, or as a DELTA frame with
+# the indices (uint32) followed by the values (float32).
+#
+# Clients can narrow the stream to the metrics they show with
+#
+#   {"action": "subscribe", "paths": ["Blood/glucose_concentration", "Organs/Heart"]}
+#   {"action": "unsubscribe", "paths": ["Organs/Heart"]}
+#
+# where a path names a metric or everything below it. A new stream has every
+# metric; the first subscribe narrows it to the subscribed ones, and Time is
+# always included. Only the sections of get_metrics() with a subscribed metric
+# are built, and the schema is sent again as the metric set changes.
+FRAME_HEADER = struct.Struct("<IdI")
+KEYFRAME, DELTA = 0, 1
+
+
+def flatten(metrics: dict, prefix: str = "") -> list[tuple[str, dict]]:
+    # [(path, {"value", "unit", ...})] of a get_metrics() dict, depth first
+    entries = []
+    for key, metric in metrics.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if "value" in metric:
+            entries.append((path, metric))
+        else:
+            entries.extend(flatten(metric, path))
+    return entries
+
+
+def _json(message) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+def _matches(path: str, subscription: str) -> bool:
+    return path == subscription or path.startswith(subscription + "/")
+
+
+class MetricStream:
+    actions = ("subscribe", "unsubscribe")
+
+    def __init__(
+        self,
+        body: HumanBody,
+        binary: bool = False,
+        tolerance: float | None = None,  # relative, None sends every value
+        keyframe_every: int = 100,  # frames
+    ):
+        self.body = body
+        self.binary = binary
+        self.tolerance = tolerance
+        self.keyframe_every = keyframe_every
+        self.paths: list[str] | None = None  # of the schema last sent
+        self.sequence = 0  # frames sent
+        self.sent = np.empty(0)  # values as the client has them, in schema order
+        self.time_index: int | None = None  # of Time in the schema
+        self.frames_since_keyframe = 0
+        self.subscriptions: list[str] | None = None  # None streams every metric
+        # For the current subscriptions: (section, whole) of the sections to
+        # build, whole when all their metrics are streamed, and whether each
+        # metric path seen so far is streamed
+        self.plan: list[tuple[str, bool]] | None = None
+        self.streamed: dict[str, bool] = {}
+
+    def apply_action(self, data: dict) -> None:
+        # {"action": "subscribe" or "unsubscribe", "paths": [...]}
+        paths = data["paths"]
+        if not isinstance(paths, list) or not all(
+            isinstance(path, str) for path in paths
+        ):
+            raise ValueError(
+                f"Invalid paths, expected a list of metric paths: {paths!r}"
+            )
+        if data["action"] == "subscribe":
+            subscriptions = self.subscriptions or []
+            self.subscriptions = subscriptions + [
+                path for path in paths if path not in subscriptions
+            ]
+        elif data["action"] == "unsubscribe":
+            # Everything so far to start with, less the unsubscribed paths. A
+            # subscription with only part of it unsubscribed becomes its other
+            # metrics.
+            metric_paths = [path for path, _ in flatten(self.body.get_metrics())]
+            subscriptions = []
+            for subscription in (
+                metric_paths if self.subscriptions is None else self.subscriptions
+            ):
+                if any(_matches(subscription, path) for path in paths):
+                    continue
+                if any(_matches(path, subscription) for path in paths):
+                    remaining = [
+                        metric
+                        for metric in metric_paths
+                        if _matches(metric, subscription)
+                        and not any(_matches(metric, path) for path in paths)
+                    ]
+                else:
+                    remaining = [subscription]
+                subscriptions.extend(
+                    path for path in remaining if path not in subscriptions
+                )
+            self.subscriptions = subscriptions
+        else:
+            raise ValueError(f"Unknown stream action: {data['action']}")
+        self.plan = None
+        self.streamed = {}
+
+    def _entries(self) -> list[tuple[str, dict]]:
+        # (path, metric) of the streamed metrics, in get_metrics() order
+        if self.subscriptions is None:
+            return flatten(self.body.get_metrics())
+        subscriptions = ["Time", *self.subscriptions]
+        if self.plan is None:
+            self.plan = [
+                (section, any(_matches(section, s) for s in subscriptions))
+                for section in self.body.metric_sections()
+                if any(
+                    _matches(section, s) or _matches(s, section) for s in subscriptions
+                )
+            ]
+        entries = []
+        streamed = self.streamed
+        for section, whole in self.plan:
+            metrics = self.body.section_metrics(section)
+            section_entries = (
+                [(section, metrics)]
+                if "value" in metrics
+                else flatten(metrics, section)
+            )
+            if whole:
+                entries.extend(section_entries)
+                continue
+            for path, metric in section_entries:
+                keep = streamed.get(path)
+                if keep is None:
+                    keep = streamed[path] = any(
+                        _matches(path, s) for s in subscriptions
+                    )
+                if keep:
+                    entries.append((path, metric))
+        return entries
+
+    def schema(self, entries: list[tuple[str, dict]]) -> dict:
+        return {
+            "schema": [
+                {
+                    "path": path,
+                    "unit": metric["unit"],
+                    "normal_range": metric.get("normal_range"),
+                }
+                for path, metric in entries
+            ]
+        }
+
+    def messages(self) -> list[str | bytes]:
+        # What to send for the body as it is now: the values, preceded by the
+        # schema on the first frame and when the metric set changed. Text
+        # messages are JSON, bytes go out as binary messages.
+        entries = self._entries()
+        messages: list[str | bytes] = []
+        paths = [path for path, _ in entries]
+        keyframe = (
+            self.tolerance is None
+            or self.frames_since_keyframe + 1 >= self.keyframe_every
+        )
+        if paths != self.paths:
+            self.paths = paths
+            self.time_index = paths.index("Time") if "Time" in paths else None
+            messages.append(_json(self.schema(entries)))
+            keyframe = True
+        values = [metric["value"] for _, metric in entries]
+        messages.append(
+            self._keyframe(values) if keyframe else self._delta(np.array(values))
+        )
+        self.sequence += 1
+        return messages
+
+    def _header(self, kind: int) -> bytes:
+        return FRAME_HEADER.pack(self.sequence & 0xFFFFFFFF, self.body.time, kind)
+
+    def _keyframe(self, values: list[float]) -> str | bytes:
+        self.frames_since_keyframe = 0
+        if self.tolerance is not None:
+            self.sent = np.array(values)
+        if self.binary:
+            return self._header(KEYFRAME) + np.array(values, dtype="<f4").tobytes()
+        return _json(values)
+
+    def _delta(self, values: np.ndarray) -> str | bytes:
+        self.frames_since_keyframe += 1
+        # Written so that NaN counts as changed. Time goes out in every frame,
+        # as clients take the frame time from it.
+        moved = ~(np.abs(values - self.sent) <= self.tolerance * np.abs(self.sent))
+        if self.time_index is not None:
+            moved[self.time_index] = True
+        changed = np.flatnonzero(moved)
+        self.sent[changed] = values[changed]
+        if self.binary:
+            return (
+                self._header(DELTA)
+                + changed.astype("<u4").tobytes()
+                + values[changed].astype("<f4").tobytes()
+            )
+        return _json({"delta": changed.tolist(), "values": values[changed].tolist()})
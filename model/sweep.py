@@ -0,0 +1,219 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from model.scenario import build_body, load_scenario, play
+
+# What each point runs unless the spec gives a scenario (see model/scenario.py);
+# the final values of the recorded metric paths go into the result table
+DEFAULT_SCENARIO: dict = load_scenario(
+    {
+        "name": "sweep",
+        "duration": 3600,  # s
+        "warm_start": True,
+        "actions": [{"time": 0, "action": "eat", "amount": 50}],
+        "record": [
+            "Blood/glucose_concentration",
+            "Blood/insulin_concentration",
+            "Organs/Liver/glucose_storage",
+            "Organs/Fat/fat_reserve",
+        ],
+    }
+)
+
+
+def run_point(scenario: dict, parameters: dict[str, float]) -> dict[str, float]:
+    body = build_body(scenario, parameters)
+    play(body, scenario, sample=False)
+    return body.get_metric_values(scenario["record"])
+
+
+def run_chunk(scenario: dict, chunk: list[tuple[int, dict[str, float]]]) -> list[dict]:
+    rows = []
+    for point, parameters in chunk:
+        started = time.perf_counter()
+        values = run_point(scenario, parameters)
+        rows.append(
+            {
+                "point": point,
+                **parameters,
+                **values,
+                "wall_time": time.perf_counter() - started,
+            }
+        )
+    return rows
+
+
+def grid_points(grid: dict[str, list[float]]) -> list[dict[str, float]]:
+    # Every combination of the values of each parameter, the last one varying fastest
+    return [
+        dict(zip(grid, values, strict=True))
+        for values in itertools.product(*grid.values())
+    ]
+
+
+def parameter_paths(points: list[dict[str, float]]) -> list[str]:
+    # Every parameter any point sets, in first-seen order
+    return list(dict.fromkeys(path for parameters in points for path in parameters))
+
+
+def columns(points: list[dict[str, float]], scenario: dict) -> list[str]:
+    # Result table columns
+    return ["point", *parameter_paths(points), *scenario["record"], "wall_time"]
+
+
+def parameter_key(values: dict, paths: list[str]) -> tuple[float | None, ...]:
+    # What identifies a point, from its parameters or its result row: the value
+    # of each of `paths`, None where it is not set
+    return tuple(
+        float(values[path]) if values.get(path, "") != "" else None for path in paths
+    )
+
+
+def finished_points(
+    output: str, fieldnames: list[str], paths: list[str]
+) -> set[tuple[float | None, ...]]:
+    # parameter_key() of the points already in the result table, so a resumed
+    # sweep skips exactly the parameter sets it ran, wherever they now are in
+    # the list of points. A row cut short by an interrupted write (no line
+    # end, or fields missing or extra) is dropped from the file, so its point
+    # runs again. The table must have `fieldnames` as its columns.
+    if not os.path.exists(output):
+        return set()
+    with open(output, newline="") as f:
+        text = f.read()
+    lines = text.splitlines(keepends=True)
+    partial = bool(lines) and not lines[-1].endswith(("\n", "\r"))
+    if partial:
+        lines.pop()
+    reader = csv.DictReader(lines)
+    rows = list(reader)
+    if reader.fieldnames is not None and reader.fieldnames != fieldnames:
+        raise ValueError(
+            f"{output} has columns {reader.fieldnames}, the sweep has {fieldnames}"
+        )
+    complete = [
+        row
+        for row in rows
+        if None not in row and None not in row.values() and row["wall_time"]
+    ]
+    if partial or len(complete) < len(rows):
+        with open(output, "w", newline="") as f:
+            if reader.fieldnames is not None:
+                writer = csv.DictWriter(f, fieldnames=reader.fieldnames)
+                writer.writeheader()
+                writer.writerows(complete)
+    return {parameter_key(row, paths) for row in complete}
+
+
+def sweep(
+    points: list[dict[str, float]],
+    scenario: dict = DEFAULT_SCENARIO,
+    workers: int | None = None,
+    chunk_size: int = 4,
+) -> Iterator[dict]:
+    # Runs every point in a process pool, `chunk_size` points per task, and
+    # yields result rows as their chunks finish (not in point order)
+    numbered = list(enumerate(points))
+    chunks = [numbered[i : i + chunk_size] for i in range(0, len(numbered), chunk_size)]
+    yield from _run_chunks(chunks, scenario, workers)
+
+
+def _run_chunks(
+    chunks: list[list[tuple[int, dict[str, float]]]],
+    scenario: dict,
+    workers: int | None,
+) -> Iterator[dict]:
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a couple of chunks queued per worker rather than submitting all
+        # of them, so an interrupted sweep stops promptly
+        remaining = iter(chunks)
+        running = {
+            executor.submit(run_chunk, scenario, chunk)
+            for chunk in itertools.islice(remaining, 2 * workers)
+        }
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                chunk = next(remaining, None)
+                if chunk is not None:
+                    running.add(executor.submit(run_chunk, scenario, chunk))
+
+
+def sweep_to_csv(
+    points: list[dict[str, float]],
+    output: str,
+    scenario: dict = DEFAULT_SCENARIO,
+    workers: int | None = None,
+    chunk_size: int = 4,
+) -> int:
+    # Appends one row per point to `output`, skipping points whose parameters
+    # are already in it so an interrupted sweep resumes where it stopped.
+    # Returns the rows written.
+    fieldnames = columns(points, scenario)
+    paths = parameter_paths(points)
+    done = finished_points(output, fieldnames, paths)
+    todo = [
+        (point, parameters)
+        for point, parameters in enumerate(points)
+        if parameter_key(parameters, paths) not in done
+    ]
+    chunks = [todo[i : i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    written = 0
+    with open(output, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if f.tell() == 0:
+            writer.writeheader()
+        for row in _run_chunks(chunks, scenario, workers):
+            writer.writerow(row)
+            f.flush()
+            written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a parameter sweep over a scenario in parallel"
+    )
+    parser.add_argument(
+        "spec",
+        help='JSON file with "grid" ({path: [values]}) or "samples"'
+        ' ([{path: value}]), and optionally a "scenario"',
+    )
+    parser.add_argument(
+        "--output",
+        default="sweep.csv",
+        help="CSV result table; an existing one is resumed",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=4, help="points per task")
+    args = parser.parse_args()
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    points = grid_points(spec["grid"]) if "grid" in spec else spec["samples"]
+    scenario = (
+        load_scenario(spec["scenario"]) if "scenario" in spec else DEFAULT_SCENARIO
+    )
+
+    started = time.perf_counter()
+    written = sweep_to_csv(
+        points, args.output, scenario, workers=args.workers, chunk_size=args.chunk_size
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{written} of {len(points)} points run in {elapsed:.1f} s,"
+        f" results in {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
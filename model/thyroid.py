@@ -1,8 +1,12 @@
 from model.blood import Blood
-from model.organ import Organ
+from model.organ import Organ, placeholder
 
 
 class Thyroid(Organ):
+    processes = Organ.processes + (
+        "_produce_hormones",
+    )
+
     def __init__(self, blood: Blood):
         super().__init__(
             blood=blood,
@@ -10,9 +14,7 @@ class Thyroid(Organ):
             insulin_sensitivity=1.0  # dimensionless
         )
 
-    def _organ_specific_processing(self, dt: float) -> None:
-        self._produce_hormones(dt)
-
+    @placeholder
     def _produce_hormones(self, dt: float):
         # Placeholder for producing thyroid hormones (T3, T4)
         pass
@@ -0,0 +1,25 @@
+import numpy as np
+
+from model.blood import SPECIES, Blood
+
+
+def test_concentrations_match_attributes():
+    blood = Blood(volume=4321)
+    blood.glucose_amount *= 1.5
+    blood.urea_amount = 0
+    expected = [getattr(blood, f"{s.name}_concentration") for s in SPECIES]
+    np.testing.assert_array_equal(blood.concentrations(), expected)
+
+
+def test_metrics_are_plain_floats():
+    metrics = Blood().get_metrics()
+    for species in SPECIES:
+        name = f"{species.name}_concentration"
+        assert (name in metrics) == (species.normal_range is not None)
+    assert not any(isinstance(m["value"], np.generic) for m in metrics.values())
+    assert list(metrics)[:4] == [
+        "glucose_concentration",
+        "fatty_acid_concentration",
+        "amino_acid_concentration",
+        "systolic_pressure",
+    ]
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from model.body import HumanBody
+from model.cohort import Cohort
+
+# Per member parameters; the cohort holds them as one column each
+PARAMETERS = {
+    "Liver.insulin_sensitivity": [1.0, 0.4, 1.6],
+    "Muscles.insulin_sensitivity": [1.5, 0.8, 2.5],
+    "Fat.lipolysis_rate": [0.1, 0.05, 0.2],
+}
+# (time in s, action), applied to the cohort and to every body
+ACTIONS = [
+    (10, "eat", 50),
+    (20, "drink", 300),
+    (60, "start_exercise", None),
+    (150, "stop_exercise", None),
+    (200, "sleep", None),
+    (280, "wake", None),
+    (320, "pee", None),
+]
+# Sleep and exercise overlapping either way round
+OVERLAPPING = [
+    (10, "start_exercise", None),
+    (60, "sleep", None),
+    (120, "wake", None),
+    (180, "sleep", None),
+    (240, "stop_exercise", None),
+    (300, "wake", None),
+]
+
+
+def bodies_and_cohort() -> tuple[list[HumanBody], Cohort]:
+    bodies = [HumanBody() for _ in range(3)]
+    for path, values in PARAMETERS.items():
+        for body, value in zip(bodies, values, strict=True):
+            body.set_parameter(path, value)
+    cohort = Cohort(len(bodies))
+    for path, values in PARAMETERS.items():
+        cohort[path] = values
+    return bodies, cohort
+
+
+def assert_matches(cohort: Cohort, bodies: list[HumanBody]) -> None:
+    expected = np.array([body.get_state() for body in bodies]).T
+    np.testing.assert_allclose(cohort.state, expected, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("actions", [ACTIONS, OVERLAPPING], ids=["day", "overlapping"])
+def test_parity_with_bodies(actions):
+    bodies, cohort = bodies_and_cohort()
+    start = 0.0
+    for at, action, amount in [*actions, (360, None, None)]:
+        for body in bodies:
+            for _ in range(round((at - start) / body.dt)):
+                body.step()
+        cohort.run(at - start)
+        assert cohort.time == pytest.approx(bodies[0].time)
+        assert_matches(cohort, bodies)
+        if action is not None:
+            arguments = [] if amount is None else [amount]
+            for target in (cohort, *bodies):
+                getattr(target, action)(*arguments)
+        start = at
+    assert_matches(cohort, bodies)
+
+
+def test_starts_from_template():
+    template = HumanBody()
+    template.eat(50)
+    template.run(30)
+    cohort = Cohort(2, template)
+    template.run(60)
+    cohort.run(60)
+    assert_matches(cohort, [template, template])
+
+
+def test_zero_diffusion_capacity():
+    template = HumanBody()
+    template.set_parameter("Lungs.diffusion_capacity_o2", 0)
+    template.set_parameter("Lungs.diffusion_capacity_co2", 0)
+    cohort = Cohort(2, template)
+    template.run(30)
+    cohort.run(30)
+    assert_matches(cohort, [template, template])
+
+
+def body_with_process() -> HumanBody:
+    body = HumanBody()
+    body.add_process("Liver", lambda dt: None)
+    return body
+
+
+@pytest.mark.parametrize(
+    ("make_body", "message"),
+    [
+        (lambda: HumanBody(spec="glucose_insulin"), "full body"),
+        (lambda: HumanBody(fidelity="averaged"), "waveform fidelity"),
+        (lambda: HumanBody(multirate=True), "every process each tick"),
+        (lambda: HumanBody(flux=True), "flux"),
+        (body_with_process, "add_process"),
+    ],
+    ids=["reduced spec", "averaged", "multirate", "flux", "added process"],
+)
+def test_rejects_unsupported_bodies(make_body, message):
+    with pytest.raises(ValueError, match=message):
+        Cohort(2, make_body())
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pytest
+
+from model import equilibrium
+from model.body import HumanBody
+from model.equilibrium import FastSubsystem, solve, warm_start
+
+
+def snapshots(cache_dir) -> list:
+    return sorted(cache_dir.glob("*.snap"))
+
+
+@pytest.mark.parametrize("spec", ["full", "glucose_insulin"])
+def test_solve_reaches_fixed_point(spec):
+    body = HumanBody(spec=spec)
+    assert solve(body) <= equilibrium.TOLERANCE
+    body.set_fidelity("averaged")
+    system = FastSubsystem(body)
+    rate = system.rate(system.state())
+    assert np.max(np.abs(rate) / np.maximum(np.abs(system.state()), 1)) < 1e-6
+
+
+def test_warm_start_is_cached(tmp_path):
+    parameters = {"Liver.insulin_sensitivity": 0.7}
+    solved = warm_start(parameters, cache_dir=tmp_path)
+    assert len(snapshots(tmp_path)) == 1
+    cached = warm_start(parameters, cache_dir=tmp_path)
+    assert cached.get_state() == solved.get_state()
+    assert len(snapshots(tmp_path)) == 1
+
+
+def test_unconverged_solve_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(equilibrium, "solve", lambda body: 1.0)
+    warm_start(cache_dir=tmp_path)
+    assert snapshots(tmp_path) == []
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(equilibrium, "CACHE_SIZE", 2)
+    first, second, third = ({"Liver.insulin_sensitivity": v} for v in (0.5, 0.7, 0.9))
+    warm_start(first, cache_dir=tmp_path)
+    (first_path,) = snapshots(tmp_path)
+    warm_start(second, cache_dir=tmp_path)
+    (second_path,) = set(snapshots(tmp_path)) - {first_path}
+    os.utime(first_path, (1, 1))
+    os.utime(second_path, (2, 2))
+    # Using the first body again makes the second the least recently used
+    warm_start(first, cache_dir=tmp_path)
+    warm_start(third, cache_dir=tmp_path)
+    remaining = snapshots(tmp_path)
+    assert len(remaining) == 2
+    assert first_path in remaining
+    assert second_path not in remaining
@@ -0,0 +1,62 @@
+import pytest
+
+from model.blood import SPECIES
+from model.body import HumanBody
+
+
+def scarce_body(flux: bool) -> HumanBody:
+    # Almost no blood glucose and no glycogen to release, during exercise
+    body = HumanBody(flux=flux)
+    body.blood.glucose_amount = 5
+    body.liver.glucose_storage = 0
+    body.start_exercise()
+    return body
+
+
+def test_scarce_species_stay_non_negative():
+    body = scarce_body(flux=True)
+    for _ in range(50):
+        body.step()
+        assert min(body.blood.amounts) >= 0
+    assert body.blood.glucose_amount == pytest.approx(0, abs=1e-9)
+
+
+def test_scarce_withdrawals_are_scaled_in_proportion():
+    body = HumanBody(flux=True)
+    body.blood.glucose_amount = 10
+    body.flux.load()
+    # Together the liver and muscles take 18 of the 10 + 2 there are
+    views = body.flux.views
+    views["Liver"].glucose_amount -= 6
+    views["Muscles"].glucose_amount -= 12
+    views["Intestines"].glucose_amount += 2
+    body.flux.apply(1.0)
+    assert body.blood.glucose_amount == pytest.approx(0, abs=1e-12)
+    rates = body.flux_breakdown()
+    assert rates["Liver"]["glucose_amount"] == pytest.approx(-4)
+    assert rates["Muscles"]["glucose_amount"] == pytest.approx(-8)
+    assert rates["Intestines"]["glucose_amount"] == pytest.approx(2)
+
+
+def test_matches_sequential_without_scarcity():
+    sequential, flux = HumanBody(), HumanBody(flux=True)
+    for body in (sequential, flux):
+        body.eat(50)
+        for _ in range(600):
+            body.step()
+    for species in SPECIES:
+        name = f"{species.name}_amount"
+        assert getattr(flux.blood, name) == pytest.approx(
+            getattr(sequential.blood, name), rel=0.05, abs=1e-6
+        ), name
+
+
+def test_breakdown_adds_up_to_the_change():
+    body = HumanBody(flux=True)
+    body.eat(50)
+    body.run(10)
+    before = body.blood.glucose_amount
+    body.step()
+    rates = body.flux_breakdown()
+    change = sum(organ.get("glucose_amount", 0) for organ in rates.values())
+    assert change * body.dt == pytest.approx(body.blood.glucose_amount - before)
@@ -0,0 +1,46 @@
+import pytest
+
+from model.body import HumanBody
+from model.horizon import run_days
+
+
+def muscle_demand(body: HumanBody) -> float:
+    return body.muscles.energy_demand / body.muscles.base_energy_demand
+
+
+@pytest.mark.parametrize("spec", ["full", "glucose_insulin"])
+def test_waking_keeps_exercise(spec):
+    body = HumanBody(spec=spec)
+    body.sleep()
+    body.start_exercise()
+    body.wake()
+    assert body.is_exercising
+    assert muscle_demand(body) == 3
+    body.stop_exercise()
+    assert muscle_demand(body) == 1
+
+
+@pytest.mark.parametrize("spec", ["full", "glucose_insulin"])
+def test_stopping_exercise_keeps_sleep(spec):
+    body = HumanBody(spec=spec)
+    body.start_exercise()
+    body.sleep()
+    body.stop_exercise()
+    assert body.is_sleeping
+    assert muscle_demand(body) == 0.8
+    body.wake()
+    assert muscle_demand(body) == 1
+
+
+def test_run_days_restores_the_body():
+    body = HumanBody()
+    schedule = [
+        {"time": 7.0, "action": "start_exercise"},
+        {"time": 7.1, "action": "wake"},
+    ]
+    record = ["Blood/glucose_concentration"]
+    trajectory = run_days(body, 0.25 / 24, schedule, record=record, every=300)
+    assert len(trajectory) == 3
+    assert body.fidelity == "waveform"
+    assert not body.scheduler.multirate
+    assert muscle_demand(body) == 3
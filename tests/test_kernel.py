@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from model import kernel
+from model.body import HumanBody
+
+# Action schedules as [(time in s, action)], applied to both bodies between runs
+MEAL = [(10, {"action": "eat", "amount": 50}), (20, {"action": "drink", "amount": 300})]
+EXERCISE = [
+    (10, {"action": "eat", "amount": 50}),
+    (100, {"action": "start_exercise"}),
+    (400, {"action": "stop_exercise"}),
+    (450, {"action": "pee"}),
+]
+SLEEP = [(10, {"action": "sleep"}), (300, {"action": "wake"})]
+
+
+def compare(
+    body: HumanBody,
+    compiled: HumanBody,
+    actions: list,
+    duration: float,
+    every: float = 10,
+) -> None:
+    # Steps `body` through its organ objects and `compiled` through the kernel
+    # and checks that the sampled state vectors agree
+    start = 0.0
+    for at, action in [*actions, (duration, None)]:
+        expected = []
+        for _ in range(round((at - start) / every)):
+            for _ in range(round(every / body.dt)):
+                body.step()
+            expected.append(body.get_state())
+        actual = kernel.run(compiled, at - start, every)
+        if expected:
+            np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+        if action is not None:
+            body.apply_action(action)
+            compiled.apply_action(action)
+        start = at
+    assert compiled.time == pytest.approx(body.time)
+    np.testing.assert_allclose(
+        compiled.get_state(), body.get_state(), rtol=1e-9, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "actions", [[], MEAL, EXERCISE, SLEEP], ids=["rest", "meal", "exercise", "sleep"]
+)
+def test_parity_with_actions(actions):
+    compare(HumanBody(), HumanBody(), actions, duration=600)
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"Liver.insulin_sensitivity": 0.4, "Muscles.insulin_sensitivity": 2.0},
+        {"Fat.lipolysis_rate": 0.05, "Heart.pumping_rate": 90},
+        {"Blood.volume": 4000, "Blood.hemoglobin": 11},
+        {"Lungs.diffusion_capacity_o2": 0, "Lungs.diffusion_capacity_co2": 0},
+    ],
+)
+def test_parity_with_parameters(parameters):
+    body, compiled = HumanBody(), HumanBody()
+    for path, value in parameters.items():
+        body.set_parameter(path, value)
+        compiled.set_parameter(path, value)
+    compare(body, compiled, MEAL, duration=300)
+
+
+def test_parity_from_scarce_blood():
+    # Low glucose and oxygen exercise the clamps on organ uptake
+    body = HumanBody()
+    body.blood.glucose_amount = 5
+    body.blood.o2_amount *= 0.2
+    compiled = HumanBody()
+    compiled.set_state(body.get_state())
+    compare(body, compiled, [(10, {"action": "start_exercise"})], duration=120)
+
+
+def test_run_advances_body():
+    body = HumanBody()
+    samples = kernel.run(body, 5, every=1)
+    assert samples.shape == (5, len(body.state_fields()))
+    assert body.time == pytest.approx(5)
+    np.testing.assert_array_equal(samples[-1], body.get_state())
+    assert kernel.run(body, 1).shape == (0, len(body.state_fields()))
+
+
+@pytest.mark.parametrize(
+    ("make_body", "message"),
+    [
+        (lambda: HumanBody(fidelity="averaged"), "waveform fidelity"),
+        (lambda: HumanBody(multirate=True), "every process each tick"),
+        (lambda: HumanBody(spec="glucose_insulin"), "full body"),
+        (lambda: HumanBody(flux=True), "flux"),
+    ],
+    ids=["averaged", "multirate", "reduced spec", "flux"],
+)
+def test_rejects_unsupported_bodies(make_body, message):
+    body = make_body()
+    state = body.get_state()
+    with pytest.raises(ValueError, match=message):
+        kernel.run(body, 1)
+    assert body.get_state() == state
+    assert body.time == 0
+
+
+def test_rejects_added_processes():
+    body = HumanBody()
+    body.add_process("Liver", lambda dt: None)
+    with pytest.raises(ValueError, match="add_process"):
+        kernel.run(body, 1)
@@ -0,0 +1,42 @@
+import math
+
+import pytest
+
+from model.body import HumanBody
+from model.playback import MAX_PUBLISH_RATE, Playback
+
+
+@pytest.mark.parametrize("rate", [0, -1, math.inf, math.nan, "inf", "nan"])
+def test_rejects_invalid_publish_rates(rate):
+    with pytest.raises(ValueError):
+        Playback(publish_rate=rate)
+
+
+def test_caps_publish_rate():
+    playback = Playback(publish_rate=1e6)
+    assert playback.publish_rate == MAX_PUBLISH_RATE
+    assert playback.interval > 0
+
+
+@pytest.mark.parametrize("speed", [0, -1, math.inf, math.nan, "inf", "nan"])
+def test_rejects_invalid_speeds(speed):
+    with pytest.raises(ValueError):
+        Playback(speed=speed)
+
+
+def test_max_speed_steps_within_the_interval():
+    playback = Playback(publish_rate=MAX_PUBLISH_RATE, speed="max")
+    body = HumanBody()
+    steps = playback.advance(body)
+    assert steps > 0
+    assert playback.owed == 0
+    assert playback.steps == steps
+
+
+def test_counts_steps_across_advances():
+    playback = Playback(publish_rate=10, speed=10)
+    body = HumanBody()
+    taken = [playback.advance(body) for _ in range(5)]
+    assert taken == [10] * 5
+    assert playback.steps == 50
+    assert body.time == pytest.approx(5)
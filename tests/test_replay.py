@@ -0,0 +1,68 @@
+import pytest
+
+from model.body import HumanBody
+from model.playback import Playback
+from model.replay import SessionRecorder, read_session, replay
+
+# Actions by publish, as a client might send them between updates
+ACTIONS = {
+    0: {"action": "eat", "amount": 60},
+    3: {"action": "start_exercise"},
+    7: {"action": "drink", "amount": 200},
+    12: {"action": "stop_exercise"},
+}
+
+
+def test_replay_yields_what_was_published(tmp_path):
+    body = HumanBody()
+    recorder = SessionRecorder(body, tmp_path)
+    playback = Playback(publish_rate=10, speed=60)
+    received = []
+    for publish in range(20):
+        if publish in ACTIONS:
+            body.apply_action(ACTIONS[publish])
+            recorder.record(playback.steps, ACTIONS[publish])
+        playback.advance(body)
+        received.append(body.get_metrics())
+        recorder.publish(playback.steps)
+    recorder.close(playback.steps)
+
+    assert list(replay(recorder.path)) == received
+    _, events, steps = read_session(recorder.path)
+    assert steps == playback.steps
+    assert sum(action is None for _, action in events) == len(received)
+
+
+def test_actions_between_publishes_keep_their_order(tmp_path):
+    body = HumanBody()
+    recorder = SessionRecorder(body, tmp_path)
+    received = []
+    for _ in range(3):
+        body.step()
+    # Published, then eaten, then published again, all after 3 steps
+    received.append(body.get_metrics())
+    recorder.publish(3)
+    body.eat(50)
+    recorder.record(3, {"action": "eat", "amount": 50})
+    received.append(body.get_metrics())
+    recorder.publish(3)
+    recorder.close(3)
+
+    assert list(replay(recorder.path)) == received
+
+
+def test_cut_off_session_ends_at_last_event(tmp_path):
+    recorder = SessionRecorder(HumanBody(), tmp_path)
+    recorder.record(5, {"action": "pee"})
+    recorder.publish(8)
+    recorder.file.close()
+    _, events, steps = read_session(recorder.path)
+    assert events == [(5, {"action": "pee"}), (8, None)]
+    assert steps == 8
+
+
+def test_rejects_other_versions(tmp_path):
+    path = tmp_path / "old.jsonl"
+    path.write_text('{"version": 1, "initial": ""}\n')
+    with pytest.raises(ValueError, match="version"):
+        read_session(path)
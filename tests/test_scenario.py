@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from model.scenario import load_scenario, play, run_batch
+
+
+def scenario(**data) -> dict:
+    return load_scenario({"duration": 60, **data})
+
+
+@pytest.mark.parametrize("amount", ["50", None, True, -50, 0, float("nan"), [50]])
+def test_rejects_invalid_amounts(amount):
+    action = {"time": 10, "action": "eat", "amount": amount}
+    with pytest.raises(ValueError, match="amount"):
+        scenario(actions=[action])
+
+
+@pytest.mark.parametrize("count", [0, -1, 1.5, "2", True])
+def test_rejects_invalid_counts(count):
+    action = {"time": 10, "action": "pee", "every": 5, "count": count}
+    with pytest.raises(ValueError, match="count"):
+        scenario(actions=[action])
+
+
+@pytest.mark.parametrize("time", [None, [10], "soon"])
+def test_rejects_invalid_times(time):
+    with pytest.raises(ValueError, match="time"):
+        scenario(actions=[{"time": time, "action": "pee"}])
+
+
+class Clock:
+    # Just the time of a body, summed step by step like HumanBody.time
+    def __init__(self):
+        self.time = 0.0
+        self.applied = []
+
+    def step(self, dt):
+        self.time += dt
+
+    def apply_action(self, action):
+        self.applied.append((self.time, action["action"]))
+
+
+def test_actions_run_at_their_step():
+    # After 23050 steps of 0.1 s the summed time falls short of 2305 s by
+    # more than 1e-9, which once ran the action a step late
+    actions = [{"time": 2305, "action": "pee"}, {"time": "1s", "action": "wake"}]
+    loaded = scenario(duration=2306, actions=actions, record=[])
+    clock = Clock()
+    play(clock, loaded, sample=False)
+    assert [action for _, action in clock.applied] == ["wake", "pee"]
+    assert [time for time, _ in clock.applied] == pytest.approx([1, 2305], abs=1e-6)
+
+
+def test_batch_rejects_shared_names(tmp_path):
+    paths = []
+    for directory in ("a", "b"):
+        path = tmp_path / directory / "meal.json"
+        path.parent.mkdir()
+        path.write_text(json.dumps({"duration": 1}))
+        paths.append(str(path))
+    with pytest.raises(ValueError, match="meal.json"):
+        list(run_batch(paths, str(tmp_path / "out")))
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,36 @@
+import pytest
+
+from model.blood import Blood
+from model.lungs import Lungs
+from model.stability import DTS, gas_exchange_errors
+
+# Largest relative error against the RK4 reference for any dt checked. The
+# waveform solver is exact for CO2 and linearizes O2 only; the averaged one
+# holds the blood pO2 over a step, so its error grows with dt.
+TOLERANCE = {"waveform": 1e-5, "averaged": 5e-3}
+
+
+@pytest.mark.parametrize("fidelity", ["waveform", "averaged"])
+def test_gas_exchange_matches_reference(fidelity):
+    rows = gas_exchange_errors(fidelity, DTS, duration=60)
+    for row in rows:
+        assert not row["overshoot"], row["dt"]
+        assert row["max_rel_error"] < TOLERANCE[fidelity], row["dt"]
+    errors = [row["max_rel_error"] for row in rows]
+    # Converges as the step shrinks
+    assert errors == sorted(errors)
+
+
+@pytest.mark.parametrize("fidelity", ["waveform", "averaged"])
+@pytest.mark.parametrize("capacity", ["o2", "co2"])
+def test_zero_diffusion_capacity(fidelity, capacity):
+    lungs = Lungs(Blood())
+    lungs.set_fidelity(fidelity)
+    setattr(lungs, f"diffusion_capacity_{capacity}", 0)
+    o2, co2 = lungs.blood.o2_amount, lungs.blood.co2_amount
+    for _ in range(10):
+        lungs._simulate_gas_exchange(0.1)
+    if capacity == "o2":
+        assert lungs.blood.o2_amount == o2
+    else:
+        assert lungs.blood.co2_amount == co2
@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pytest
+
+from model.body import HumanBody
+from model.stream import DELTA, FRAME_HEADER, MetricStream
+
+
+def frames(stream: MetricStream, steps: int) -> list:
+    messages = []
+    for _ in range(steps):
+        stream.body.step()
+        messages.extend(stream.messages())
+    return messages
+
+
+def test_json_deltas_carry_time():
+    body = HumanBody()
+    stream = MetricStream(body, tolerance=1e-3)
+    messages = [json.loads(message) for message in frames(stream, 300)]
+    schema = messages[0]["schema"]
+    time_index = [metric["path"] for metric in schema].index("Time")
+    deltas = [message for message in messages if isinstance(message, dict)]
+    deltas = [message for message in deltas if "delta" in message]
+    assert deltas
+    for delta in deltas:
+        assert time_index in delta["delta"]
+    last = deltas[-1]
+    time = last["values"][last["delta"].index(time_index)]
+    assert time == body.time
+
+
+def test_binary_deltas_carry_time():
+    body = HumanBody()
+    stream = MetricStream(body, binary=True, tolerance=1e-3)
+    messages = frames(stream, 300)
+    paths = [metric["path"] for metric in json.loads(messages[0])["schema"]]
+    time_index = paths.index("Time")
+    deltas = [m for m in messages[1:] if FRAME_HEADER.unpack_from(m)[2] == DELTA]
+    assert deltas
+    for delta in deltas:
+        count = (len(delta) - FRAME_HEADER.size) // 8
+        indices = np.frombuffer(delta, "<u4", count, FRAME_HEADER.size)
+        assert time_index in indices
+
+
+def streamed_paths(stream: MetricStream) -> list[str]:
+    return [path for path, _ in stream._entries()]
+
+
+def test_partial_unsubscribe_keeps_the_rest_of_a_section():
+    body = HumanBody()
+    stream = MetricStream(body)
+    stream.apply_action({"action": "subscribe", "paths": ["Organs/Heart"]})
+    heart = [path for path in streamed_paths(stream) if path != "Time"]
+    assert "Organs/Heart/pumping_rate" in heart
+    unsubscribe = {"action": "unsubscribe", "paths": ["Organs/Heart/pumping_rate"]}
+    stream.apply_action(unsubscribe)
+    paths = streamed_paths(stream)
+    assert "Organs/Heart/pumping_rate" not in paths
+    assert paths == [
+        "Time",
+        *(path for path in heart if path != unsubscribe["paths"][0]),
+    ]
+
+
+def test_unsubscribe_from_everything():
+    body = HumanBody()
+    stream = MetricStream(body)
+    everything = streamed_paths(stream)
+    stream.apply_action({"action": "unsubscribe", "paths": ["Blood/ph", "Organs"]})
+    paths = streamed_paths(stream)
+    assert paths == [
+        path
+        for path in everything
+        if path != "Blood/ph" and not path.startswith("Organs/")
+    ]
+
+
+@pytest.mark.parametrize("paths", ["Blood", None, ["Blood", 3], {"Blood": 1}])
+def test_rejects_invalid_paths(paths):
+    stream = MetricStream(HumanBody())
+    with pytest.raises(ValueError, match="paths"):
+        stream.apply_action({"action": "subscribe", "paths": paths})
+    assert stream.subscriptions is None
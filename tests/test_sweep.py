@@ -0,0 +1,70 @@
+import csv
+
+import pytest
+
+from model.scenario import load_scenario
+from model.sweep import grid_points, sweep, sweep_to_csv
+
+SCENARIO = load_scenario(
+    {
+        "name": "short",
+        "duration": 1,
+        "warm_start": False,
+        "actions": [],
+        "record": ["Blood/glucose_concentration"],
+    }
+)
+PATH = "Liver.insulin_sensitivity"
+
+
+def read(output) -> list[dict[str, str]]:
+    with open(output, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_sweep_numbers_every_point():
+    points = grid_points({PATH: [0.5, 1.0, 1.5], "Fat.lipolysis_rate": [0.1, 0.2]})
+    rows = list(sweep(points, SCENARIO, workers=1, chunk_size=4))
+    assert sorted(row["point"] for row in rows) == list(range(len(points)))
+    for row in rows:
+        assert row[PATH] == points[row["point"]][PATH]
+
+
+def test_resume_skips_finished_parameters(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    assert sweep_to_csv([{PATH: 0.5}, {PATH: 1.0}], output, SCENARIO, workers=1) == 2
+    # Edited and reordered: only the new value runs
+    points = [{PATH: 1.5}, {PATH: 1.0}, {PATH: 0.5}]
+    assert sweep_to_csv(points, output, SCENARIO, workers=1) == 1
+    rows = read(output)
+    assert sorted(float(row[PATH]) for row in rows) == [0.5, 1.0, 1.5]
+
+
+def test_resume_reruns_truncated_rows(tmp_path):
+    output = tmp_path / "sweep.csv"
+    points = [{PATH: 0.5}, {PATH: 1.0}, {PATH: 1.5}]
+    sweep_to_csv(points, str(output), SCENARIO, workers=1)
+    lines = output.read_text().splitlines(keepends=True)
+    # One row lost a field, the last one was cut off mid-write
+    short = ",".join(lines[2].split(",")[:-2]) + "\n"
+    output.write_text(lines[0] + lines[1] + short + lines[3][:-4])
+    assert sweep_to_csv(points, str(output), SCENARIO, workers=1) == 2
+    rows = read(output)
+    assert sorted(float(row[PATH]) for row in rows) == [0.5, 1.0, 1.5]
+    assert all(row["wall_time"] for row in rows)
+
+
+def test_columns_cover_every_point(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    points = [{PATH: 0.5}, {PATH: 1.0, "Muscles.insulin_sensitivity": 2.0}]
+    sweep_to_csv(points, output, SCENARIO, workers=1)
+    rows = {row[PATH]: row for row in read(output)}
+    assert rows["1.0"]["Muscles.insulin_sensitivity"] == "2.0"
+    assert rows["0.5"]["Muscles.insulin_sensitivity"] == ""
+
+
+def test_resume_rejects_other_columns(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    sweep_to_csv([{PATH: 0.5}], output, SCENARIO, workers=1)
+    with pytest.raises(ValueError, match="columns"):
+        sweep_to_csv([{"Fat.lipolysis_rate": 0.1}], output, SCENARIO, workers=1)